@@ -1,38 +1,21 @@
 # agent/graph.py (mypy fixes)
-import json
 import logging
 import re
 import traceback
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 from typing import Callable
 from langchain_core.runnables import RunnableLambda
-from langchain_groq import ChatGroq
-from pydantic import SecretStr
 
 from core.config import settings
+from services.llm_gateway import llm_gateway
 from tools.mcp_client import invoke_tool_sync
+from utils.llm_cache import llm_cache_key, llm_response_cache
 
 logger = logging.getLogger(__name__)
 
-api_key_secret: Optional[SecretStr] = (
-    SecretStr(settings.GROQ_API_KEY)
-    if getattr(settings, "GROQ_API_KEY", None)
-    else None
-)
-
-llm_short = ChatGroq(
-    api_key=api_key_secret,
-    model=settings.GROQ_MODEL,
-    temperature=0,
-    max_tokens=150,  # short replies (adjust as needed)
-)
-
-llm_long = ChatGroq(
-    api_key=api_key_secret,
-    model=settings.GROQ_MODEL,
-    temperature=0,
-    max_tokens=1500,  # long/detailed replies (adjust to model limits)
-)
+# completion limits of the two reply modes (adjust to model limits)
+MAX_TOKENS_SHORT = 150
+MAX_TOKENS_LONG = 1500
 
 
 def _normalize_used_ids(uids) -> list[int]:
@@ -263,12 +246,23 @@ def _clean_history_message(m: Dict[str, Any]) -> Optional[Dict[str, str]]:
         return None
 
 
-def agent_fallback(params: Dict[str, Any]) -> str:
+def build_fallback_messages(
+    params: Dict[str, Any],
+) -> Tuple[List[Dict[str, str]], int]:
+    """Build the LLM messages and completion limit for a fabric question.
+
+    Args:
+        params (Dict): ``text``, ``history`` and ``mode`` ("short" or "long").
+
+    Returns:
+        Tuple[List[Dict], int]: Messages (system prompt, cleaned history, user
+        text) and max_tokens for the mode.
+    """
     user_text: str = params.get("text", "")
     history: List[Dict[str, str]] = params.get("history") or []
     mode = str(params.get("mode", "short") or "short").lower()
 
-    chosen_llm = llm_long if mode.startswith("long") else llm_short
+    max_tokens = MAX_TOKENS_LONG if mode.startswith("long") else MAX_TOKENS_SHORT
 
     system_prompt = SYSTEM_PROMPT
     if mode.startswith("long"):
@@ -279,7 +273,7 @@ def agent_fallback(params: Dict[str, Any]) -> str:
         )
         system_prompt = override + system_prompt
         logger.info(
-            "agent_fallback: mode=long -> prepended override and selecting llm_long"
+            "agent_fallback: mode=long -> prepended override and long token limit"
         )
 
     clipped = history[-6:] if isinstance(history, list) else []
@@ -296,42 +290,89 @@ def agent_fallback(params: Dict[str, Any]) -> str:
 
     try:
         logger.info(
-            "AGENT DEBUG -> chosen_llm=%s system_prompt_preview=%s",
-            "llm_long" if mode.startswith("long") else "llm_short",
+            "AGENT DEBUG -> max_tokens=%s system_prompt_preview=%s",
+            max_tokens,
             system_prompt[:200],
         )
     except Exception:
         logger.exception("AGENT DEBUG -> logging error")
 
-    try:
-        resp = chosen_llm.invoke(messages)
+    return messages, max_tokens
 
-        # unwrap the response into a string robustly (LLM may return dict/list/obj)
-        if hasattr(resp, "content"):
-            val = getattr(resp, "content")
-            if isinstance(val, str):
-                return val
-            try:
-                return json.dumps(val, default=str)
-            except Exception:
-                return str(val)
 
-        if isinstance(resp, dict) and resp.get("content"):
-            val = resp.get("content")
-            if isinstance(val, str):
-                return val
-            try:
-                return json.dumps(val, default=str)
-            except Exception:
-                return str(val)
+def agent_fallback(params: Dict[str, Any]) -> str:
+    messages, max_tokens = build_fallback_messages(params)
+
+    # repeat questions (same mode, history and normalized text) skip the LLM
+    key = llm_cache_key(settings.GROQ_MODEL, max_tokens, messages)
+    cached = llm_response_cache.get(key)
+    if cached is not None:
+        logger.info("AGENT DEBUG -> LLM cache hit")
+        return cached
 
-        return str(resp)
+    try:
+        resp = llm_gateway.chat_sync(
+            messages, settings.GROQ_MODEL, max_tokens=max_tokens, temperature=0
+        )
+        if resp.text:
+            llm_response_cache.put(key, resp.text)
+        return resp.text
 
     except Exception as e:
         logger.exception("AGENT DEBUG -> LLM call failed")
         return f"Error calling LLM: {e}"
 
 
+async def stream_fallback(params: Dict[str, Any]) -> AsyncGenerator[str, None]:
+    """Streaming ``agent_fallback``: yields reply text as the LLM produces it.
+
+    Cached replies are yielded whole; a completed stream is cached like a
+    ``agent_fallback`` reply.
+    """
+    messages, max_tokens = build_fallback_messages(params)
+    key = llm_cache_key(settings.GROQ_MODEL, max_tokens, messages)
+    cached = llm_response_cache.get(key)
+    if cached is not None:
+        logger.info("AGENT DEBUG -> LLM cache hit")
+        yield cached
+        return
+
+    parts: List[str] = []
+    async for delta in llm_gateway.stream(
+        messages, settings.GROQ_MODEL, max_tokens=max_tokens, temperature=0
+    ):
+        parts.append(delta)
+        yield delta
+    text = "".join(parts).strip()
+    if text:
+        llm_response_cache.put(key, text)
+
+
+def run_tool(user_text: str) -> Tuple[bool, Any]:
+    """Route ``user_text`` and run the matching MCP tool, if any.
+
+    Returns:
+        Tuple[bool, Any]: (True, tool output) when a tool handled the text,
+        (False, None) when it should go to the LLM fallback.
+    """
+    decision = router_fn(user_text)
+
+    tool = decision.get("tool")
+    params = decision.get("params", {}) or {}
+
+    if tool not in _TOOL_DISPATCH:
+        return False, None
+
+    fn = _TOOL_DISPATCH[tool]
+    try:
+        return True, fn(params or {})
+    except Exception as e:
+        return True, {
+            "error": f"tool_call_failed: {e}",
+            "trace": traceback.format_exc(),
+        }
+
+
 def _agent_graph_callable(payload: Union[str, Dict[str, Any]]) -> Any:
     try:
         if isinstance(payload, str):
@@ -345,21 +386,9 @@ def _agent_graph_callable(payload: Union[str, Dict[str, Any]]) -> Any:
                 payload.get("mode", "short") if isinstance(payload, dict) else "short"
             )
 
-        decision = router_fn(user_text)
-
-        tool = decision.get("tool")
-        params = decision.get("params", {}) or {}
-
-        if tool in _TOOL_DISPATCH:
-            fn = _TOOL_DISPATCH[tool]
-            try:
-                out = fn(params or {})
-                return out
-            except Exception as e:
-                return {
-                    "error": f"tool_call_failed: {e}",
-                    "trace": traceback.format_exc(),
-                }
+        handled, out = run_tool(user_text)
+        if handled:
+            return out
 
         return agent_fallback(
             {"text": user_text, "history": history or [], "mode": mode}
@@ -373,7 +402,5 @@ agent_graph: RunnableLambda[Any, Any] = RunnableLambda(_agent_graph_callable)
 
 __all__ = [
     "agent_graph",
-    "llm_short",
-    "llm_long",
     "SYSTEM_PROMPT",
 ]
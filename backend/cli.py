@@ -70,6 +70,97 @@ def api(host, port, reload, env):
     uvicorn.run("main:app", host=host, port=port, reload=reload)
 
 
+# ------------------------------------------------------------
+# index command (vector index maintenance)
+# ------------------------------------------------------------
+@main.command()
+@click.option(
+    "--env",
+    default="development",
+    type=click.Choice(["development", "production"]),
+    help="Environment to run in.",
+)
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    help="Retrain the index from scratch, whatever its state.",
+)
+@click.option(
+    "--min-new-rows",
+    default=None,
+    type=int,
+    help="Unindexed rows needed before an incremental refresh runs.",
+)
+@click.option(
+    "--index-type",
+    default=None,
+    type=click.Choice(["IVF_PQ", "IVF_HNSW_SQ"]),
+    help="Index type used when (re)building.",
+)
+@click.option("--partitions", default=None, type=int, help="IVF partitions.")
+@click.option("--sub-vectors", default=None, type=int, help="PQ sub-vectors.")
+def index(env, rebuild, min_new_rows, index_type, partitions, sub_vectors):
+    """Build or incrementally refresh the vector and scalar indexes of the fabric table."""
+    os.environ["APP_ENV"] = env  # ← set BEFORE app imports
+    from constants import DATABASE_PATH, TABLE_NAME
+    from image_search.db.connection import get_table
+    from image_search.db.indexes import (
+        build_scalar_indexes,
+        build_vector_index,
+        refresh_vector_index,
+    )
+
+    table = get_table(DATABASE_PATH, TABLE_NAME)
+    scalar = build_scalar_indexes(table, replace=rebuild)
+    if scalar:
+        click.echo(f"Scalar indexes built on: {', '.join(scalar)}")
+    if rebuild:
+        changed = build_vector_index(
+            table, index_type, partitions, sub_vectors, force=True
+        )
+    else:
+        changed = refresh_vector_index(table, min_new_rows)
+    click.echo("Vector index updated." if changed else "Vector index unchanged.")
+
+
+# ------------------------------------------------------------
+# analysis benchmark (fan-out vs single-call batch mode)
+# ------------------------------------------------------------
+@main.command("benchmark-analysis")
+@click.argument("image", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--env",
+    default="development",
+    type=click.Choice(["development", "production"]),
+    help="Environment to run in.",
+)
+@click.option(
+    "--type",
+    "analysis_type",
+    default="short",
+    type=click.Choice(["short", "long"]),
+    help="Analysis type.",
+)
+@click.option("--runs", default=3, type=int, help="Analyses per mode.")
+def benchmark_analysis(image, env, analysis_type, runs):
+    """Compare latency and Groq request usage of the fanout and batch analysis modes."""
+    os.environ["APP_ENV"] = env  # ← set BEFORE app imports
+    from pathlib import Path
+
+    from services.threaded import benchmark_modes
+    from utils.image_payload import prepare_image_payload
+
+    payload = prepare_image_payload(Path(image).read_bytes(), site="benchmark")
+    report = benchmark_modes(payload, analysis_type, max(1, runs))
+    for mode, row in report.items():
+        click.echo(
+            f"{mode:>7}: first {row['first_ms']:.0f} ms, all {row['complete_ms']:.0f} ms, "
+            f"{row['requests']:g} requests, {row['tokens']:g} tokens, "
+            f"{row['upload_bytes']} bytes uploaded, "
+            f"{row['missing_variations']:g} missing variations"
+        )
+
+
 # ------------------------------------------------------------
 # Entry point for poetry / `fabric` script
 # ------------------------------------------------------------
@@ -28,6 +28,83 @@ TABLE_NAME = "tz-fabric-table"
 MCP_URL = "http://localhost:8002/mcp/sse?transport=sse"
 ALLOWED_EXTENSIONS: set[str] = {"jpg", "jpeg", "png", "webp", "avif", "bmp"}
 
+# search result cache (full ranked list per query, pages are sliced from memory)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "600"))
+
+# Groq (OpenAI-compatible) LLM gateway; point GROQ_BASE_URL at a local fake for tests
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+GROQ_VISION_MODEL = os.getenv(
+    "GROQ_VISION_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct"
+)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+# requests per minute across all callers (0 = unlimited) and the allowed burst
+LLM_RPM = float(os.getenv("LLM_RPM", "0"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+
+# fabric Q&A replies cached by normalized prompt; LLM_CACHE_DISK adds a shared disk tier
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2048"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+LLM_CACHE_DISK = os.getenv("LLM_CACHE_DISK", "false").lower() == "true"
+
+# images sent to the vision LLM: longest side, JPEG quality and encoded-payload cache
+VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "1024"))
+VISION_JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "80"))
+PAYLOAD_CACHE_SIZE = int(os.getenv("PAYLOAD_CACHE_SIZE", "64"))
+PAYLOAD_CACHE_TTL = int(os.getenv("PAYLOAD_CACHE_TTL", "900"))
+
+# default /analyse mode: "fanout" (a request per variation) or "batch" (one JSON request)
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "fanout")
+
+# analysis results (variations per cache key): "memory" per process or "disk" shared
+ANALYSIS_STORE = os.getenv("ANALYSIS_STORE", "memory")
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "1024"))
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", str(60 * 60)))
+ANALYSIS_CACHE_BYTES = int(os.getenv("ANALYSIS_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# vision calls of all analyses: concurrent Groq requests and waiting calls before a 503
+ANALYSIS_MAX_IN_FLIGHT = int(os.getenv("ANALYSIS_MAX_IN_FLIGHT", "6"))
+ANALYSIS_MAX_QUEUE = int(os.getenv("ANALYSIS_MAX_QUEUE", "120"))
+
+# SigLIP micro-batching for concurrent query encodes
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "16"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+
+# bounded pool for the blocking part of /search (queue beyond the limit gets a 503)
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "4"))
+SEARCH_MAX_QUEUE = int(os.getenv("SEARCH_MAX_QUEUE", "64"))
+
+# ANN index on the vector column (IVF_PQ or IVF_HNSW_SQ); 0 picks a size-based default
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "IVF_PQ")
+VECTOR_INDEX_METRIC = os.getenv("VECTOR_INDEX_METRIC", "l2")
+VECTOR_INDEX_PARTITIONS = int(os.getenv("VECTOR_INDEX_PARTITIONS", "0"))
+VECTOR_INDEX_SUB_VECTORS = int(os.getenv("VECTOR_INDEX_SUB_VECTORS", "0"))
+VECTOR_INDEX_MIN_ROWS = int(os.getenv("VECTOR_INDEX_MIN_ROWS", "5000"))
+VECTOR_INDEX_REFRESH_ROWS = int(os.getenv("VECTOR_INDEX_REFRESH_ROWS", "1000"))
+SEARCH_NPROBES = int(os.getenv("SEARCH_NPROBES", "20"))
+SEARCH_REFINE_FACTOR = int(os.getenv("SEARCH_REFINE_FACTOR", "0"))
+
+# images embedded and written per batch when (re)building the table
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+# upsert on hash when appending during updates, so duplicates never land in the table
+DEDUP_ON_INSERT = os.getenv("DEDUP_ON_INSERT", "false").lower() == "true"
+# threads hashing local images (0 = based on CPU count)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "0"))
+# concurrent S3 list calls; SHARDS also splits categories into sub-folder listings
+S3_LIST_WORKERS = int(os.getenv("S3_LIST_WORKERS", "8"))
+S3_LIST_SHARDS = os.getenv("S3_LIST_SHARDS", "false").lower() == "true"
+
+# background table jobs: per-table lock lifetime (re-armed while the job runs)
+# and how long job records are kept
+JOB_LOCK_TTL = int(os.getenv("JOB_LOCK_TTL", str(15 * 60)))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(7 * 24 * 60 * 60)))
+
+# local image features for the Chroma media index ("histogram" keeps the fabric collection)
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "histogram")
+
 
 print(f"Running in {ENVIRONMENT} environment")
 
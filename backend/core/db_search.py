@@ -2,6 +2,7 @@
 from datetime import datetime
 from typing import Any, Mapping, Sequence, cast
 
+import numpy as np
 from chromadb.api.models.Collection import Collection
 
 
@@ -15,7 +16,7 @@ def _ts(iso: str | None) -> float:
 
 
 def topk_search(
-    collection: Collection, embedding: list[float], k: int = 10
+    collection: Collection, embedding: Sequence[float] | np.ndarray, k: int = 10
 ) -> dict[str, Any]:
     topN = min(max(k * 10, 100), 500)
 
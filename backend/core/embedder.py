@@ -1,9 +1,10 @@
-import io
-from typing import Any, List
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import numpy as np
 from PIL import Image
 
+from constants import EMBEDDER_BACKEND
+from utils.image_loader import FEATURE_SIDE, load_image
 
 # Explicit annotation so mypy knows this name may hold different runtime types.
 Resampling: Any
@@ -18,28 +19,115 @@ except AttributeError:
 
     Resampling = _ResamplingFallback  # type: ignore[assignment]
 
+# JPEGs are decoded at the smallest DCT scale that still covers this size
+DRAFT_SIZE = FEATURE_SIDE
 
-def _rgb_hist(img_rgb: Image.Image, bins: int = 8) -> np.ndarray:
-    arr = np.asarray(img_rgb, dtype=np.uint8)
-    feats = []
-    for c in range(3):
-        hist, _ = np.histogram(arr[..., c], bins=bins, range=(0, 256))
-        feats.append(hist.astype(np.float32))
-    return np.concatenate(feats, axis=0)
+DEFAULT_BACKEND = "histogram"
 
 
-def _gray_thumbnail(img_rgb: Image.Image, size: int = 16) -> np.ndarray:
-    gray = img_rgb.convert("L").resize((size, size), resample=Resampling.BILINEAR)
-    arr = np.asarray(gray, dtype=np.float32)
-    return arr.flatten()
+def decode_for_features(b: bytes, size: int = DRAFT_SIZE) -> Tuple[np.ndarray, float]:
+    """Decode image bytes to an RGB uint8 array at reduced resolution.
 
+    Returns the array and the ratio of original to decoded pixels, so pixel
+    counts taken on the small image can be scaled back to the full image.
+    """
+    img = load_image(b, max_side=size, site="embedder", resize=False)
+    width, height = img.info["source_size"]
+    arr = np.asarray(img, dtype=np.uint8)
+    return arr, (width * height) / float(arr.shape[0] * arr.shape[1])
 
-def embed_image_bytes(b: bytes) -> List[float]:
-    img = Image.open(io.BytesIO(b)).convert("RGB")
 
-    g = _gray_thumbnail(img)
-    h = _rgb_hist(img)
-    vec = np.concatenate([g, h]).astype(np.float32)  # (280,)
+def _gray_thumbnail(arr: np.ndarray, size: int = 16) -> np.ndarray:
+    gray = Image.fromarray(arr).convert("L")
+    gray = gray.resize((size, size), resample=Resampling.BILINEAR)
+    return np.asarray(gray, dtype=np.float32).ravel()
 
-    n = np.linalg.norm(vec) + 1e-8
-    return (vec / n).astype(np.float32).tolist()
+
+def _channel_hist(arr: np.ndarray, bins: int = 8) -> np.ndarray:
+    # one bincount over all channels: bin index per value, offset per channel
+    shift = 8 - int(np.log2(bins))
+    idx = (arr >> shift).astype(np.intp) + np.arange(3, dtype=np.intp) * bins
+    return np.bincount(idx.ravel(), minlength=3 * bins).astype(np.float32)
+
+
+def _joint_hist(arr: np.ndarray, bins: int = 8) -> np.ndarray:
+    shift = 8 - int(np.log2(bins))
+    q = (arr >> shift).astype(np.intp)
+    idx = (q[..., 0] * bins + q[..., 1]) * bins + q[..., 2]
+    return np.bincount(idx.ravel(), minlength=bins**3).astype(np.float32)
+
+
+class HistogramBackend:
+    """16x16 gray thumbnail + 8-bin per-channel RGB histogram (280-d).
+
+    This is the layout of the vectors already stored in the ``fabric`` collection.
+    Histogram counts are scaled to the original pixel count so vectors computed
+    from a draft decode match those of a full decode.
+    """
+
+    name = DEFAULT_BACKEND
+    dims = 280
+
+    def features(self, arr: np.ndarray, scale: float) -> np.ndarray:
+        return np.concatenate([_gray_thumbnail(arr), _channel_hist(arr) * scale])
+
+
+class JointHistogramBackend:
+    """16x16 gray thumbnail + 512-bin joint RGB histogram (768-d).
+
+    Joint colour bins separate fabrics whose per-channel histograms coincide.
+    """
+
+    name = "joint_histogram"
+    dims = 768
+
+    def features(self, arr: np.ndarray, scale: float) -> np.ndarray:
+        return np.concatenate([_gray_thumbnail(arr), _joint_hist(arr) * scale])
+
+
+_BACKENDS: Dict[str, Any] = {}
+
+
+def register_backend(backend: Any) -> None:
+    """Register a feature backend (an object with ``name``, ``dims`` and ``features``)."""
+    _BACKENDS[backend.name] = backend
+
+
+def get_backend(name: Optional[str] = None) -> Any:
+    """Return a registered backend; defaults to EMBEDDER_BACKEND."""
+    key = name or EMBEDDER_BACKEND
+    if key not in _BACKENDS:
+        raise ValueError(f"Unknown embedder backend: {key}")
+    return _BACKENDS[key]
+
+
+def collection_name(backend: Optional[str] = None) -> str:
+    """Chroma collection for a backend; only the default shares ``fabric``."""
+    name = get_backend(backend).name
+    return "fabric" if name == DEFAULT_BACKEND else f"fabric_{name}"
+
+
+register_backend(HistogramBackend())
+register_backend(JointHistogramBackend())
+
+
+def embed_images(images: Sequence[bytes], backend: Optional[str] = None) -> np.ndarray:
+    """Embed a batch of encoded images.
+
+    Returns:
+        np.ndarray: float32 array of shape (len(images), dims), L2-normalized rows.
+    """
+    impl = get_backend(backend)
+    if not images:
+        return np.zeros((0, impl.dims), dtype=np.float32)
+
+    feats = np.stack([impl.features(*decode_for_features(b)) for b in images]).astype(
+        np.float32
+    )
+    norms = np.linalg.norm(feats, axis=1, keepdims=True) + 1e-8
+    return feats / norms
+
+
+def embed_image_bytes(b: bytes, backend: Optional[str] = None) -> np.ndarray:
+    """Embed a single encoded image (float32 vector)."""
+    return embed_images([b], backend)[0]
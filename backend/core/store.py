@@ -1,6 +1,10 @@
+from typing import Dict, Optional
+
 import chromadb
 from chromadb.api.models.Collection import Collection
 
+from core.embedder import collection_name
+
 client = chromadb.PersistentClient(path="./vector_store")
 
 
@@ -8,9 +12,17 @@ collection: Collection = client.get_or_create_collection(
     "fabric", metadata={"hnsw:space": "cosine"}
 )
 
+_collections: Dict[str, Collection] = {"fabric": collection}
+
 
-def get_index() -> Collection:
-    return collection
+def get_index(backend: Optional[str] = None) -> Collection:
+    """Collection holding the vectors of an embedder backend (default: ``fabric``)."""
+    name = collection_name(backend)
+    if name not in _collections:
+        _collections[name] = client.get_or_create_collection(
+            name, metadata={"hnsw:space": "cosine"}
+        )
+    return _collections[name]
 
 
 def reindex():
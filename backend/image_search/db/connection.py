@@ -23,6 +23,9 @@ class TTLCache:
     def put(self, key, value):
         self.cache[key] = (value, time.time())
 
+    def pop(self, key):
+        self.cache.pop(key, None)
+
 
 # Create cache instances
 _db_cache = TTLCache(ttl=180)
@@ -61,9 +64,37 @@ def get_table(database: str, table_name: str, max_retries=5, delay=0.5):
     raise RuntimeError(f"Failed to load table {table_name} after {max_retries} retries")
 
 
-def warm_up_table_model(table):
+def invalidate_table(database: str, table_name: str) -> None:
+    """Drop the cached table handle so the next get_table sees a rebuilt table."""
+    _table_cache.pop(f"{database}:{table_name}")
+
+
+# "database:table" keys whose embedding model and ANN path have been warmed up
+_warm_tables: set[str] = set()
+
+
+def warm_up_table_model(table) -> bool:
     try:
         _ = table.search("warmup").limit(1).to_list()
         logThis.info("Table  warmed up")
+        return True
     except Exception as e:
         logThis.info(f"Model warm-up failed: {e}")
+        return False
+
+
+def warm_up_table(database: str, table_name: str):
+    """Open the table and run one warm-up query, recording readiness on success.
+
+    Meant to run once at startup; the warm-up is skipped if the table is already warm.
+    """
+    table = get_table(database, table_name)
+    key = f"{database}:{table_name}"
+    if key not in _warm_tables and warm_up_table_model(table):
+        _warm_tables.add(key)
+    return table
+
+
+def is_table_ready(database: str, table_name: str) -> bool:
+    """Whether the startup warm-up for the table has completed."""
+    return f"{database}:{table_name}" in _warm_tables
@@ -1,16 +1,35 @@
-import hashlib
 import logging
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional, Type
+from itertools import chain
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Tuple, Type
 from urllib.parse import urlparse
 
 import lancedb
 import pandas as pd
-from image_search.schema import Fabric
+from image_search.db.filters import in_predicate
+from image_search.db.metadata import read_metadata, table_summary
+from image_search.db.ingest import IngestCheckpoint, SyncMarker, batched
+from image_search.db.s3_listing import iter_s3_objects
+from image_search.db.scanner import scan_local_images
+from image_search.db.indexes import (
+    build_scalar_indexes,
+    build_vector_index,
+    refresh_vector_index,
+)
 from utils.aws_helper import generate_cdn_url, s3_client as s3
-from constants import ALLOWED_EXTENSIONS
+from constants import (
+    DEDUP_ON_INSERT,
+    INGEST_BATCH_SIZE,
+    S3_LIST_SHARDS,
+    S3_LIST_WORKERS,
+)
 from utils.messages import TABLE_MESSAGES
 
+if TYPE_CHECKING:
+    # the schema module loads the SigLIP model; it is only needed for annotations
+    from image_search.schema import Fabric
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,62 +40,26 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
-def validate_file_path(file_path: str) -> bool:
-    """Validate that the file path is a local file or an HTTP/HTTPS URL.
-
-    Args:
-        file_path (str): The file path to validate.
+ALLOWED_ROOTS = {"stock", "fabric", "design", "product"}
 
-    Returns:
-        bool: True if the file path is valid, False otherwise.
-    """
-    if file_path.startswith(("http://", "https://")):
-        return True
-    if Path(file_path).exists():
-        return True
-    return False
 
+def _no_progress(**counts) -> None:
+    pass
 
-def get_file_info(image_path: str) -> Optional[Dict[Any, Any]]:
-    """Compute the SHA256 hash and modification time of an image.
 
-    Args:
-        image_path (str): The path to the image file.
-
-    Returns:
-        Optional[Dict[Any, Any]]: A dictionary containing the hash and modification time,
-                                  or None if the file cannot be processed.
+def iter_image_data(
+    root_folder: str,
+    start_after: Optional[str] = None,
+    since: Optional[float] = None,
+    s3_client=None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream ``(scan_key, image_info)`` pairs from local or S3, in ascending key order.
+
+    The scan key is the S3 object key or the local file path. Keys up to and
+    including ``start_after`` are skipped before anything is hashed, which is
+    how an interrupted build resumes. With ``since`` only images modified after
+    that timestamp are returned (incremental sync).
     """
-    if not validate_file_path(image_path):
-        logger.warning(
-            TABLE_MESSAGES.warnings.invalid_file_path.format(path=image_path)
-        )
-        return None
-
-    hasher = hashlib.sha256()
-    path = Path(image_path)
-
-    try:
-        with path.open("rb") as f:
-            while chunk := f.read(8192):
-                hasher.update(chunk)
-
-        mtime = path.stat().st_mtime
-        return {"hash": hasher.hexdigest(), "mtime": mtime}
-    except Exception as e:
-        logger.error(
-            TABLE_MESSAGES.errors.file_processing.format(path=image_path, error=str(e))
-        )
-        return None
-
-
-ALLOWED_ROOTS = {"stock", "fabric", "design", "product"}
-
-
-def collect_image_data(root_folder: str) -> list:
-    """Collect image info from local or S3, supports nested folders."""
-    image_data = []
-
     if root_folder.startswith("s3://"):
         parsed = urlparse(root_folder)
         print(f"Parsed S3 URI: {parsed}")
@@ -86,24 +69,23 @@ def collect_image_data(root_folder: str) -> list:
         if not base_prefix.endswith("/"):
             base_prefix += "/"
 
-        paginator = s3.get_paginator("list_objects_v2")
-
-        for category in ALLOWED_ROOTS:
-            prefix = f"{base_prefix}{category}/"
-
-            for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
-                for obj in page.get("Contents", []):
-                    key = obj["Key"]
-
-                    if key.lower().endswith(tuple(ALLOWED_EXTENSIONS)):
-                        image_data.append(
-                            {
-                                "image_uri": generate_cdn_url(key),
-                                "tag": category,
-                                "hash": obj["ETag"].strip('"'),
-                                "mtime": obj["LastModified"].timestamp(),
-                            }
-                        )
+        for category, obj in iter_s3_objects(
+            s3_client or s3,
+            bucket_name,
+            base_prefix,
+            ALLOWED_ROOTS,
+            start_after=start_after,
+            since=since,
+            shards=S3_LIST_SHARDS,
+            max_workers=S3_LIST_WORKERS,
+        ):
+            key = obj["Key"]
+            yield key, {
+                "image_uri": generate_cdn_url(key),
+                "tag": category,
+                "hash": obj["ETag"].strip('"'),
+                "mtime": obj["LastModified"].timestamp(),
+            }
 
     else:
         root_path = Path(root_folder).expanduser()
@@ -112,60 +94,114 @@ def collect_image_data(root_folder: str) -> list:
         if root_name not in ALLOWED_ROOTS:
             raise ValueError(f"Invalid root folder: {root_name}")
 
-        for ext in ALLOWED_EXTENSIONS:
-            for img_path in root_path.rglob(f"*.{ext}"):
-                file_info = get_file_info(str(img_path))
-                if file_info:
-                    image_data.append(
-                        {
-                            "image_uri": str(img_path),
-                            "hash": file_info["hash"],
-                            "mtime": file_info["mtime"],
-                        }
-                    )
+        for img_path, file_info in scan_local_images(root_path, start_after):
+            if since is not None and file_info["mtime"] <= since:
+                continue
+            yield img_path, {
+                "image_uri": img_path,
+                "tag": root_name,
+                "hash": file_info["hash"],
+                "mtime": file_info["mtime"],
+            }
 
-    return image_data
+
+def collect_image_data(root_folder: str, since: Optional[float] = None) -> list:
+    """Collect image info from local or S3, supports nested folders."""
+    return [info for _, info in iter_image_data(root_folder, since=since)]
 
 
 def deduplicate_table_by_hash(table):
     """Remove duplicate entries in the table based on the 'hash' column.
     Keep the entry with the most recent modification time.
 
+    Only ``hash``, ``image_uri`` and ``mtime`` are read; the losers are found in
+    one vectorized pass and removed with a single delete by row id.
+
     Args:
         table: The LanceDB table to deduplicate.
     """
     logger.info(TABLE_MESSAGES.info.checking_duplicates)
-    df = table.to_pandas()
 
-    if "hash" not in df.columns or "mtime" not in df.columns:
+    if not {"hash", "mtime"}.issubset(table.schema.names):
         logger.error(TABLE_MESSAGES.errors.missing_columns)
         return
 
-    # For each hash, keep only the row with the most recent mtime
-    duplicates = df[df.duplicated(subset="hash", keep=False)]
-    if duplicates.empty:
+    df = read_metadata(table, ["hash", "image_uri", "mtime"], with_row_id=True)
+
+    # Newest first, so every later row of the same hash is a loser
+    ordered = df.sort_values(["hash", "mtime"], ascending=[True, False], kind="stable")
+    losers = ordered[ordered.duplicated(subset="hash", keep="first")]
+    if losers.empty:
         logger.info(TABLE_MESSAGES.info.no_duplicates)
         return
 
-    # Group by hash and find entries to remove
-    for hash_value in duplicates["hash"].unique():
-        hash_group = df[df["hash"] == hash_value].sort_values("mtime", ascending=False)
-        if len(hash_group) > 1:
-            # Keep the most recent entry, delete others
-            entries_to_remove = hash_group.iloc[1:]
-            for _, row in entries_to_remove.iterrows():
-                table.delete(
-                    f"hash == '{row['hash']}' and image_uri == '{row['image_uri']}'"
-                )
-                logger.info(
-                    TABLE_MESSAGES.info.removed_duplicate.format(uri=row["image_uri"])
-                )
-    logger.info(TABLE_MESSAGES.info.duplicates_removed)
+    row_ids = ", ".join(str(int(row_id)) for row_id in losers["_rowid"])
+    table.delete(f"_rowid IN ({row_ids})")
+    for uri in losers["image_uri"]:
+        logger.debug(TABLE_MESSAGES.info.removed_duplicate.format(uri=uri))
+    logger.info(TABLE_MESSAGES.info.duplicates_removed.format(count=len(losers)))
+
+
+def append_images(table, df: pd.DataFrame) -> None:
+    """Append image rows, or upsert them on ``hash`` when DEDUP_ON_INSERT is set.
+
+    The upsert keeps one row per content hash at write time: an incoming image
+    replaces a stored one with the same hash only if it is newer.
+    """
+    if not DEDUP_ON_INSERT:
+        table.add(df)
+        return
 
+    df = df.sort_values("mtime", ascending=False).drop_duplicates("hash")
+    (
+        table.merge_insert("hash")
+        .when_matched_update_all(where="target.mtime < source.mtime")
+        .when_not_matched_insert_all()
+        .execute(df)
+    )
+
+
+def normalize_keys(uris: pd.Series) -> pd.Series:
+    """Strip everything up to ``uploaded/`` from a column of image URIs."""
+    return uris.astype(str).str.split("uploaded/", n=1).str[-1]
+
+
+def unique_images(image_data: list) -> pd.DataFrame:
+    """Drop images whose content hash was already seen, keeping the newest copy.
+
+    Args:
+        image_data (list): A list of image metadata dictionaries.
 
-def create_table(db, table_name: str, schema: Type[Fabric], image_data: list):
+    Returns:
+        pd.DataFrame: One row per distinct hash, in scan order.
+    """
+    df = pd.DataFrame(image_data)
+    newest = df.sort_values("mtime", ascending=False, kind="stable")
+    keep = newest.drop_duplicates("hash", keep="first").index
+    return df.loc[df.index.isin(keep)].reset_index(drop=True)
+
+
+def embed_images(df: pd.DataFrame, schema: Type["Fabric"]) -> pd.DataFrame:
+    """Compute the schema's embedding columns from the (original) source URIs.
+
+    Embedding up front lets ``image_uri`` be rewritten before the single write;
+    LanceDB leaves a vector column that is already filled untouched.
+    """
+    for config in schema.parse_embedding_functions():
+        vectors = config.function.compute_source_embeddings_with_retry(
+            df[config.source_column].tolist()
+        )
+        df[config.vector_column] = list(vectors)
+    return df
+
+
+def create_table(db, table_name: str, schema: Type["Fabric"], image_data: list):
     """Create a new table with the given image data.
 
+    Images are de-duplicated by hash before embedding, so each distinct image is
+    embedded once, and the table is written in a single pass. An existing table
+    of the same name is replaced by a new version.
+
     Args:
         db: The LanceDB database connection.
         table_name (str): The name of the table to create.
@@ -176,87 +212,230 @@ def create_table(db, table_name: str, schema: Type[Fabric], image_data: list):
         The created LanceDB table.
     """
     logger.info(TABLE_MESSAGES.info.creating_table.format(table_name=table_name))
-    table = db.create_table(table_name, schema=schema, mode="overwrite")
+    if not image_data:
+        logger.warning(TABLE_MESSAGES.warnings.no_images_to_add)
+        return db.create_table(table_name, schema=schema, mode="overwrite")
 
-    if image_data:
-        logger.info(TABLE_MESSAGES.info.adding_images.format(count=len(image_data)))
-        table.add(pd.DataFrame(image_data))
-        df = table.to_pandas()
+    df = unique_images(image_data)
+    if len(df) < len(image_data):
+        logger.info(
+            TABLE_MESSAGES.info.skipped_duplicates.format(
+                count=len(image_data) - len(df)
+            )
+        )
 
-        # modify column
-        df["image_uri"] = df["image_uri"].str.replace(r".*uploaded/", "", regex=True)
+    logger.info(TABLE_MESSAGES.info.adding_images.format(count=len(df)))
+    df = embed_images(df, schema)
+    df["image_uri"] = normalize_keys(df["image_uri"])
 
-        # recreate table with vectors still inside df
-        db.drop_table(table_name)
+    table = db.create_table(table_name, data=df, schema=schema, mode="overwrite")
+    logger.info(TABLE_MESSAGES.info.images_added)
+    return table
 
-        table = db.create_table(
-            table_name,
-            data=df,
-            schema=schema,
-        )
 
-        logger.info(TABLE_MESSAGES.info.images_added)
-        deduplicate_table_by_hash(table)
+def ingest_table(
+    db,
+    table_name: str,
+    schema: Type["Fabric"],
+    root_folder: str,
+    resume: bool = True,
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[..., None]] = None,
+):
+    """Build a table by streaming the catalogue through fixed-size embedding batches.
+
+    Only one batch of rows and vectors is held in memory. The first batch
+    creates the table with ``create_table`` and later batches are appended, so
+    every row is written once. Rebuilding an existing table writes new versions
+    of it in place: open search handles stay on the version they loaded until
+    the job reports completion, and a failed build restores the version it
+    started from (a metadata-only commit). After every batch the last scan key
+    and table version are checkpointed, so if an interrupted build of the same
+    root folder is started again it checks that version out and continues where
+    it stopped (``resume``) instead of embedding everything again.
+
+    Args:
+        db: The LanceDB database connection.
+        table_name (str): The name of the table to build.
+        schema (Fabric): The schema to use for the table.
+        root_folder (str): The root folder (local or s3://) containing images.
+        resume (bool): Continue an interrupted build if there is one.
+        batch_size (int, optional): Images per batch. Defaults to INGEST_BATCH_SIZE.
+        progress (Callable, optional): Called with count increments
+            (``scanned``, ``embedded``, ``written``) as batches complete.
+
+    Returns:
+        The LanceDB table, or None if no images were found.
+    """
+    progress = progress or _no_progress
+    checkpoint = IngestCheckpoint(db, table_name)
+    table_exists = table_name in db.table_names()
+    state = checkpoint.resumable(root_folder) if resume and table_exists else None
+
+    start_after = state["last_key"] if state else None
+    rows = state["rows"] if state else 0
+    batches = batched(
+        iter_image_data(root_folder, start_after), batch_size or INGEST_BATCH_SIZE
+    )
+
+    first = next(batches, None)
+    if first is None and state is None:
+        logger.error(TABLE_MESSAGES.errors.no_images_found)
+        return None
+
+    table = None
+    base_version = None
+    seen: set = set()
+    if state:
+        logger.info(
+            TABLE_MESSAGES.info.resuming_ingest.format(key=start_after, count=rows)
+        )
+        table = db.open_table(table_name)
+        if table.version != state["version"]:
+            # the failed build was rolled back; bring its rows back
+            table.restore(state["version"])
+        base_version = state["base_version"]
+        seen = set(read_metadata(table, ["hash"])["hash"])
     else:
-        logger.warning(TABLE_MESSAGES.warnings.no_images_to_add)
+        checkpoint.clear()
+        if table_exists:
+            base_version = db.open_table(table_name).version
+            logger.info(
+                TABLE_MESSAGES.info.rebuilding_table.format(
+                    table_name=table_name, version=base_version
+                )
+            )
 
+    try:
+        for batch in chain([first] if first else [], batches):
+            # hashes already written (earlier batches, or a batch re-read on resume)
+            progress(scanned=len(batch))
+            fresh = [info for _, info in batch if info["hash"] not in seen]
+            if fresh:
+                if table is None:
+                    table = create_table(db, table_name, schema, fresh)
+                    written = table.count_rows()
+                else:
+                    df = unique_images(fresh)
+                    df = embed_images(df, schema)
+                    df["image_uri"] = normalize_keys(df["image_uri"])
+                    table.add(df)
+                    written = len(df)
+                seen.update(info["hash"] for info in fresh)
+                rows += written
+                progress(embedded=written, written=written)
+
+            if table is not None:
+                checkpoint.save(
+                    root_folder, batch[-1][0], rows, table.version, base_version
+                )
+            logger.info(TABLE_MESSAGES.info.ingested_batch.format(count=rows))
+    except BaseException:
+        if table is not None and base_version is not None:
+            logger.warning(
+                TABLE_MESSAGES.warnings.rolling_back.format(
+                    table_name=table_name, version=base_version
+                )
+            )
+            table.restore(base_version)
+        raise
+
+    checkpoint.clear()
+    logger.info(TABLE_MESSAGES.info.images_added)
     return table
 
 
-def normalize_key(uri: str) -> str:
-    if "uploaded/" in uri:
-        return uri.split("uploaded/")[1]
-    return uri
+def diff_image_sets(
+    existing_df: pd.DataFrame, current_df: pd.DataFrame, keep_missing: bool = False
+):
+    """Compare table rows against scanned images by normalized key.
+
+    Both sides are keyed once and joined with a single outer merge, so the cost
+    is linear in the catalogue size.
 
+    Args:
+        existing_df (pd.DataFrame): Rows in the table (``image_uri`` and ``hash``).
+        current_df (pd.DataFrame): Scanned image metadata.
+        keep_missing (bool): ``current_df`` is a partial (incremental) scan, so
+            rows missing from it are kept.
 
-def update_existing_table(table, current_images: list):
+    Returns:
+        tuple: (rows to add as a DataFrame, stored ``image_uri`` values to delete,
+        counts of added / changed / removed keys).
+    """
+    existing = existing_df[["image_uri", "hash"]].assign(
+        key=normalize_keys(existing_df["image_uri"])
+    )
+    current = current_df.assign(key=normalize_keys(current_df["image_uri"]))
+    current = current.drop_duplicates("key", keep="last")
+
+    merged = current[["key", "hash"]].merge(
+        existing.drop_duplicates("key", keep="last")[["key", "hash"]],
+        on="key",
+        how="outer",
+        suffixes=("", "_old"),
+        indicator=True,
+    )
+    added = merged.loc[merged["_merge"] == "left_only", "key"]
+    changed = merged.loc[
+        (merged["_merge"] == "both") & (merged["hash"] != merged["hash_old"]), "key"
+    ]
+    removed = merged.loc[merged["_merge"] == "right_only", "key"]
+    if keep_missing:
+        removed = removed.iloc[:0]
+
+    to_add = current[current["key"].isin(set(added) | set(changed))]
+    stale = existing.loc[
+        existing["key"].isin(set(changed) | set(removed)), "image_uri"
+    ].unique()
+
+    counts = {"added": len(added), "changed": len(changed), "removed": len(removed)}
+    return to_add.drop(columns="key"), list(stale), counts
+
+
+def update_existing_table(
+    table,
+    current_images: list,
+    incremental: bool = False,
+    progress: Optional[Callable[..., None]] = None,
+):
     """Update an existing table with new or modified image data.
 
+    Stale rows (changed or missing images) are removed with one ``IN`` delete and
+    new or changed images are embedded and appended in INGEST_BATCH_SIZE batches.
+
     Args:
         table: The LanceDB table to update.
         current_images (list): A list of image metadata dictionaries.
+        incremental (bool): ``current_images`` only holds recently modified
+            images; nothing is removed for being absent.
+        progress (Callable, optional): Called with ``total`` (images to embed) and
+            count increments (``deleted``, ``embedded``, ``written``).
     """
-    existing_data = table.to_pandas()
+    progress = progress or _no_progress
+    existing_data = read_metadata(table, ["image_uri", "hash"])
 
-    # Convert current images to a DataFrame for easier comparison
-    current_df = pd.DataFrame(current_images)
-
-    # Find new or modified images
-    new_or_modified = []
-    for _, row in current_df.iterrows():
-        row_key = normalize_key(row["image_uri"])
-
-        existing_row = existing_data[
-            existing_data["image_uri"].apply(normalize_key) == row_key
-        ]
+    to_add, stale_uris, counts = diff_image_sets(
+        existing_data, pd.DataFrame(current_images), keep_missing=incremental
+    )
+    logger.info(TABLE_MESSAGES.info.sync_summary.format(**counts))
+    progress(total=len(to_add))
 
-        if existing_row.empty or (
-            not existing_row.empty and existing_row.iloc[0]["hash"] != row["hash"]
-        ):
-            new_or_modified.append(row.to_dict())
-            if not existing_row.empty:
-                # Delete the old entry if it exists
-                table.delete(f"hash == '{row['hash']}'")
-
-    # Add new or modified images
-    if new_or_modified:
-        table.add(pd.DataFrame(new_or_modified))
+    # Delete first: a changed image keeps its URI, so its new row must survive
+    if stale_uris:
+        table.delete(in_predicate("image_uri", stale_uris))
+        progress(deleted=len(stale_uris))
         logger.info(
-            TABLE_MESSAGES.info.added_modified_images.format(count=len(new_or_modified))
+            TABLE_MESSAGES.info.removed_missing_images.format(count=len(stale_uris))
         )
 
-    # Remove entries for missing images
-    current_uris = set(current_df["image_uri"].apply(normalize_key))
-    existing_uris = set(existing_data["image_uri"].apply(normalize_key))
-
-    missing_uris = existing_uris - current_uris
-
-    if missing_uris:
-        for uri in missing_uris:
-            table.delete(f"image_uri == '{uri}'")
-        logger.info(
-            TABLE_MESSAGES.info.removed_missing_images.format(count=len(missing_uris))
-        )
+    for start in range(0, len(to_add), INGEST_BATCH_SIZE):
+        batch = to_add.iloc[start : start + INGEST_BATCH_SIZE]
+        # LanceDB embeds on add, so a batch is embedded and written together
+        append_images(table, batch)
+        progress(embedded=len(batch), written=len(batch))
+    if not to_add.empty:
+        logger.info(TABLE_MESSAGES.info.added_modified_images.format(count=len(to_add)))
 
     deduplicate_table_by_hash(table)
 
@@ -265,8 +444,11 @@ def process_table(
     database: str,
     table_name: str,
     root_folder: str,
-    schema: Type[Fabric],
+    schema: Type["Fabric"],
     force: bool = False,
+    resume: bool = True,
+    incremental: bool = False,
+    progress: Optional[Callable[..., None]] = None,
 ):
     """Process images and manage the database table.
 
@@ -276,7 +458,14 @@ def process_table(
         root_folder (str): The root folder containing images.
         schema (Fabric): The schema to use for the table.
         force (bool): If True, force recreation of the table.
+        resume (bool): Continue an interrupted creation instead of starting over.
+        incremental (bool): On update, only scan images modified since the last
+            completed sync; removals are not detected in this mode.
+        progress (Callable, optional): Receives ``total`` (images expected to be
+            embedded, when known) and count increments (``scanned``, ``embedded``,
+            ``written``, ``deleted``), e.g. a background job's progress record.
     """
+    progress = progress or _no_progress
     logger.info(TABLE_MESSAGES.info.connecting)
 
     db = lancedb.connect(database)
@@ -296,33 +485,45 @@ def process_table(
         logger.info(TABLE_MESSAGES.info.processing_local)
 
     logger.info(TABLE_MESSAGES.info.scanning_directory.format(root_folder=root_folder))
-    current_images = collect_image_data(root_folder)
-
-    if not current_images:
-        logger.error(TABLE_MESSAGES.errors.no_images_found)
-        return
-
-    logger.info(TABLE_MESSAGES.info.found_images.format(count=len(current_images)))
+    sync_marker = SyncMarker(db, table_name)
+    scan_started = time.time()
 
     # Check if table exists
     table_exists = table_name in db.table_names()
     logger.info(TABLE_MESSAGES.info.table_exists_status.format(exists=table_exists))
+    # an interrupted build of the same folder is finished, not diffed as an update
+    rebuild = (
+        force
+        or not table_exists
+        or (resume and bool(IngestCheckpoint(db, table_name).resumable(root_folder)))
+    )
 
-    if force:
-        # Force create new table
+    if rebuild:
+        # (Re)build by streaming; an interrupted build of the same folder resumes
+        if not table_exists:
+            logger.info(TABLE_MESSAGES.info.table_not_exists)
         if table_exists:
-            logger.info(
-                TABLE_MESSAGES.info.dropping_table.format(table_name=table_name)
-            )
-            db.drop_table(table_name)
-        table = create_table(db, table_name, schema, current_images)
-
-    elif not table_exists:
-        # Create new table if it doesn't exist
-        logger.info(TABLE_MESSAGES.info.table_not_exists)
-        table = create_table(db, table_name, schema, current_images)
+            # the table being replaced is the best estimate of the work ahead
+            progress(total=db.open_table(table_name).count_rows())
+        table = ingest_table(
+            db, table_name, schema, root_folder, resume=resume, progress=progress
+        )
+        if table is None:
+            return
 
     else:
+        since = sync_marker.load() if incremental else None
+        if since is not None:
+            logger.info(TABLE_MESSAGES.info.incremental_scan.format(since=since))
+        current_images = collect_image_data(root_folder, since=since)
+
+        if not current_images and since is None:
+            logger.error(TABLE_MESSAGES.errors.no_images_found)
+            return
+
+        logger.info(TABLE_MESSAGES.info.found_images.format(count=len(current_images)))
+        progress(scanned=len(current_images))
+
         # Update existing table
         table = db.open_table(table_name)
         total_images = len(table)
@@ -330,8 +531,31 @@ def process_table(
             TABLE_MESSAGES.info.total_images_in_table.format(count=total_images)
         )
         logger.info(TABLE_MESSAGES.info.updating_table.format(table_name=table_name))
-        update_existing_table(table, current_images)
+        if current_images:
+            update_existing_table(
+                table, current_images, incremental=since is not None, progress=progress
+            )
+
+    sync_marker.save(scan_started)
+
+    # Keep the indexes in step: full build for new tables, incremental refresh otherwise
+    try:
+        build_scalar_indexes(table)
+        if rebuild:
+            build_vector_index(table)
+        else:
+            refresh_vector_index(table)
+    except Exception as e:
+        logger.error(TABLE_MESSAGES.errors.index_failed.format(error=str(e)))
 
     # Show final table preview
+    summary = table_summary(table)
+    logger.info(
+        TABLE_MESSAGES.info.final_summary.format(
+            rows=summary["rows"],
+            tags=summary["tags"],
+            indexes=", ".join(summary["indexes"]) or "none",
+        )
+    )
     logger.info(TABLE_MESSAGES.info.final_preview)
-    print(table.to_pandas())
+    print(summary["sample"])
@@ -0,0 +1,26 @@
+from typing import Iterable
+
+
+def quote_literal(value) -> str:
+    """Render a value as a SQL string literal for LanceDB filters, escaping single quotes."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def in_predicate(column: str, values: Iterable) -> str:
+    """Compile values into an ``IN (...)`` filter on ``column`` with escaped literals.
+
+    Duplicates are dropped; a single value becomes a plain equality so the scalar
+    index on the column can answer it directly. Returns "" for no values.
+    """
+    unique = list(dict.fromkeys(str(v) for v in values))
+    if not unique:
+        return ""
+    if len(unique) == 1:
+        return f"{column} = {quote_literal(unique[0])}"
+    return f"{column} IN ({', '.join(quote_literal(v) for v in unique)})"
+
+
+def suffix_predicate(column: str, suffix: str) -> str:
+    """``column LIKE '%<suffix>'`` with ``%``, ``_`` and ``\\`` in the suffix matched literally."""
+    escaped = str(suffix).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{column} LIKE {quote_literal('%' + escaped)} ESCAPE '\\'"
@@ -0,0 +1,145 @@
+import logging
+import math
+from typing import List, Optional
+
+from lancedb.index import BTree, Bitmap, HnswSq, IvfPq
+
+from constants import (
+    VECTOR_INDEX_METRIC,
+    VECTOR_INDEX_MIN_ROWS,
+    VECTOR_INDEX_PARTITIONS,
+    VECTOR_INDEX_REFRESH_ROWS,
+    VECTOR_INDEX_SUB_VECTORS,
+    VECTOR_INDEX_TYPE,
+)
+from utils.messages import TABLE_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+VECTOR_COLUMN = "vector"
+
+# Low-cardinality category filter -> bitmap; near-unique content hash -> btree
+SCALAR_INDEXES = {"tag": Bitmap, "hash": BTree}
+
+
+def get_vector_index(table):
+    """Return the index config covering the vector column, or None."""
+    for index in table.list_indices():
+        if VECTOR_COLUMN in index.columns:
+            return index
+    return None
+
+
+def build_scalar_indexes(table, replace: bool = False) -> List[str]:
+    """Create the scalar indexes used by prefilters and hash lookups.
+
+    Existing indexes are kept (new rows are folded in by ``optimize``) unless
+    ``replace`` is set.
+
+    Returns:
+        List[str]: The columns that were (re)indexed.
+    """
+    columns = set(table.schema.names)
+    indexed = {c for index in table.list_indices() for c in index.columns}
+    built = []
+    for column, config in SCALAR_INDEXES.items():
+        if column not in columns or (column in indexed and not replace):
+            continue
+        logger.info(
+            TABLE_MESSAGES.info.building_scalar_index.format(
+                column=column, index_type=config.__name__
+            )
+        )
+        table.create_index(column, config=config(), replace=True)
+        built.append(column)
+    return built
+
+
+def build_vector_index(
+    table,
+    index_type: Optional[str] = None,
+    num_partitions: Optional[int] = None,
+    num_sub_vectors: Optional[int] = None,
+    force: bool = False,
+) -> bool:
+    """Train (or retrain) the ANN index on the vector column.
+
+    Tables below VECTOR_INDEX_MIN_ROWS keep exact flat search unless ``force`` is set.
+
+    Args:
+        table: The LanceDB table.
+        index_type (str, optional): "IVF_PQ" or "IVF_HNSW_SQ". Defaults to VECTOR_INDEX_TYPE.
+        num_partitions (int, optional): IVF partitions. Defaults to sqrt(rows).
+        num_sub_vectors (int, optional): PQ sub-vectors. Defaults to LanceDB's choice.
+        force (bool): Build even if the table is small.
+
+    Returns:
+        bool: True if an index was built.
+    """
+    rows = table.count_rows()
+    if rows < VECTOR_INDEX_MIN_ROWS and not force:
+        logger.info(
+            TABLE_MESSAGES.info.index_skipped.format(
+                count=rows, minimum=VECTOR_INDEX_MIN_ROWS
+            )
+        )
+        return False
+
+    index_type = (index_type or VECTOR_INDEX_TYPE).upper()
+    partitions = (
+        num_partitions or VECTOR_INDEX_PARTITIONS or max(1, int(math.sqrt(rows)))
+    )
+
+    config: IvfPq | HnswSq
+    if index_type == "IVF_PQ":
+        config = IvfPq(
+            distance_type=VECTOR_INDEX_METRIC,  # type: ignore[arg-type]
+            num_partitions=partitions,
+            num_sub_vectors=num_sub_vectors or VECTOR_INDEX_SUB_VECTORS or None,
+        )
+    elif index_type == "IVF_HNSW_SQ":
+        config = HnswSq(
+            distance_type=VECTOR_INDEX_METRIC,  # type: ignore[arg-type]
+            num_partitions=partitions,
+        )
+    else:
+        raise ValueError(f"Unsupported vector index type: {index_type}")
+
+    logger.info(
+        TABLE_MESSAGES.info.building_index.format(
+            index_type=index_type, partitions=partitions, count=rows
+        )
+    )
+    table.create_index(VECTOR_COLUMN, config=config, replace=True)
+    logger.info(TABLE_MESSAGES.info.index_built)
+    return True
+
+
+def refresh_vector_index(table, min_new_rows: Optional[int] = None) -> bool:
+    """Fold rows added since the last build into the vector index.
+
+    Runs an incremental ``optimize`` (no retraining) once at least ``min_new_rows``
+    (default VECTOR_INDEX_REFRESH_ROWS) rows are unindexed. Builds the index
+    instead if there is none yet and the table has grown large enough.
+
+    Returns:
+        bool: True if the index was built or refreshed.
+    """
+    index = get_vector_index(table)
+    if index is None:
+        return build_vector_index(table)
+
+    threshold = VECTOR_INDEX_REFRESH_ROWS if min_new_rows is None else min_new_rows
+    stats = table.index_stats(index.name)
+    unindexed = stats.num_unindexed_rows if stats else 0
+    if unindexed < threshold or unindexed == 0:
+        logger.info(
+            TABLE_MESSAGES.info.index_up_to_date.format(
+                count=unindexed, threshold=threshold
+            )
+        )
+        return False
+
+    logger.info(TABLE_MESSAGES.info.refreshing_index.format(count=unindexed))
+    table.optimize()
+    return True
@@ -0,0 +1,136 @@
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+
+from image_search.db.filters import quote_literal
+
+# sidecar table kept in the same database as the tables it describes, so every
+# host (and an s3:// DATABASE_PATH) sees the same checkpoints and sync markers
+STATE_TABLE = "_ingest_state"
+STATE_SCHEMA = pa.schema([pa.field("key", pa.string()), pa.field("value", pa.string())])
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List[Any]]:
+    """Yield lists of up to ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, max(1, size))):
+        yield batch
+
+
+class TableState:
+    """One JSON record in the STATE_TABLE of a LanceDB database.
+
+    Args:
+        db: The LanceDB database connection holding the described table.
+        key (str): Record key, e.g. ``"sync:<table>"``.
+    """
+
+    def __init__(self, db, key: str):
+        self.db = db
+        self.key = key
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            table = self.db.open_table(STATE_TABLE)
+        except ValueError:
+            return None
+        rows = (
+            table.search()
+            .where(f"key = {quote_literal(self.key)}")
+            .select(["value"])
+            .limit(1)
+            .to_list()
+        )
+        if not rows:
+            return None
+        try:
+            return json.loads(rows[0]["value"])
+        except json.JSONDecodeError:
+            return None
+
+    def save(self, value: Dict[str, Any]) -> None:
+        table = self.db.create_table(STATE_TABLE, schema=STATE_SCHEMA, exist_ok=True)
+        # one atomic upsert, so a crash never leaves a half-written record
+        (
+            table.merge_insert("key")
+            .when_matched_update_all()
+            .when_not_matched_insert_all()
+            .execute([{"key": self.key, "value": json.dumps(value)}])
+        )
+
+    def clear(self) -> None:
+        try:
+            table = self.db.open_table(STATE_TABLE)
+        except ValueError:
+            return
+        table.delete(f"key = {quote_literal(self.key)}")
+
+
+class IngestCheckpoint:
+    """Progress marker of a streaming table build, stored with the table.
+
+    Holds the root folder being ingested, the last scanned key that was written,
+    the number of rows written so far, the table version holding them and the
+    version the build started from (None for a new table). It exists only while
+    a build is running or after one was interrupted.
+
+    Args:
+        db: The LanceDB database connection.
+        table_name (str): The table being built.
+    """
+
+    def __init__(self, db, table_name: str):
+        self._state = TableState(db, f"ingest:{table_name}")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        return self._state.load()
+
+    def resumable(self, root_folder: str) -> Optional[Dict[str, Any]]:
+        """Return the saved state if it belongs to a build of ``root_folder``."""
+        state = self.load()
+        if state and state.get("root_folder") == root_folder:
+            return state
+        return None
+
+    def save(
+        self,
+        root_folder: str,
+        last_key: Optional[str],
+        rows: int,
+        version: int,
+        base_version: Optional[int] = None,
+    ) -> None:
+        self._state.save(
+            {
+                "root_folder": root_folder,
+                "last_key": last_key,
+                "rows": rows,
+                "version": version,
+                "base_version": base_version,
+            }
+        )
+
+    def clear(self) -> None:
+        self._state.clear()
+
+
+class SyncMarker:
+    """Time of the last completed scan of a table, stored with the table.
+
+    Incremental updates only list images modified after this timestamp.
+    """
+
+    def __init__(self, db, table_name: str):
+        self._state = TableState(db, f"sync:{table_name}")
+
+    def load(self) -> Optional[float]:
+        state = self._state.load()
+        try:
+            return float(state["scanned_at"]) if state else None
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def save(self, scanned_at: float) -> None:
+        self._state.save({"scanned_at": scanned_at})
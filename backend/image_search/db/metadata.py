@@ -0,0 +1,49 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Every Fabric column except the embedding
+METADATA_COLUMNS = ["image_uri", "tag", "hash", "mtime"]
+
+
+def read_metadata(
+    table,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    with_row_id: bool = False,
+    limit: Optional[int] = None,
+) -> pd.DataFrame:
+    """Read metadata columns of the table without materializing the vectors.
+
+    The projection and the ``where`` predicate are pushed down to the scan, so
+    only the requested columns of the matching rows are read.
+
+    Args:
+        table: The LanceDB table.
+        columns (List[str], optional): Columns to read. Defaults to METADATA_COLUMNS.
+        where (str, optional): SQL filter, e.g. built with ``filters.in_predicate``.
+        with_row_id (bool): Also return the ``_rowid`` column.
+        limit (int, optional): Maximum rows. Defaults to all rows.
+
+    Returns:
+        pd.DataFrame: One row per matching table row.
+    """
+    query = table.search().select(list(columns or METADATA_COLUMNS))
+    if where:
+        query = query.where(where)
+    if with_row_id:
+        query = query.with_row_id(True)
+    return query.limit(limit).to_pandas()
+
+
+def table_summary(table, sample: int = 5) -> Dict[str, Any]:
+    """Bounded overview of a table: row count, rows per tag, indexes and a sample."""
+    tags = read_metadata(table, ["tag"])["tag"] if "tag" in table.schema.names else []
+    return {
+        "rows": table.count_rows(),
+        "tags": pd.Series(tags, dtype=object).value_counts().to_dict(),
+        "indexes": [
+            f"{index.name} ({index.index_type})" for index in table.list_indices()
+        ],
+        "sample": read_metadata(table, limit=sample),
+    }
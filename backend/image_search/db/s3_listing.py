@@ -0,0 +1,208 @@
+import heapq
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from constants import ALLOWED_EXTENSIONS
+
+IMAGE_SUFFIXES = tuple(ALLOWED_EXTENSIONS)
+# listed pages buffered per prefix before its lister waits for the consumer
+PAGES_AHEAD = 2
+
+_DONE = object()
+
+
+def _is_wanted(obj: Dict[str, Any], since: Optional[float]) -> bool:
+    if not obj["Key"].lower().endswith(IMAGE_SUFFIXES):
+        return False
+    return since is None or obj["LastModified"].timestamp() > since
+
+
+def iter_prefix_pages(
+    client,
+    bucket: str,
+    prefix: str,
+    start_after: Optional[str] = None,
+    since: Optional[float] = None,
+    delimiter: Optional[str] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield the image objects under ``prefix`` one listed page at a time, in key order.
+
+    S3 has no server-side "modified since" filter, so ``since`` drops older
+    objects while paging, before anything downstream sees them. With a
+    ``delimiter`` only the objects directly under ``prefix`` are listed.
+    """
+    params = {"Bucket": bucket, "Prefix": prefix}
+    if start_after and start_after > prefix:
+        params["StartAfter"] = start_after
+    if delimiter:
+        params["Delimiter"] = delimiter
+
+    for page in client.get_paginator("list_objects_v2").paginate(**params):
+        objects = [obj for obj in page.get("Contents", []) if _is_wanted(obj, since)]
+        if objects:
+            yield objects
+
+
+def list_shards(
+    client, bucket: str, prefix: str, start_after: Optional[str] = None
+) -> List[str]:
+    """Return the first-level sub-prefixes of ``prefix``, in key order.
+
+    Sub-prefixes that lie entirely before ``start_after`` are dropped.
+    """
+    shards: List[str] = []
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        for common in page.get("CommonPrefixes", []):
+            shard = common["Prefix"]
+            if not start_after or shard > start_after or start_after.startswith(shard):
+                shards.append(shard)
+    return shards
+
+
+class _ListingWindow:
+    """Runs prefix listings on a pool, at most ``ahead`` of them at a time.
+
+    Listings are started in order; each fills a queue of at most PAGES_AHEAD
+    pages, so memory is bounded by ``ahead * PAGES_AHEAD`` pages whatever the
+    bucket size. ``pages(i)`` starts listings ``i .. i + ahead - 1`` and streams
+    listing ``i``.
+    """
+
+    def __init__(
+        self,
+        pool: ThreadPoolExecutor,
+        listings: List[Callable[[], Iterator[List[Dict[str, Any]]]]],
+        ahead: int,
+    ) -> None:
+        self.pool = pool
+        self.listings = listings
+        self.ahead = max(1, ahead)
+        self.stop = threading.Event()
+        self._started: Dict[int, Tuple["queue.Queue[Any]", Future]] = {}
+        self._next = 0
+
+    def _put(self, pages: "queue.Queue[Any]", item: Any) -> bool:
+        """Hand ``item`` to the consumer; False once the listing was abandoned."""
+        while not self.stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, listing, pages: "queue.Queue[Any]") -> None:
+        try:
+            for page in listing():
+                if not self._put(pages, page):
+                    return
+        except Exception as e:
+            self._put(pages, e)
+            return
+        self._put(pages, _DONE)
+
+    def _start_until(self, end: int) -> None:
+        while self._next < min(end, len(self.listings)):
+            pages: "queue.Queue[Any]" = queue.Queue(maxsize=PAGES_AHEAD)
+            future = self.pool.submit(self._produce, self.listings[self._next], pages)
+            self._started[self._next] = (pages, future)
+            self._next += 1
+
+    def pages(self, index: int) -> Iterator[List[Dict[str, Any]]]:
+        self._start_until(index + self.ahead)
+        pages, _ = self._started.pop(index)
+        while True:
+            page = pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield page
+
+    def objects(self, index: int) -> Iterator[Dict[str, Any]]:
+        return chain.from_iterable(self.pages(index))
+
+    def close(self) -> None:
+        self.stop.set()
+
+
+def iter_s3_objects(
+    client,
+    bucket: str,
+    base_prefix: str,
+    categories: Iterable[str],
+    start_after: Optional[str] = None,
+    since: Optional[float] = None,
+    shards: bool = False,
+    max_workers: int = 8,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(category, object)`` for every image under ``base_prefix/<category>/``.
+
+    Category prefixes (and, with ``shards``, their first-level sub-prefixes) are
+    listed concurrently, at most ``max_workers`` at a time and each only a few
+    pages ahead of the consumer, so the listing is streamed with bounded memory.
+    Objects are yielded in ascending key order, which resuming an interrupted
+    build with ``start_after`` relies on.
+
+    Args:
+        client: A boto3 S3 client (or a compatible stand-in such as moto).
+        bucket (str): Bucket name.
+        base_prefix (str): Prefix holding the category folders, ending in "/".
+        categories (Iterable[str]): Category folder names.
+        start_after (str, optional): Skip keys up to and including this one.
+        since (float, optional): Only objects modified after this timestamp.
+        shards (bool): Also split every category into sub-prefix listings.
+        max_workers (int): Concurrent list calls.
+    """
+    categories = sorted(categories)
+    prefixes = [f"{base_prefix}{category}/" for category in categories]
+    workers = max(1, max_workers)
+
+    def listing(prefix: str, delimiter: Optional[str] = None):
+        return lambda: iter_prefix_pages(
+            client, bucket, prefix, start_after, since, delimiter
+        )
+
+    # one pool thread per listing in the window, plus the direct listing of a sharded category
+    with ThreadPoolExecutor(
+        max_workers=workers + 1, thread_name_prefix="s3-list"
+    ) as pool:
+        # listing index of each category: (direct objects, [shard listings])
+        layout: List[Tuple[Optional[int], List[int]]] = []
+        listings: List[Callable[[], Iterator[List[Dict[str, Any]]]]] = []
+        if shards:
+            shard_lists = pool.map(
+                lambda prefix: list_shards(client, bucket, prefix, start_after),
+                prefixes,
+            )
+            for prefix, sub_prefixes in zip(prefixes, shard_lists):
+                direct_index = len(listings)
+                listings.append(listing(prefix, delimiter="/"))
+                listings.extend(listing(shard) for shard in sub_prefixes)
+                layout.append(
+                    (direct_index, list(range(direct_index + 1, len(listings))))
+                )
+        else:
+            for prefix in prefixes:
+                layout.append((None, [len(listings)]))
+                listings.append(listing(prefix))
+
+        window = _ListingWindow(pool, listings, workers)
+        try:
+            for category, (direct, shard_indexes) in zip(categories, layout):
+                # shards are disjoint key ranges in order; direct objects interleave
+                objects: Iterator[Dict[str, Any]] = chain.from_iterable(
+                    window.objects(i) for i in shard_indexes
+                )
+                if direct is not None:
+                    objects = heapq.merge(
+                        window.objects(direct), objects, key=lambda obj: obj["Key"]
+                    )
+                for obj in objects:
+                    yield category, obj
+        finally:
+            window.close()
@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from diskcache import Cache
+
+from constants import ALLOWED_EXTENSIONS, CACHE_DIR, HASH_WORKERS
+from utils.messages import TABLE_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+# files are hashed in chunks of this many paths so results stream in scan order
+SCAN_CHUNK_SIZE = 512
+
+_hash_cache: Optional[Cache] = None
+_hash_cache_lock = threading.Lock()
+
+
+def get_hash_cache() -> Cache:
+    """Return the on-disk SHA-256 cache keyed by (path, mtime_ns, size)."""
+    global _hash_cache
+    if _hash_cache is None:
+        with _hash_cache_lock:
+            if _hash_cache is None:
+                _hash_cache = Cache(str(CACHE_DIR / "file_hashes"))
+    return _hash_cache
+
+
+def walk_images(root_path: Path) -> List[str]:
+    """Return every image under ``root_path`` in one directory walk, sorted."""
+    extensions = {f".{ext}" for ext in ALLOWED_EXTENSIONS}
+    found = []
+    for dirpath, _, filenames in os.walk(root_path):
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in extensions:
+                found.append(os.path.join(dirpath, name))
+    found.sort()
+    return found
+
+
+def hash_file(path: str) -> Dict[str, Any]:
+    """Return the SHA-256 and mtime of a file, reusing the cached hash if unchanged."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    cache = get_hash_cache()
+
+    digest = cache.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        cache.set(key, digest)
+    return {"hash": digest, "mtime": stat.st_mtime}
+
+
+def _safe_hash(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        return hash_file(path)
+    except Exception as e:
+        logger.error(
+            TABLE_MESSAGES.errors.file_processing.format(path=path, error=str(e))
+        )
+        return None
+
+
+def scan_local_images(
+    root_path: Path, start_after: Optional[str] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(path, {"hash", "mtime"})`` for every image, in sorted path order.
+
+    Hashing runs on HASH_WORKERS threads (hashlib releases the GIL), and files
+    whose path, mtime and size are unchanged are never read again.
+    """
+    paths = [p for p in walk_images(root_path) if not start_after or p > start_after]
+    workers = HASH_WORKERS or min(8, (os.cpu_count() or 1) + 2)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as pool:
+        for start in range(0, len(paths), SCAN_CHUNK_SIZE):
+            chunk = paths[start : start + SCAN_CHUNK_SIZE]
+            for path, info in zip(chunk, pool.map(_safe_hash, chunk)):
+                if info:
+                    yield path, info
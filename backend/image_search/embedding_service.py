@@ -0,0 +1,163 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from constants import EMBED_MAX_BATCH_SIZE, EMBED_MAX_WAIT_MS
+from utils.logger import logThis
+
+
+class EmbeddingBatcher:
+    """Micro-batching front for a SigLIP embedding function.
+
+    Concurrent ``encode`` calls are collected for up to ``max_wait_ms`` (or until
+    ``max_batch_size`` is reached) and encoded together, texts and images in one
+    forward pass each. Callers block only on their own result.
+
+    Args:
+        model: A LanceDB embedding function (``siglip`` from ``image_search.schema``).
+        max_batch_size (int): Largest number of queries encoded in one batch.
+        max_wait_ms (float): How long the first query of a batch waits for company.
+    """
+
+    def __init__(self, model: Any, max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def encode(self, query: Any) -> np.ndarray:
+        """Return the query vector for a text or PIL image, batched with concurrent callers."""
+        fut: Future = Future()
+        self._ensure_worker()
+        self._queue.put((query, fut))
+        return fut.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="siglip-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[Any, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+            texts = [item for item in batch if isinstance(item[0], str)]
+            images = [item for item in batch if not isinstance(item[0], str)]
+            for group, encode in (
+                (texts, self._encode_texts),
+                (images, self._encode_images),
+            ):
+                if not group:
+                    continue
+                try:
+                    vectors = encode([q for q, _ in group])
+                    for (_, fut), vector in zip(group, vectors):
+                        fut.set_result(vector)
+                except Exception as e:
+                    logThis.error(f"Batched embedding failed: {e}")
+                    for _, fut in group:
+                        if not fut.done():
+                            fut.set_exception(e)
+
+    def _batched_model(self) -> bool:
+        # SigLIP exposes its processor/model; anything else is encoded one by one
+        return all(
+            hasattr(self.model, attr) for attr in ("_processor", "_model", "_torch")
+        )
+
+    def _normalize(self, features):
+        if getattr(self.model, "normalize", False):
+            features = features / features.norm(dim=-1, keepdim=True)
+        return features.cpu().detach().numpy().astype(np.float32)
+
+    def _encode_texts(self, texts: List[str]) -> List[np.ndarray]:
+        if not self._batched_model():
+            return [self.model.compute_query_embeddings(t)[0] for t in texts]
+
+        inputs = self.model._processor(
+            text=texts,
+            return_tensors="pt",
+            padding="max_length",
+            truncation=True,
+            max_length=64,
+        ).to(self.model.device)
+        with self.model._torch.no_grad():
+            features = self.model._model.get_text_features(**inputs)
+            return list(self._normalize(features))
+
+    def _encode_images(self, images: List[Any]) -> List[np.ndarray]:
+        if not self._batched_model():
+            return [self.model.compute_query_embeddings(i)[0] for i in images]
+
+        pil_images = [self.model._to_pil(image) for image in images]
+        pixel_values = self.model._processor(images=pil_images, return_tensors="pt")[
+            "pixel_values"
+        ]
+        with self.model._torch.no_grad():
+            features = self.model._model.get_image_features(
+                pixel_values.to(self.model.device)
+            )
+            return list(self._normalize(features))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": (
+                round(self.items / self.batches, 2) if self.batches else 0.0
+            ),
+            "queued": self._queue.qsize(),
+        }
+
+
+_service: Optional[EmbeddingBatcher] = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingBatcher:
+    """Return the process-wide SigLIP batcher, creating it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from image_search.schema import siglip
+
+                _service = EmbeddingBatcher(
+                    siglip,
+                    max_batch_size=EMBED_MAX_BATCH_SIZE,
+                    max_wait_ms=EMBED_MAX_WAIT_MS,
+                )
+    return _service
@@ -0,0 +1,38 @@
+import hashlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from constants import SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+from utils.ttl_cache import LRUTTLCache
+
+# Full ranked result lists keyed by query + filters, so paging never re-runs the model
+search_cache = LRUTTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+
+
+def _filters(
+    categories: Optional[List[str]], limit: int
+) -> Tuple[Tuple[str, ...], int]:
+    return tuple(sorted(set(categories or []))), int(limit)
+
+
+def text_cache_key(search_term: str, categories: Optional[List[str]], limit: int):
+    """Build the cache key for a text query."""
+    return ("text", search_term.strip(), *_filters(categories, limit))
+
+
+def image_cache_key(image_bytes: bytes, categories: Optional[List[str]], limit: int):
+    """Build the cache key for an uploaded image, addressed by its content hash."""
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return ("image", digest, *_filters(categories, limit))
+
+
+def vector_cache_key(vector, categories: Optional[List[str]], limit: int):
+    """Build the cache key for a precomputed query vector."""
+    digest = hashlib.sha256(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest()
+    return ("vector", digest, *_filters(categories, limit))
+
+
+def uri_cache_key(image_uri: str, categories: Optional[List[str]], limit: int):
+    """Build the cache key for a "more like this" query on an indexed image."""
+    return ("uri", image_uri.strip(), *_filters(categories, limit))
@@ -1,61 +1,101 @@
 # vector_search.py
 import time
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from constants import SEARCH_NPROBES, SEARCH_REFINE_FACTOR, VECTOR_INDEX_METRIC
+from image_search.db.filters import in_predicate, quote_literal, suffix_predicate
+from image_search.embedding_service import get_embedding_service
+
+
+def encode_query(search_query: Any) -> Any:
+    """Turn a text or PIL image query into a vector through the batched SigLIP service.
+
+    Vectors (lists / numpy arrays) are returned unchanged.
+    """
+    if isinstance(search_query, (list, tuple, np.ndarray)):
+        return search_query
+    return get_embedding_service().encode(search_query)
+
+
+def to_image_path(image_uri: str) -> str:
+    """Shorten a stored image URI to the relative path returned to clients."""
+    parts = image_uri.replace("\\", "/").split("/")
+    if "product" in parts:
+        idx = parts.index("product")
+        return "/".join(parts[idx:])
+    return "/".join(parts[-2:])
+
+
+def get_row_vector(table, image_uri: str) -> Optional[List[float]]:
+    """Return the stored vector of an indexed image ("more like this" queries).
+
+    ``image_uri`` may be the stored URI or the relative path returned by a search.
+    """
+    where = f"image_uri = {quote_literal(image_uri)}"
+    if "://" not in image_uri:
+        where += " OR " + suffix_predicate("image_uri", "/" + image_uri.lstrip("/"))
+    rows = table.search().where(where).select(["vector"]).limit(1).to_list()
+    return list(rows[0]["vector"]) if rows else None
 
 
 def run_vector_search(
-    table, schema, search_query: Any, limit: int = 6, category: List = []
-) -> Tuple[List[Any], List[str]]:
-    print(category)
+    table,
+    schema,
+    search_query: Any,
+    limit: int = 6,
+    category: List = [],
+    with_distances: bool = False,
+    nprobes: Optional[int] = None,
+    refine_factor: Optional[int] = None,
+) -> Tuple[List[Any], ...]:
     """Optimized vector search with same interface but faster performance.
 
     Args:
-        database (str): Path to the LanceDB database.
-        table_name (str): Name of the table to search.
+        table: The LanceDB table to search.
         schema: Pydantic schema of the table.
-        search_query (Any): The search query (text, PIL.Image, or image path).
+        search_query (Any): The search query (text, PIL.Image or a precomputed vector).
         limit (int, optional): Maximum number of results. Defaults to 6.
-        category (str | None, optional): The category to filter by. Defaults to None.
+        category (List, optional): Categories (tags) to filter by. Defaults to [].
+        with_distances (bool, optional): Also return the distance of every hit.
+        nprobes (int, optional): IVF partitions probed when an ANN index exists.
+            Defaults to SEARCH_NPROBES.
+        refine_factor (int, optional): Re-rank ``limit * refine_factor`` candidates
+            with exact distances. Defaults to SEARCH_REFINE_FACTOR (0 = off).
 
     Returns:
-        Tuple[List[Any], List[str]]: (image_uris, formatted_image_paths)
+        Tuple[List[Any], ...]: (image_uris, formatted_image_paths), plus distances
+        when ``with_distances`` is set.
     """
     # Start timing
     start_time = time.perf_counter()
 
     # Perform the vector search
-    where_clause = " OR ".join(f"tag == '{c}'" for c in (category or []))
-    print("WHERE CLAUSE:", where_clause)
-    query = table.search(search_query)
-    print(f"Initial search query constructed: {query}")  # Debug log
+    where_clause = in_predicate("tag", category or [])
+    query_vector = encode_query(search_query)
+    query = (
+        table.search(query_vector, vector_column_name="vector")
+        .distance_type(VECTOR_INDEX_METRIC)
+        .nprobes(nprobes or SEARCH_NPROBES)
+    )
+    refine = SEARCH_REFINE_FACTOR if refine_factor is None else refine_factor
+    if refine:
+        query = query.refine_factor(refine)
 
-    if category:
+    # Answered by the scalar index on tag, not a full scan
+    if where_clause:
         query = query.where(where_clause, prefilter=True)
 
-    rs = query.limit(limit).to_pydantic(schema)
-
-    # Process results with optimized path handling
-    image_uris = []
-    image_paths = []
-
-    for result in rs:
-        if hasattr(result, "image_uri"):
-            image_uris.append(result.image_uri)
-            # Optimized path processing
-            full_path = result.image_uri.replace("\\", "/")
-            # parts = full_path.rsplit("/", 2)
-            parts = full_path.split("/")
-            print(full_path, parts)
-
-            if "product" in parts:
-                idx = parts.index("product")
-                image_paths.append("/".join(parts[idx:]))
-            else:
-                image_paths.append("/".join(parts[-2:]))
-            # if len(parts) >= 2:
-            #     image_paths.append(f"{parts[-2]}/{parts[-1]}")
+    # Only project what is returned; the vector column is never materialized
+    rows = query.select(["image_uri", "_distance"]).limit(limit).to_list()
+
+    image_uris = [row["image_uri"] for row in rows]
+    image_paths = [to_image_path(uri) for uri in image_uris]
 
     # Debug timing (comment out in production)
     search_time = time.perf_counter() - start_time
     print(f"Vector search executed in {search_time:.2f}s")
+    if with_distances:
+        return image_uris, image_paths, [float(row["_distance"]) for row in rows]
     return image_uris, image_paths
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
@@ -18,9 +19,11 @@ from constants import (
     API_PREFIX,
     ASSETS,
     AUDIO_DIR,
+    DATABASE_PATH,
     IMAGE_DIR,
     IS_DEV,
     IS_PROD,
+    TABLE_NAME,
 )
 from routes import (
     analysis,
@@ -34,6 +37,7 @@ from routes import (
     contact,
 )
 from tools.mcpserver import sse_app
+from image_search.db.connection import is_table_ready, warm_up_table
 from utils.emoji_logger import get_logger
 from utils.db_utils import mongo_client, db
 from fastapi import Security, HTTPException, status
@@ -111,6 +115,14 @@ async def lifespan(app: MyApp):
     except Exception as e:
         logger.error(f"Unexpected error when connecting to MongoDB: {e}")
 
+    # Startup: open the search table and warm the SigLIP model once, off the event loop
+    try:
+        await asyncio.to_thread(warm_up_table, DATABASE_PATH, TABLE_NAME)
+    except Exception as e:
+        logger.warning(f"Search table warm-up skipped: {e}")
+    app.state.search_ready = is_table_ready(DATABASE_PATH, TABLE_NAME)
+    logger.info(f"Search ready: {app.state.search_ready}")
+
     yield
 
     try:
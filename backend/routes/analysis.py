@@ -1,37 +1,101 @@
-from io import BytesIO
+import asyncio
+from typing import Optional
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
-from PIL import Image
-
-from services.threaded import analyse_all_variations
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from services.analysis_scheduler import AnalysisBusyError, analysis_scheduler
+from services.llm_gateway import llm_gateway
+from services.threaded import (
+    FIRST_RESPONSE_TIMEOUT,
+    cancel_analysis,
+    mode_stats,
+    resolve_mode,
+    start_analysis,
+)
+from utils.cache import first_response, get_result_store
+from utils.image_loader import decode_stats
+from utils.image_payload import payload_stats, prepare_image_payload
+from utils.logger import logThis
 
 router = APIRouter()
 
+# how often a waiting /analyse checks whether its client went away
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+async def _first_unless_disconnected(request: Request, cache_key: str):
+    """Await the first variation; cancel the analysis if the client disconnects."""
+    waiter = asyncio.ensure_future(first_response(cache_key, FIRST_RESPONSE_TIMEOUT))
+    try:
+        while True:
+            done, _ = await asyncio.wait({waiter}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return waiter.result()
+            if await request.is_disconnected():
+                logThis.info(f"Client disconnected, cancelling analysis {cache_key}")
+                cancel_analysis(cache_key)
+                return None
+    finally:
+        waiter.cancel()
+
 
 @router.post("/analyse")
-async def analyse(image: UploadFile = File(...), analysis_type: str = Form(...)):
+async def analyse(
+    request: Request,
+    image: UploadFile = File(...),
+    analysis_type: str = Form(...),
+    mode: Optional[str] = Form(None),
+):
     try:
         analysis_type = (analysis_type or "").strip().lower() or "short"
-        print("📁 Filename:", image.filename)
-        print("📦 Content type:", image.content_type)
+        try:
+            mode = resolve_mode(mode)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        logThis.debug(f"Analysing {image.filename} ({image.content_type})")
 
         contents = await image.read()
 
-        image_stream = BytesIO(contents)
-        image_stream.seek(0)
-        img = Image.open(image_stream)
+        payload = await asyncio.to_thread(prepare_image_payload, contents, "analysis")
 
-        print("Image validated as fabric. Starting analysis...")
-        result = analyse_all_variations(img, analysis_type)
-        print("ANALYSIS RESULT:", result)
+        try:
+            # the result store may be on disk; keep its reads and writes off the loop
+            started = await asyncio.to_thread(
+                start_analysis, payload, analysis_type, mode
+            )
+        except AnalysisBusyError:
+            raise HTTPException(
+                status_code=503, detail="Analysis is busy, please retry shortly."
+            )
+        first = await _first_unless_disconnected(request, started["cache_key"])
 
         return {
             "status": "partial",
-            "cache_key": result["cache_key"],
-            "response": result["first"],
+            "cache_key": started["cache_key"],
+            "mode": started["mode"],
+            "response": first or {"id": 1, "response": None},
         }
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+@router.delete("/analyse/{cache_key}")
+async def cancel(cache_key: str):
+    """Cancel the variations of an analysis that have not completed yet."""
+    cancel_analysis(cache_key)
+    return {"cache_key": cache_key, "status": "cancelling"}
+
+
+@router.get("/analyse/stats")
+async def analyse_stats():
+    """Scheduler and LLM gateway load, per-mode usage, result store, payloads, decodes."""
+    return {
+        "scheduler": analysis_scheduler.stats(),
+        "llm": llm_gateway.stats(),
+        "modes": mode_stats.snapshot(),
+        "results": get_result_store().stats(),
+        "payload": payload_stats(),
+        "decode": decode_stats(),
+    }
@@ -1,28 +1,53 @@
 # routes/chat.py  (mypy-friendly replacement)
+import asyncio
 import difflib
 import json
 import logging
 import re
 import re as _re
-from typing import Any, Dict, List, Literal, Optional, Set, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from services.llm_gateway import llm_gateway
+from utils.llm_cache import llm_response_cache
+from utils.sse import sse_event
+
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["chat"])
 agent_graph: Optional[Any] = None
+run_tool: Optional[Callable[[str], Tuple[bool, Any]]] = None
+stream_fallback: Optional[Callable[[Dict[str, Any]], AsyncIterator[str]]] = None
 SYSTEM_PROMPT: str
 
 # Attempt to import agent_graph; if import fails we still keep file valid
 try:
     # import into temporary names to avoid "redefinition" warning for mypy
     from agent.graph import SYSTEM_PROMPT as _SYSTEM_PROMPT, agent_graph as _AGENT_GRAPH  # type: ignore
+    from agent.graph import run_tool as _RUN_TOOL, stream_fallback as _STREAM_FALLBACK
 
     SYSTEM_PROMPT = _SYSTEM_PROMPT
     agent_graph = _AGENT_GRAPH
+    run_tool = _RUN_TOOL
+    stream_fallback = _STREAM_FALLBACK
 except Exception:
     agent_graph = None
+    run_tool = None
+    stream_fallback = None
     SYSTEM_PROMPT = (
         "You are a Fabric Assistant.\n"
         "- Answer questions about fabrics, textiles, and how to use this app.\n"
@@ -736,8 +761,14 @@ def _build_response(
         return ChatResponse(reply=safe_reply, ask_more=False)
 
 
-@router.post("/chat", response_model=ChatResponse)
-def chat_endpoint(body: ChatRequest):
+class _ChatTurn(NamedTuple):
+    last_user: str
+    category: str
+    force_long: bool
+
+
+def _prepare_turn(body: ChatRequest) -> _ChatTurn:
+    """Pick the user message to answer and classify it, honouring "tell me more" replies."""
     if not body.messages:
         raise HTTPException(status_code=400, detail="messages[] cannot be empty.")
 
@@ -852,6 +883,11 @@ def chat_endpoint(body: ChatRequest):
         logger.exception("Error in yes-flow override: %s", e)
         category = classify_message(last_user)
 
+    return _ChatTurn(last_user, category, force_long)
+
+
+def _quick_response(category: str, force_long: bool) -> Optional[ChatResponse]:
+    """Canned reply for blocked and chitchat messages, None for everything else."""
     # quick responses
     if category == "blocked":
         return _build_response(
@@ -875,7 +911,11 @@ def chat_endpoint(body: ChatRequest):
             CHITCHAT_RESPONSE,
             force_long,
         )
+    return None
+
 
+def _agent_history(body: ChatRequest) -> List[Dict[str, Any]]:
+    """Validate the conversation size and return it cleaned, with a system prompt."""
     # length checks
     if len(body.messages) > MAX_MESSAGES:
         raise HTTPException(
@@ -897,63 +937,11 @@ def chat_endpoint(body: ChatRequest):
         messages_payload = [
             {"role": "system", "content": SYSTEM_PROMPT}
         ] + messages_payload
+    return messages_payload
 
-    try:
-        mode_var = "long" if force_long else "short"
-        try:
-            import pprint
-
-            logger.info(
-                "CHAT DEBUG -> mode_var=%s force_long=%s last_user_preview=%s",
-                mode_var,
-                force_long,
-                (last_user or "")[:200],
-            )
-            preview_msgs: List[Dict[str, str]] = []
-            for msg_dict in messages_payload[-10:]:
-                if isinstance(msg_dict, dict):
-                    preview_msgs.append(
-                        {
-                            "role": str(msg_dict.get("role") or ""),
-                            "content_preview": (
-                                str(msg_dict.get("content") or "")[:120]
-                            ),
-                        }
-                    )
-            logger.info(
-                "CHAT DEBUG -> messages_payload_preview: %s",
-                pprint.pformat(preview_msgs),
-            )
-        except Exception:
-            logger.exception("CHAT DEBUG -> Failed to log debug payload")
-
-        if agent_graph is None:
-            logger.error(
-                "agent_graph is None — cannot call agent_graph.invoke. Ensure agent.graph is present."
-            )
-            return _build_response(
-                _make_reply("Sorry — the analysis engine is unavailable."),
-                None,
-                None,
-                None,
-                None,
-                False,
-                "Sorry — the analysis engine is unavailable.",
-                force_long,
-            )
-
-        raw_result = agent_graph.invoke(
-            {"text": last_user, "history": messages_payload[-10:], "mode": mode_var}
-        )
-        logger.debug("RAW_AGENT_RESULT preview: %s", str(raw_result)[:1800])
-
-        unwrapped_result = _unwrap_tool_result(raw_result)
-        result = _sanitize_agent_output_for_frontend(unwrapped_result)
-
-    except Exception as e:
-        logger.exception("Agent graph invocation failed")
-        raise HTTPException(status_code=502, detail=f"Agent error: {str(e)}")
 
+def _response_from_result(result: Any, category: str, force_long: bool) -> ChatResponse:
+    """Turn sanitized agent output into the ChatResponse sent to the frontend."""
     # process sanitized result (must be plain dicts/strings here)
     if isinstance(result, dict):
         out: Dict[str, Any] = result
@@ -1089,3 +1077,141 @@ def chat_endpoint(body: ChatRequest):
     return _build_response(
         final_reply_msg, None, None, None, None, False, None, force_long
     )
+
+
+@router.post("/chat", response_model=ChatResponse)
+def chat_endpoint(body: ChatRequest):
+    last_user, category, force_long = _prepare_turn(body)
+    quick = _quick_response(category, force_long)
+    if quick is not None:
+        return quick
+    messages_payload = _agent_history(body)
+
+    try:
+        mode_var = "long" if force_long else "short"
+        try:
+            import pprint
+
+            logger.info(
+                "CHAT DEBUG -> mode_var=%s force_long=%s last_user_preview=%s",
+                mode_var,
+                force_long,
+                (last_user or "")[:200],
+            )
+            preview_msgs: List[Dict[str, str]] = []
+            for msg_dict in messages_payload[-10:]:
+                if isinstance(msg_dict, dict):
+                    preview_msgs.append(
+                        {
+                            "role": str(msg_dict.get("role") or ""),
+                            "content_preview": (
+                                str(msg_dict.get("content") or "")[:120]
+                            ),
+                        }
+                    )
+            logger.info(
+                "CHAT DEBUG -> messages_payload_preview: %s",
+                pprint.pformat(preview_msgs),
+            )
+        except Exception:
+            logger.exception("CHAT DEBUG -> Failed to log debug payload")
+
+        if agent_graph is None:
+            logger.error(
+                "agent_graph is None — cannot call agent_graph.invoke. Ensure agent.graph is present."
+            )
+            return _build_response(
+                _make_reply("Sorry — the analysis engine is unavailable."),
+                None,
+                None,
+                None,
+                None,
+                False,
+                "Sorry — the analysis engine is unavailable.",
+                force_long,
+            )
+
+        raw_result = agent_graph.invoke(
+            {"text": last_user, "history": messages_payload[-10:], "mode": mode_var}
+        )
+        logger.debug("RAW_AGENT_RESULT preview: %s", str(raw_result)[:1800])
+
+        unwrapped_result = _unwrap_tool_result(raw_result)
+        result = _sanitize_agent_output_for_frontend(unwrapped_result)
+
+    except Exception as e:
+        logger.exception("Agent graph invocation failed")
+        raise HTTPException(status_code=502, detail=f"Agent error: {str(e)}")
+
+    return _response_from_result(result, category, force_long)
+
+
+@router.post("/chat/stream")
+async def chat_stream(body: ChatRequest):
+    """Server-sent events version of /chat.
+
+    Emits ``token`` events ({"text"}) while the LLM writes a reply. Tool turns
+    emit ``action`` ({"type", "params"}) and ``results`` ({"results"}) as soon
+    as the tool returns. Every stream ends with ``done`` carrying the
+    ChatResponse /chat would return (short replies may be trimmed there), or
+    with ``error`` ({"detail"}).
+    """
+    last_user, category, force_long = _prepare_turn(body)
+    quick = _quick_response(category, force_long)
+    messages_payload = _agent_history(body) if quick is None else []
+    mode_var = "long" if force_long else "short"
+
+    async def events() -> AsyncIterator[str]:
+        if quick is not None:
+            yield sse_event("token", {"text": quick.reply.content})
+            yield sse_event("done", quick.model_dump())
+            return
+        if run_tool is None or stream_fallback is None:
+            logger.error("agent.graph unavailable — cannot stream chat replies.")
+            yield sse_event(
+                "error", {"detail": "Sorry — the analysis engine is unavailable."}
+            )
+            return
+
+        try:
+            handled, raw_result = await asyncio.to_thread(run_tool, last_user)
+            if handled:
+                result = _sanitize_agent_output_for_frontend(
+                    _unwrap_tool_result(raw_result)
+                )
+                response = _response_from_result(result, category, force_long)
+                if response.action is not None:
+                    yield sse_event("action", response.action.model_dump())
+                if response.results:
+                    yield sse_event("results", {"results": response.results})
+                yield sse_event("done", response.model_dump())
+                return
+
+            parts: List[str] = []
+            async for delta in stream_fallback(
+                {
+                    "text": last_user,
+                    "history": messages_payload[-10:],
+                    "mode": mode_var,
+                }
+            ):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+            result = _sanitize_agent_output_for_frontend("".join(parts))
+            response = _response_from_result(result, category, force_long)
+            yield sse_event("done", response.model_dump())
+        except Exception as e:
+            logger.exception("Chat stream failed")
+            yield sse_event("error", {"detail": f"Agent error: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/chat/stats")
+async def chat_stats():
+    """Reply cache hit rate and LLM gateway load."""
+    return {"cache": llm_response_cache.stats(), "llm": llm_gateway.stats()}
@@ -1,14 +1,15 @@
-import time
+import asyncio
 
 from fastapi import APIRouter, HTTPException, Request
 from routes.routes_helper import (
     CreateTableResponse,
+    JobStatusResponse,
     UpdateTableResponse,
     table_exists,
 )
-from image_search.db.create_table import process_table
-from image_search.schema import Fabric
+from services.jobs import JobConflictError, get_job, start_table_job
 from constants import (
+    API_PREFIX,
     DATABASE_PATH,
     RELATIVE_GENERATED_FOLDER,
     TABLE_NAME,
@@ -21,67 +22,76 @@ router = APIRouter(
 )
 
 
-@router.put("/create/table", response_model=CreateTableResponse)
-async def create_table(request: Request):
-    """
-    Create a new database table with all images from the configured folder.
-    Rate limited to 2 requests per hour per IP.
+async def _start_job(kind: str, **options) -> dict:
+    """Start a table job off the event loop.
+
+    The job store lock and progress writes are diskcache I/O, and starting the
+    spawned worker boots a fresh interpreter.
     """
     try:
-        start_time = time.time()
-
-        process_table(
+        return await asyncio.to_thread(
+            start_table_job,
+            kind,
             database=DATABASE_PATH,
             table_name=TABLE_NAME,
             root_folder=RELATIVE_GENERATED_FOLDER,
-            schema=Fabric,
-            force=True,
+            schema_name="Fabric",
+            **options,
         )
-
-        create_time = time.time() - start_time
-        logThis.info(
-            f"Table creation operation took {create_time:.4f} seconds",
-            extra={"color": "green"},
+    except JobConflictError as e:
+        raise HTTPException(
+            status_code=409, detail=f"{e} Job id: {e.job_id}" if e.job_id else str(e)
         )
-
-        return CreateTableResponse(message="Table created successfully.")
     except Exception as e:
-        logThis.error(f"Table creation failed: {str(e)}")
+        logThis.error(f"Starting table {kind} job failed: {str(e)}")
         raise HTTPException(
-            status_code=500, detail=f"Failed to create the table: {str(e)}"
+            status_code=500, detail=f"Failed to start the table {kind}: {str(e)}"
         )
 
 
-@router.put("/update/table", response_model=UpdateTableResponse)
-async def update_table(request: Request):
+@router.put("/create/table", response_model=CreateTableResponse, status_code=202)
+async def create_table(request: Request):
+    """
+    Create a new database table with all images from the configured folder.
+    The build runs in a background worker; poll the returned job id.
+    Rate limited to 2 requests per hour per IP.
+    """
+    job = await _start_job("create", force=True)
+    logThis.info(f"Table creation job {job['id']} started", extra={"color": "green"})
+    return CreateTableResponse(
+        message="Table creation started.",
+        job_id=job["id"],
+        status_url=f"{API_PREFIX}/database/jobs/{job['id']}",
+    )
+
+
+@router.put("/update/table", response_model=UpdateTableResponse, status_code=202)
+async def update_table(request: Request, incremental: bool = False):
     """
     Update an existing database table with new images from the configured folder.
+    The update runs in a background worker; poll the returned job id.
+    ``incremental`` only scans images modified since the last sync.
     Rate limited to 5 requests per hour per IP.
     """
-    if not table_exists(DATABASE_PATH, TABLE_NAME):
+    # table_exists may retry with sleeps while opening the table
+    if not await asyncio.to_thread(table_exists, DATABASE_PATH, TABLE_NAME):
         raise HTTPException(
             status_code=404,
             detail="Table not present. Please create the table first using /api/database/create-table",
         )
-    try:
-        start_time = time.time()
-        process_table(
-            database=DATABASE_PATH,
-            table_name=TABLE_NAME,
-            root_folder=RELATIVE_GENERATED_FOLDER,
-            schema=Fabric,
-            force=False,
-        )
+    job = await _start_job("update", force=False, incremental=incremental)
+    logThis.info(f"Table update job {job['id']} started", extra={"color": "green"})
+    return UpdateTableResponse(
+        message="Table update started.",
+        job_id=job["id"],
+        status_url=f"{API_PREFIX}/database/jobs/{job['id']}",
+    )
 
-        update_time = time.time() - start_time
-        logThis.info(
-            f"Table update operation took {update_time:.4f} seconds",
-            extra={"color": "green"},
-        )
 
-        return UpdateTableResponse(message="Table updated successfully.")
-    except Exception as e:
-        logThis.error(f"Table update failed: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to update the table: {str(e)}"
-        )
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def job_status(job_id: str):
+    """Status, progress counts and ETA of a table create/update job."""
+    job = await asyncio.to_thread(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
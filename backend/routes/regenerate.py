@@ -1,28 +1,59 @@
 import asyncio
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
-from utils.cache import get_response
+from services.threaded import cancel_analysis
+from utils.cache import get_responses, stream_responses, wait_for_response
+from utils.prompt_generator import VARIATION_COUNT
+from utils.sse import sse_event
 
 router = APIRouter()
 
+REGENERATE_TIMEOUT = 30  # seconds
+STREAM_TIMEOUT = 90  # seconds
+
 
 @router.get("/regenerate")
 async def regenerate(key: str, index: int):
     try:
-        waiting: float = 0.0
-        interval = 0.5
-        timeout = 30  # seconds
-
-        while waiting < timeout:
-            response = get_response(key, index)
-            if response is not None:
-                return response
-            await asyncio.sleep(interval)
-            waiting += interval
+        response = await wait_for_response(key, index, REGENERATE_TIMEOUT)
+        if response is not None:
+            return response
 
         print(f"Timeout: No response for key={key}, index={index}")
         return {"id": index, "response": None}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Regenerate failed: {str(e)}")
+
+
+@router.get("/regenerate/stream")
+async def regenerate_stream(key: str):
+    """Server-sent events with every variation of an analysis as it completes.
+
+    Emits one ``variation`` event per stored variation ({"id", "response"}),
+    then ``done`` with the number delivered, or after STREAM_TIMEOUT seconds.
+    Closing the stream early cancels the variations still waiting to run.
+    """
+    if await asyncio.to_thread(get_responses, key) is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired cache key")
+
+    async def events():
+        delivered = 0
+        try:
+            async for response in stream_responses(
+                key, VARIATION_COUNT, STREAM_TIMEOUT
+            ):
+                delivered += 1
+                yield sse_event("variation", response)
+        except (asyncio.CancelledError, GeneratorExit):
+            cancel_analysis(key)
+            raise
+        yield sse_event("done", {"delivered": delivered, "expected": VARIATION_COUNT})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
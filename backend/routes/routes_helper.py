@@ -28,14 +28,47 @@ class SearchResponse(BaseModel):
     )
     pagination: PaginationResponse = Field(..., description="Pagination information")
     message: Optional[str] = Field(None, description="Success message for file uploads")
+    distances: Optional[List[float]] = Field(
+        None, description="Distance of each result to the query (include_distances)"
+    )
+    query_vector: Optional[List[float]] = Field(
+        None, description="Query embedding, reusable as query_vector (include_vector)"
+    )
 
 
 class CreateTableResponse(BaseModel):
     message: str = Field(..., description="Success message")
+    job_id: Optional[str] = Field(None, description="Background job running the build")
+    status_url: Optional[str] = Field(None, description="Where to poll the job status")
 
 
 class UpdateTableResponse(BaseModel):
     message: str = Field(..., description="Success message")
+    job_id: Optional[str] = Field(None, description="Background job running the update")
+    status_url: Optional[str] = Field(None, description="Where to poll the job status")
+
+
+class JobProgressResponse(BaseModel):
+    total: Optional[int] = Field(None, description="Images expected to be embedded")
+    scanned: int = Field(0, description="Images listed and hashed")
+    embedded: int = Field(0, description="Images embedded")
+    written: int = Field(0, description="Rows written to the table")
+    deleted: int = Field(0, description="Stale rows deleted")
+
+
+class JobStatusResponse(BaseModel):
+    id: str = Field(..., description="Job id")
+    kind: str = Field(..., description="create or update")
+    table: str = Field(..., description="Table the job works on")
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    created_at: float = Field(..., description="Unix time the job was accepted")
+    started_at: Optional[float] = Field(
+        None, description="Unix time the worker started"
+    )
+    finished_at: Optional[float] = Field(None, description="Unix time the job ended")
+    error: Optional[str] = Field(None, description="Failure reason")
+    progress: JobProgressResponse = Field(..., description="Counts so far")
+    eta_seconds: Optional[float] = Field(None, description="Estimated time remaining")
 
 
 class ErrorResponse(BaseModel):
@@ -1,23 +1,50 @@
-import io
+import asyncio
+import json
+import threading
 import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, List, Optional
 
+from utils.image_loader import MODEL_SIDE, decode_stats, load_image
 from utils.image_utils import parse_list
-from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
-from PIL import Image
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    UploadFile,
+)
 from routes.routes_helper import SearchResponse, sanitize
-from image_search.db.connection import get_table, warm_up_table_model
+from image_search.db.connection import (
+    get_table,
+    invalidate_table,
+    is_table_ready,
+    warm_up_table,
+)
+from image_search.embedding_service import get_embedding_service
 from image_search.schema import Fabric
-from image_search.vector_search import run_vector_search
+from image_search.search_cache import (
+    image_cache_key,
+    search_cache,
+    text_cache_key,
+    uri_cache_key,
+    vector_cache_key,
+)
+from image_search.vector_search import encode_query, get_row_vector, run_vector_search
 from utils.aws_helper import generate_cdn_url, upload_file
 from constants import (
     DATABASE_PATH,
     ENVIRONMENT,
+    SEARCH_MAX_QUEUE,
+    SEARCH_MAX_WORKERS,
     TABLE_NAME,
     UPLOAD_FOLDER_FABRIC,
 )
 from routes.routes_helper import allowed_file
+from services.jobs import GenerationWatch
+from utils.bounded_executor import BoundedExecutor, ExecutorBusyError
 from utils.logger import logThis
 from utils.profanity import ProfanityError, filter_profanity_from_query
 from werkzeug.utils import secure_filename
@@ -28,20 +55,225 @@ router = APIRouter(
 )
 
 
-@router.post("", response_model=SearchResponse)
+# Blocking search work (table open, image decode, encode + ANN) runs here, off the event loop
+search_executor = BoundedExecutor(
+    max_workers=SEARCH_MAX_WORKERS, max_queue=SEARCH_MAX_QUEUE, name="search"
+)
+
+# table create/update jobs (run by any worker) bump the table generation
+table_watch = GenerationWatch(TABLE_NAME)
+
+# seconds between warm-up attempts while the table is not ready
+WARM_UP_RETRY_SECONDS = 30
+_warm_up_lock = threading.Lock()
+_warm_up_at = 0.0
+
+
+async def _retry_warm_up(force: bool = False) -> None:
+    """Warm the table off the event loop, at most once per WARM_UP_RETRY_SECONDS.
+
+    Requests arriving while an attempt runs do not wait for it. ``force`` skips
+    the interval (the table was just rebuilt).
+    """
+    global _warm_up_at
+    if is_table_ready(DATABASE_PATH, TABLE_NAME):
+        return
+    if not force and time.monotonic() - _warm_up_at < WARM_UP_RETRY_SECONDS:
+        return
+    if not _warm_up_lock.acquire(blocking=False):
+        return
+    try:
+        _warm_up_at = time.monotonic()
+        await asyncio.to_thread(warm_up_table, DATABASE_PATH, TABLE_NAME)
+    except Exception as e:
+        logThis.error(f"Search table warm-up failed: {e}")
+    finally:
+        _warm_up_lock.release()
+
+
+async def _sync_table_state() -> None:
+    """Drop cached results and the table handle once a job has rebuilt the table.
+
+    A table that is not ready yet (first built after startup, or a failed
+    startup warm-up) is warmed here: right after a rebuild, otherwise retried
+    at most every WARM_UP_RETRY_SECONDS.
+    """
+    rebuilt = table_watch.changed()
+    if rebuilt:
+        logThis.info("Search table rebuilt; clearing search cache")
+        search_cache.clear()
+        invalidate_table(DATABASE_PATH, TABLE_NAME)
+    await _retry_warm_up(force=rebuilt)
+
+
+def _vector_search(build_query, limit, categories, exclude_uri=None) -> dict:
+    """Blocking part of a search: open the warm table, build the query and run it.
+
+    ``build_query`` receives the table and returns text, a PIL image or a vector.
+    Returns the full ranked hit list with distances and the query vector.
+    """
+    # warmed at startup (or after a rebuild); this is the cached handle
+    table = get_table(DATABASE_PATH, TABLE_NAME)
+    query_vector = encode_query(build_query(table))
+
+    dims = table.schema.field("vector").type.list_size
+    if len(query_vector) != dims:
+        raise ValueError(f"query_vector must have {dims} dimensions")
+
+    # one extra hit so the source image can be dropped from "more like this" results
+    fetch = limit + 1 if exclude_uri else limit
+    image_uris, image_paths, distances = run_vector_search(
+        table,
+        Fabric,
+        query_vector,
+        limit=fetch,
+        category=categories,
+        with_distances=True,
+    )
+    hits = list(zip(image_uris, image_paths, distances))
+    if exclude_uri:
+        hits = [h for h in hits if exclude_uri not in (h[0], h[1])][:limit]
+
+    return {
+        "results": [path for _, path, _ in hits],
+        "distances": [distance for _, _, distance in hits],
+        "query_vector": [float(x) for x in query_vector],
+    }
+
+
+async def _cached_vector_search(
+    cache_key, build_query, limit, categories, exclude_uri=None
+) -> dict:
+    """Return the full ranked hit list for a query, computing it only on a cache miss."""
+    await _sync_table_state()
+    hits = search_cache.get(cache_key)
+    if hits is not None:
+        logThis.info("Search cache hit", extra={"color": "green"})
+        return hits
+
+    if not is_table_ready(DATABASE_PATH, TABLE_NAME):
+        raise HTTPException(
+            status_code=503, detail="Search index is not ready, please retry later."
+        )
+
+    generation = table_watch.seen
+    try:
+        hits = await search_executor.run(
+            _vector_search, build_query, limit, categories, exclude_uri
+        )
+    except ExecutorBusyError:
+        raise HTTPException(
+            status_code=503, detail="Search is busy, please retry shortly."
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # a rebuild noticed while this ran has cleared the cache; these hits may be stale
+    if table_watch.seen == generation:
+        search_cache.put(cache_key, hits)
+    return hits
+
+
+def _row_vector(table, image_uri: str) -> List[float]:
+    vector = get_row_vector(table, image_uri)
+    if vector is None:
+        raise LookupError(f"Image not found in index: {image_uri}")
+    return vector
+
+
+def _parse_vector(value: Any) -> Optional[List[float]]:
+    """Accept a query vector as a list or a JSON-encoded list (form field)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="query_vector must be a list")
+    if not isinstance(value, list) or not value:
+        raise HTTPException(status_code=400, detail="query_vector must be a list")
+    try:
+        return [float(x) for x in value]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="query_vector must be numeric")
+
+
+def _page_response(
+    message: str,
+    hits: dict,
+    page: int,
+    per_page: int,
+    include_distances: bool = False,
+    include_vector: bool = False,
+) -> dict:
+    results = hits["results"]
+    total_results = len(results)
+    total_pages = max(1, (total_results + per_page - 1) // per_page)
+    if page > total_pages:
+        page = total_pages
+
+    offset = (page - 1) * per_page
+    response = {
+        "message": message,
+        "results": results[offset : offset + per_page],
+        "pagination": {
+            "page": page,
+            "per_page": per_page,
+            "total_results": total_results,
+            "total_pages": total_pages,
+            "has_next": page < total_pages,
+            "has_prev": page > 1,
+        },
+    }
+    if include_distances:
+        response["distances"] = hits["distances"][offset : offset + per_page]
+    if include_vector:
+        response["query_vector"] = hits["query_vector"]
+    return response
+
+
+def _store_query_image(image_bytes: bytes, filename: str) -> None:
+    """Persist an uploaded query image (local vs S3); runs after the response is sent."""
+    try:
+        if ENVIRONMENT == "development":
+            file_path = Path(UPLOAD_FOLDER_FABRIC) / filename
+            with file_path.open("wb") as f:
+                f.write(image_bytes)
+            logThis.info(f"File saved locally at {file_path}", extra={"color": "green"})
+        else:
+            s3_key = f"uploaded/search/{filename}"
+            if upload_file(image_bytes, s3_key):
+                file_url = generate_cdn_url(s3_key)
+                logThis.info(
+                    f"File saved to S3 at {file_url}", extra={"color": "green"}
+                )
+    except Exception as e:
+        logThis.error(f"Saving search image failed: {e}")
+
+
+@router.post("", response_model=SearchResponse, response_model_exclude_none=True)
 async def image_search(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: Optional[UploadFile] = File(None),
     search_term: Optional[str] = Form(None),
     category: Optional[List[str]] = Form(None),
     limit: Optional[int] = Form(None),
     page: Optional[int] = Form(None),
     per_page: Optional[int] = Form(None),
+    query_vector: Optional[str] = Form(None),
+    image_uri: Optional[str] = Form(None),
+    include_distances: bool = Form(False),
+    include_vector: bool = Form(False),
 ):
     """
     Unified search endpoint.
     - Supports JSON requests (MCP tools)
     - Supports multipart form-data (file upload + search_term)
+    - Supports a precomputed ``query_vector`` or an indexed ``image_uri``
+      ("more like this") as the query; ``include_distances`` / ``include_vector``
+      return the hit distances and the query vector for re-ranking and paging
 
     Rate limited to 30 searches per minute per IP.
     """
@@ -51,12 +283,9 @@ async def image_search(
         content_type = request.headers.get("content-type", "")
         parsed_categories = parse_list(category)
         sanitized_categories = sanitize(parsed_categories)
-        print("DEBUG  sanitized_categories:", sanitized_categories)
-        # final_categories = replace_with_multiple(
-        #     sanitized_categories, target="product", replacements=["single", "group"]
-        # )
-        # print("DEBUG final_categories:", final_categories)
+        logThis.debug(f"Search categories: {sanitized_categories}")
 
+        raw_vector: Any = query_vector
         if "application/json" in content_type:
             body = await request.json()
             search_term = body.get("search_term")
@@ -64,6 +293,10 @@ async def image_search(
             page = body.get("page", 1)
             per_page = body.get("per_page", 10)
             file = body.get("file")
+            raw_vector = body.get("query_vector")
+            image_uri = body.get("image_uri")
+            include_distances = bool(body.get("include_distances", False))
+            include_vector = bool(body.get("include_vector", False))
         else:
             # Normalize empty file from Swagger UI
             if file is not None and getattr(file, "filename", "") == "":
@@ -77,6 +310,7 @@ async def image_search(
         # Ensure per_page is never None for arithmetic operations
         per_page = per_page or 10
         page = page or 1
+        vector = _parse_vector(raw_vector)
 
         # Profanity filter
         if search_term:
@@ -91,8 +325,8 @@ async def image_search(
         if page < 1:
             page = 1
 
-        table = get_table(DATABASE_PATH, TABLE_NAME)
-        warm_up_table_model(table)
+        search_start = time.time()
+        limit = limit or 20
 
         # IMAGE SEARCH
         if file and file.filename:
@@ -101,105 +335,77 @@ async def image_search(
 
             filename = secure_filename(file.filename)
             image_bytes = await file.read()
-            image = Image.open(io.BytesIO(image_bytes))
 
-            search_start = time.time()
-            limit = limit or 20
-            _, image_paths = run_vector_search(
-                table, Fabric, image, limit=limit, category=sanitized_categories
-            )
-            print("DEBUG image_paths:", image_paths)
-            print("DEBUG sanitized_categories in image search:", sanitized_categories)
-            search_time = time.time() - search_start
-            logThis.info(
-                f"Vector search took {search_time:.4f}s", extra={"color": "green"}
+            hits = await _cached_vector_search(
+                image_cache_key(image_bytes, sanitized_categories, limit),
+                lambda _table: load_image(image_bytes, MODEL_SIDE, site="search"),
+                limit,
+                sanitized_categories,
             )
+            message = "File uploaded successfully after search"
 
-            # Pagination
-            total_results = len(image_paths)
-            total_pages: int = max(1, (total_results + per_page - 1) // per_page)
-            if page is None:
-                page = 1
-            if page > total_pages:
-                page = total_pages
-
-            offset = (page - 1) * per_page
-            paginated_results = image_paths[offset : offset + per_page]
-
-            # Save file (local vs S3)
-            if ENVIRONMENT == "development":
-                file_path = Path(UPLOAD_FOLDER_FABRIC) / filename
-                with file_path.open("wb") as f:
-                    f.write(image_bytes)
-                logThis.info(
-                    f"File saved locally at {file_path}", extra={"color": "green"}
-                )
-            else:
-                s3_key = f"uploaded/search/{filename}"
-                await file.seek(0)
-                upload_success = upload_file(await file.read(), s3_key)
-                if upload_success:
-                    file_url = generate_cdn_url(s3_key)
-                    logThis.info(
-                        f"File saved to S3 at {file_url}", extra={"color": "green"}
-                    )
-
-            return {
-                "message": "File uploaded successfully after search",
-                "results": paginated_results,
-                "pagination": {
-                    "page": page,
-                    "per_page": per_page,
-                    "total_results": total_results,
-                    "total_pages": total_pages,
-                    "has_next": page < total_pages,
-                    "has_prev": page > 1,
-                },
-            }
+            # Save file (local vs S3) once the response has been sent
+            background_tasks.add_task(_store_query_image, image_bytes, filename)
 
-        # TEXT SEARCH
-        elif search_term:
-            search_start = time.time()
-            limit = limit or 20
-            _, all_results = run_vector_search(
-                table, Fabric, search_term, limit=limit, category=sanitized_categories
+        # PRECOMPUTED VECTOR SEARCH
+        elif vector is not None:
+            query = vector
+            hits = await _cached_vector_search(
+                vector_cache_key(query, sanitized_categories, limit),
+                lambda _table: query,
+                limit,
+                sanitized_categories,
             )
-            print("sanitized_categories in text search:", sanitized_categories)
+            message = "success"
 
-            search_time = time.time() - search_start
-            logThis.info(
-                f"Text search took {search_time:.4f}s", extra={"color": "green"}
+        # MORE LIKE THIS (an already indexed image is the query)
+        elif image_uri:
+            source = image_uri.strip()
+            hits = await _cached_vector_search(
+                uri_cache_key(source, sanitized_categories, limit),
+                lambda table: _row_vector(table, source),
+                limit,
+                sanitized_categories,
+                exclude_uri=source,
             )
+            message = "success"
 
-            total_results = len(all_results)
-            total_pages = max(1, (total_results + per_page - 1) // per_page)
-            if page is None:
-                page = 1
-            if page > total_pages:
-                page = total_pages
-
-            offset = (page - 1) * per_page
-            paginated_results = all_results[offset : offset + per_page]
-
-            return {
-                "message": "success",
-                "results": paginated_results,
-                "pagination": {
-                    "page": page,
-                    "per_page": per_page,
-                    "total_results": total_results,
-                    "total_pages": total_pages,
-                    "has_next": page < total_pages,
-                    "has_prev": page > 1,
-                },
-            }
+        # TEXT SEARCH
+        elif search_term:
+            term = search_term
+            hits = await _cached_vector_search(
+                text_cache_key(term, sanitized_categories, limit),
+                lambda _table: term,
+                limit,
+                sanitized_categories,
+            )
+            message = "success"
 
         # Invalid request
         else:
             raise HTTPException(status_code=400, detail="Missing search term or file.")
 
+        search_time = time.time() - search_start
+        logThis.info(f"Search took {search_time:.4f}s", extra={"color": "green"})
+
+        return _page_response(
+            message, hits, page, per_page, include_distances, include_vector
+        )
+
     except HTTPException:
         raise
     except Exception as e:
         logThis.error(f"Search failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stats")
+async def search_stats():
+    """Readiness flag, cache counters, embedding batches, pool load and decode costs."""
+    return {
+        "ready": is_table_ready(DATABASE_PATH, TABLE_NAME),
+        "cache": search_cache.stats(),
+        "embedder": get_embedding_service().stats(),
+        "executor": search_executor.stats(),
+        "decode": decode_stats(),
+    }
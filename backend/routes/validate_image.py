@@ -1,5 +1,4 @@
 import asyncio
-import io
 import json
 import re
 import time
@@ -8,9 +7,10 @@ from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, File, UploadFile
 from fastapi.responses import JSONResponse
-from PIL import ExifTags, Image
 
 from utils.groq_client import groq_vision_check
+from utils.image_loader import load_image
+from utils.image_payload import prepare_image_payload
 
 # Optional CV functions use opencv; install opencv-python-headless
 # mypy doesn't ship stubs for cv2/numpy in many environments; declare as Optional[Any]
@@ -53,8 +53,6 @@ Respond **only** with valid JSON exactly in this format (no commentary):
 Also: If "texture_visible" is true and "texture_confidence" >= 0.6, do not return a reason that contradicts that (e.g., "contains scene with multiple objects"); instead set "verdict":"valid" unless there are people/mannequins. Return JSON only.
 """
 
-MAX_SIDE = 1024
-JPEG_QUALITY = 80
 GROQ_TIMEOUT_SEC = 15
 
 # ---------------- CACHE ----------------
@@ -84,56 +82,8 @@ def _cache_set(img_hash: str, verdict_obj: dict) -> None:
         _verdict_cache.popitem(last=False)
 
 
-# ---------------- IMAGE UTIL ----------------
-def _resize_to_jpeg(data: bytes) -> bytes:
-    with Image.open(io.BytesIO(data)) as im:
-        try:
-            # handle EXIF orientation if present
-            orientation = None
-            for k, v in ExifTags.TAGS.items():
-                if v == "Orientation":
-                    orientation = k
-                    break
-            exif = getattr(im, "_getexif", lambda: None)()
-            if exif is not None and orientation is not None:
-                orientation_value = exif.get(orientation)
-                if orientation_value == 3:
-                    im = im.rotate(180, expand=True)  # type: ignore[attr-defined,assignment]
-                elif orientation_value == 6:
-                    im = im.rotate(270, expand=True)  # type: ignore[attr-defined,assignment]
-                elif orientation_value == 8:
-                    im = im.rotate(90, expand=True)  # type: ignore[attr-defined,assignment]
-        except Exception:
-            pass
-
-        im = im.convert("RGB")  # type: ignore[attr-defined,assignment]
-        w, h = im.size  # type: ignore[attr-defined]
-        if max(w, h) > MAX_SIDE:
-            if w >= h:
-                nw = MAX_SIDE
-                nh = int(h * (MAX_SIDE / w))
-            else:
-                nh = MAX_SIDE
-                nw = int(w * (MAX_SIDE / h))
-            # Use getattr to avoid mypy complaining about missing LANCZOS symbol in PIL stubs
-            resample_filter = getattr(Image, "LANCZOS", getattr(Image, "BICUBIC"))
-            im = im.resize((nw, nh), resample_filter)  # type: ignore[attr-defined,assignment]
-        out = io.BytesIO()
-        im.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)  # type: ignore[attr-defined]
-        return out.getvalue()
-
-
-def _to_b64(data: bytes) -> str:
-    import base64
-
-    return base64.b64encode(data).decode("ascii")
-
-
 async def _groq_check_base64(b64_str: str) -> str:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        None, groq_vision_check, b64_str, VALIDATION_PROMPT
-    )
+    return await groq_vision_check(b64_str, VALIDATION_PROMPT)
 
 
 def _strip_code_fences(text: Optional[str]) -> str:
@@ -184,6 +134,9 @@ def _texture_metrics_from_bytes(
     """
     Returns dict: {"lap_var": float, "edge_density": float, "patch_std_mean": float}
     Returns None if cv2 not available or decode fails.
+
+    The upload is decoded straight to grayscale at ``target_size`` through the
+    shared draft-mode loader, never at full resolution.
     """
     # copy to locals so mypy can see the non-None type after the check
     np_local = np
@@ -191,20 +144,8 @@ def _texture_metrics_from_bytes(
     if cv2_local is None or np_local is None:
         return None
     try:
-        # mypy now knows np_local and cv2_local are not None
-        arr = np_local.frombuffer(image_bytes, dtype=np_local.uint8)
-        im = cv2_local.imdecode(arr, cv2_local.IMREAD_COLOR)
-        if im is None:
-            return None
-
-        h, w = im.shape[:2]
-        scale = target_size / max(h, w) if max(h, w) > target_size else 1.0
-        if scale != 1.0:
-            im = cv2_local.resize(
-                im, (int(w * scale), int(h * scale)), interpolation=cv2_local.INTER_AREA
-            )
-
-        gray = cv2_local.cvtColor(im, cv2_local.COLOR_BGR2GRAY)
+        img = load_image(image_bytes, target_size, mode="L", site="validate")
+        gray = np_local.asarray(img, dtype=np_local.uint8)
 
         lap = cv2_local.Laplacian(gray, cv2_local.CV_64F)
         lap_var = float(lap.var())
@@ -321,7 +262,9 @@ async def validate_image(image: UploadFile = File(...)):
         reason: str = ""
 
         local_metrics_raw = (
-            _texture_metrics_from_bytes(raw) if cv2 is not None else None
+            await asyncio.to_thread(_texture_metrics_from_bytes, raw)
+            if cv2 is not None
+            else None
         )
         if local_metrics_raw is not None:
             if local_metrics_raw.get("lap_var", 0.0) < 20:
@@ -342,10 +285,13 @@ async def validate_image(image: UploadFile = File(...)):
                     }
                 )
 
-        small_jpeg = await asyncio.to_thread(_resize_to_jpeg, raw)
+        payload = await asyncio.to_thread(
+            prepare_image_payload, raw, "validate", img_hash
+        )
+        small_jpeg = payload.data
         t2 = time.time()
 
-        b64 = _to_b64(small_jpeg)
+        b64 = payload.base64
         try:
             response_text = await asyncio.wait_for(
                 _groq_check_base64(b64), timeout=GROQ_TIMEOUT_SEC
@@ -423,9 +369,8 @@ async def validate_image(image: UploadFile = File(...)):
                 reason = "uncertain: unparseable response from model"
             model_meta["heuristic_reason"] = reason
 
-        local_metrics = (
-            _texture_metrics_from_bytes(small_jpeg) if cv2 is not None else None
-        )
+        # same upload, already measured before the model call
+        local_metrics = local_metrics_raw
         if local_metrics:
             model_meta["metrics"] = local_metrics
 
@@ -0,0 +1,216 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from constants import ANALYSIS_MAX_IN_FLIGHT, ANALYSIS_MAX_QUEUE
+from utils.background_loop import BackgroundLoop, get_background_loop
+
+
+class AnalysisBusyError(RuntimeError):
+    """Raised when the analysis queue is full and a new analysis is refused."""
+
+
+class _Job:
+    __slots__ = ("request_id", "fn", "args", "future", "enqueued_at")
+
+    def __init__(self, request_id: str, fn: Callable[..., Any], args: Tuple[Any, ...]):
+        self.request_id = request_id
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class AnalysisScheduler:
+    """Fair, bounded scheduler for the vision calls of all running analyses.
+
+    Each analysis (``request_id``) has its own queue and the dispatcher takes
+    one call from each queue in turn, so a burst of uploads gets every first
+    variation out before anyone's sixth. At most ``max_in_flight`` calls run at
+    once; with ``max_queue`` set, submissions beyond that many waiting calls are
+    refused with AnalysisBusyError.
+
+    Scheduling runs on a background event loop. Sync calls run on a thread
+    pool sized to the in-flight limit; coroutine functions are awaited directly.
+    Callers get a ``concurrent.futures.Future`` per call, settled from a thread
+    so that its done callbacks never block the loop.
+
+    Args:
+        max_in_flight (int): Calls running at once (match the Groq rate limit).
+        max_queue (int): Waiting calls at which submissions are refused (0 = unbounded).
+        background (BackgroundLoop, optional): Loop to schedule on.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ANALYSIS_MAX_IN_FLIGHT,
+        max_queue: int = ANALYSIS_MAX_QUEUE,
+        background: Optional[BackgroundLoop] = None,
+    ) -> None:
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_queue = max(0, int(max_queue))
+        self._background = background or get_background_loop()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="analysis"
+        )
+        # owned by the loop thread
+        self._queues: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._running: Dict[str, Set[asyncio.Task]] = {}
+        # counters, also read by stats() from other threads
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.peak_queue = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self._timed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._call_total = 0.0
+        self._call_max = 0.0
+
+    def submit_many(
+        self,
+        request_id: str,
+        calls: Sequence[Tuple[Callable[..., Any], Tuple[Any, ...]]],
+    ) -> List[Future]:
+        """Queue ``fn(*args)`` calls for one analysis; thread-safe.
+
+        Raises:
+            AnalysisBusyError: The queue cannot take all of the calls.
+        """
+        with self._lock:
+            if self.max_queue and self.queued + len(calls) > self.max_queue:
+                self.rejected += 1
+                raise AnalysisBusyError("Analysis queue is full")
+            self.queued += len(calls)
+            self.submitted += len(calls)
+            self.peak_queue = max(self.peak_queue, self.queued)
+
+        jobs = [_Job(request_id, fn, tuple(args)) for fn, args in calls]
+        self._background.call(self._enqueue, jobs)
+        return [job.future for job in jobs]
+
+    def submit(self, request_id: str, fn: Callable[..., Any], *args: Any) -> Future:
+        return self.submit_many(request_id, [(fn, args)])[0]
+
+    def cancel(self, request_id: str) -> None:
+        """Drop the waiting calls of an analysis and cancel its running coroutines."""
+        self._background.call(self._cancel, request_id)
+
+    # ---- loop thread ----
+    def _enqueue(self, jobs: List[_Job]) -> None:
+        for job in jobs:
+            self._queues.setdefault(job.request_id, deque()).append(job)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queues and self.in_flight < self.max_in_flight:
+            request_id = next(iter(self._queues))
+            queue = self._queues[request_id]
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(request_id)
+            else:
+                del self._queues[request_id]
+
+            with self._lock:
+                self.queued -= 1
+                if not job.future.set_running_or_notify_cancel():
+                    self.cancelled += 1
+                    continue
+                self.in_flight += 1
+
+            task = asyncio.get_running_loop().create_task(self._run(job))
+            self._running.setdefault(request_id, set()).add(task)
+            task.add_done_callback(functools.partial(self._forget, request_id))
+
+    def _forget(self, request_id: str, task: asyncio.Task) -> None:
+        tasks = self._running.get(request_id)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._running[request_id]
+
+    def _settle(self, settle: Callable[..., Any], *args: Any) -> None:
+        # done callbacks run in the thread that settles the future; keep them
+        # (and the result-store writes they do) off the scheduling loop
+        asyncio.get_running_loop().run_in_executor(None, settle, *args)
+
+    async def _run(self, job: _Job) -> None:
+        started = time.perf_counter()
+        wait = started - job.enqueued_at
+        settle: Callable[[Any], None]
+        value: Any
+        try:
+            if asyncio.iscoroutinefunction(job.fn):
+                result = await job.fn(*job.args)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, job.fn, *job.args)
+        except asyncio.CancelledError:
+            outcome, settle, value = (
+                "cancelled",
+                job.future.set_exception,
+                CancelledError(),
+            )
+        except Exception as e:
+            outcome, settle, value = "failed", job.future.set_exception, e
+        else:
+            outcome, settle, value = "completed", job.future.set_result, result
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.in_flight -= 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self._timed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._call_total += elapsed
+            self._call_max = max(self._call_max, elapsed)
+        # counted first, so stats() already includes a call whose future is done
+        self._settle(settle, value)
+        self._dispatch()
+
+    def _cancel(self, request_id: str) -> None:
+        for job in self._queues.pop(request_id, ()):
+            with self._lock:
+                self.queued -= 1
+                self.cancelled += 1
+            self._settle(job.future.cancel)
+        for task in list(self._running.get(request_id, ())):
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            timed = self._timed
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "peak_queue": self.peak_queue,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "avg_wait_ms": (
+                    round(self._wait_total / timed * 1000, 2) if timed else 0.0
+                ),
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_call_ms": (
+                    round(self._call_total / timed * 1000, 2) if timed else 0.0
+                ),
+                "max_call_ms": round(self._call_max * 1000, 2),
+            }
+
+
+analysis_scheduler = AnalysisScheduler()
@@ -1,47 +1,89 @@
-from typing import Any, Dict
-from utils.groq_ap_initialize import groq_initialize, MODEL
+import json
+import re
+from typing import Any, Dict, List, Optional
 
-client = groq_initialize()
+from constants import GROQ_VISION_MODEL
+from services.llm_gateway import image_message, llm_gateway
 
+# completion budget per variation in the single-call (batch) mode
+BATCH_TOKENS_PER_VARIATION = 160
 
-def analyse_fabric_image(image_base64: str, prompt: str, idx: int) -> Dict[str, Any]:
+
+async def analyse_fabric_image(
+    image_base64: str, prompt: str, idx: int, mime_type: str = "image/jpeg"
+) -> Dict[str, Any]:
     """
     Analyse a fabric image using Groq's vision model.
-    image_base64 must be raw base64 string (no data URL prefix).
+    image_base64 must be raw base64 string (no data URL prefix) of a ``mime_type`` image.
     """
 
     try:
         print(f"[Thread] Prompt: {prompt[:50]}...")
 
-        # Groq requires image as data URL
-        data_url = f"data:image/png;base64,{image_base64}"
-
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": data_url},
-                        },
-                    ],
-                }
-            ],
+        result = await llm_gateway.chat(
+            image_message(prompt, image_base64, mime_type),
+            model=GROQ_VISION_MODEL,
             max_tokens=512,
         )
 
-        # extract text in a safe, predictable way
-        if response.choices and response.choices[0].message.content:
-            text = response.choices[0].message.content.strip()
+        if result.text:
             print("[Thread] Response received.")
-            return {"id": idx, "response": text}
+            return {"id": idx, "response": result.text, "tokens": result.tokens}
 
         print("[Thread] No text in response.")
-        return {"id": idx, "response": None}
+        return {"id": idx, "response": None, "tokens": result.tokens}
 
     except Exception as e:
         print("Groq Vision Error:", e)
         return {"id": idx, "response": None}
+
+
+def _parse_variations(text: str, count: int) -> List[Optional[str]]:
+    """Split a JSON ``{"variations": [...]}`` reply into ``count`` slots."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip(), flags=re.IGNORECASE)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            data = json.loads(text[start : end + 1]) if start != -1 else {}
+        except json.JSONDecodeError:
+            data = {}
+
+    items = data.get("variations", []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        items = []
+    # only non-empty strings count; nulls, objects and lists are left for the
+    # per-slot fallback to regenerate
+    texts = [
+        item.strip() or None if isinstance(item, str) else None
+        for item in items[:count]
+    ]
+    return texts + [None] * (count - len(texts))
+
+
+async def analyse_fabric_variations(
+    image_base64: str, prompt: str, count: int, mime_type: str = "image/jpeg"
+) -> Dict[str, Any]:
+    """
+    Ask Groq's vision model for ``count`` variations in a single JSON-mode request.
+    Returns {"responses": [...], "tokens": int}; slots the reply did not fill are None.
+    """
+
+    try:
+        print(f"[Batch] Prompt: {prompt[:50]}... ({count} variations)")
+
+        result = await llm_gateway.chat(
+            image_message(prompt, image_base64, mime_type),
+            model=GROQ_VISION_MODEL,
+            max_tokens=BATCH_TOKENS_PER_VARIATION * count,
+            response_format={"type": "json_object"},
+        )
+        return {
+            "responses": _parse_variations(result.text, count),
+            "tokens": result.tokens,
+        }
+
+    except Exception as e:
+        print("Groq Vision Error:", e)
+        return {"responses": [None] * count, "tokens": 0}
@@ -0,0 +1,330 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from diskcache import Cache
+
+from constants import CACHE_DIR, JOB_LOCK_TTL, JOB_RETENTION
+from utils.logger import logThis
+
+FINISHED = ("succeeded", "failed")
+# a running job re-arms its table lock this often, so a long build never loses it
+LOCK_REFRESH_SECONDS = max(1.0, JOB_LOCK_TTL / 3)
+# how often a process re-reads a table's generation from the store
+GENERATION_CHECK_SECONDS = 1.0
+
+_store: Optional[Cache] = None
+_store_lock = threading.Lock()
+
+
+class JobConflictError(RuntimeError):
+    """Raised when a table already has a create/update job in progress."""
+
+    def __init__(self, message: str, job_id: Optional[str] = None):
+        super().__init__(message)
+        self.job_id = job_id
+
+
+def get_job_store() -> Cache:
+    """Return the on-disk job store, shared by the API and its worker processes."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = Cache(str(CACHE_DIR / "jobs"))
+    return _store
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _lock_key(table_name: str) -> str:
+    return f"lock:{table_name}"
+
+
+def _generation_key(table_name: str) -> str:
+    return f"generation:{table_name}"
+
+
+def table_generation(table_name: str) -> int:
+    """Number of successful create/update jobs recorded for a table."""
+    return int(get_job_store().get(_generation_key(table_name), default=0))
+
+
+def _bump_generation(table_name: str) -> int:
+    return get_job_store().incr(_generation_key(table_name))
+
+
+class GenerationWatch:
+    """Notices, in any process, that a job has rebuilt a table.
+
+    Each successful job bumps the table's generation in the shared job store;
+    ``changed`` compares it with the last one seen, re-reading the store at most
+    every ``interval`` seconds.
+
+    Args:
+        table_name (str): Table to watch.
+        interval (float): Seconds between store reads.
+    """
+
+    def __init__(
+        self, table_name: str, interval: float = GENERATION_CHECK_SECONDS
+    ) -> None:
+        self.table_name = table_name
+        self.interval = interval
+        # read on the first check, so nothing touches the store at import time
+        self._seen: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def seen(self) -> Optional[int]:
+        """The generation ``changed`` last read, None before the first check."""
+        with self._lock:
+            return self._seen
+
+    def changed(self) -> bool:
+        """True once for every generation this process has not seen yet."""
+        now = time.monotonic()
+        with self._lock:
+            if self._seen is not None and now - self._checked_at < self.interval:
+                return False
+            self._checked_at = now
+            generation = table_generation(self.table_name)
+            if self._seen is None or generation == self._seen:
+                self._seen = generation
+                return False
+            self._seen = generation
+            return True
+
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    store = get_job_store()
+    with store.transact():
+        record = store.get(_job_key(job_id))
+        if record is None:
+            return
+        record.update(fields)
+        store.set(_job_key(job_id), record, expire=JOB_RETENTION)
+
+
+def _release_lock(table_name: str, job_id: str) -> None:
+    store = get_job_store()
+    with store.transact():
+        if store.get(_lock_key(table_name)) == job_id:
+            store.delete(_lock_key(table_name))
+
+
+def _refresh_lock(table_name: str, job_id: str) -> bool:
+    """Re-arm the lock's expiry while ``job_id`` still holds it."""
+    store = get_job_store()
+    with store.transact():
+        if store.get(_lock_key(table_name)) != job_id:
+            return False
+        return bool(store.touch(_lock_key(table_name), expire=JOB_LOCK_TTL))
+
+
+def _keep_lock(table_name: str, job_id: str, stop: threading.Event) -> None:
+    while not stop.wait(LOCK_REFRESH_SECONDS):
+        if not _refresh_lock(table_name, job_id):
+            logThis.warning(f"Job {job_id} no longer holds the lock on {table_name}")
+            return
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _release_stale_lock(table_name: str) -> None:
+    """Free a lock whose job finished or whose worker died without cleaning up."""
+    holder = get_job_store().get(_lock_key(table_name))
+    if holder is None:
+        return
+    record = get_job_store().get(_job_key(holder))
+    if (
+        record is None
+        or record["status"] in FINISHED
+        or (record["status"] == "running" and not _pid_alive(record.get("pid")))
+    ):
+        _release_lock(table_name, holder)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a job record with its current ETA, or None if unknown or expired."""
+    record = get_job_store().get(_job_key(job_id))
+    if record is None:
+        return None
+
+    progress = record["progress"]
+    total, done = progress.get("total"), progress.get("embedded", 0)
+    eta = None
+    if record["status"] == "running" and total and done and record["started_at"]:
+        elapsed = time.time() - record["started_at"]
+        eta = round(max(0.0, elapsed / done * (total - done)), 1)
+    return {**record, "eta_seconds": eta}
+
+
+class JobProgress:
+    """Progress callback for process_table that accumulates counts in the job record.
+
+    ``total`` replaces the expected number of images to embed; every other
+    keyword is added to the matching counter.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def __call__(self, total: Optional[int] = None, **increments: int) -> None:
+        store = get_job_store()
+        with store.transact():
+            record = store.get(_job_key(self.job_id))
+            if record is None:
+                return
+            progress = record["progress"]
+            if total is not None:
+                progress["total"] = total
+            for name, count in increments.items():
+                progress[name] = progress.get(name, 0) + count
+            store.set(_job_key(self.job_id), record, expire=JOB_RETENTION)
+
+
+def _run_table_job(job_id: str, kind: str, params: Dict[str, Any]) -> None:
+    """Worker process entry point: run one create/update and record the outcome."""
+    _update_job(job_id, status="running", started_at=time.time(), pid=os.getpid())
+    params = dict(params)
+    stop = threading.Event()
+    threading.Thread(
+        target=_keep_lock,
+        args=(params["table_name"], job_id, stop),
+        name=f"lock-{job_id[:8]}",
+        daemon=True,
+    ).start()
+    try:
+        from image_search.db.create_table import process_table
+        from image_search.schema import get_schema_by_name
+
+        schema = get_schema_by_name(params.pop("schema_name"))
+        if schema is None:
+            raise ValueError("Unknown schema")
+        process_table(schema=schema, progress=JobProgress(job_id), **params)
+    except Exception as e:
+        logThis.error(f"Table {kind} job {job_id} failed: {e}")
+        _update_job(job_id, status="failed", error=str(e), finished_at=time.time())
+        raise SystemExit(1)
+    else:
+        # every process serving the table sees the new generation and drops its caches
+        _bump_generation(params["table_name"])
+        _update_job(job_id, status="succeeded", finished_at=time.time())
+        logThis.info(f"Table {kind} job {job_id} finished", extra={"color": "green"})
+    finally:
+        stop.set()
+        _release_lock(params["table_name"], job_id)
+
+
+def _watch(
+    job_id: str, table_name: str, process: multiprocessing.process.BaseProcess
+) -> None:
+    """Wait for the worker; fail the job if it died without reporting."""
+    process.join()
+    record = get_job_store().get(_job_key(job_id))
+    if record and record["status"] not in FINISHED:
+        _update_job(
+            job_id,
+            status="failed",
+            error=f"Worker exited with code {process.exitcode}",
+            finished_at=time.time(),
+        )
+    _release_lock(table_name, job_id)
+
+
+def start_table_job(
+    kind: str,
+    *,
+    database: str,
+    table_name: str,
+    root_folder: str,
+    schema_name: str = "Fabric",
+    **options: Any,
+) -> Dict[str, Any]:
+    """Start a table create/update in a worker process and return its job record.
+
+    Only one job per table may run at a time; a second one raises JobConflictError.
+    A successful job bumps the table's generation (see GenerationWatch).
+
+    Args:
+        kind (str): "create" or "update", used in messages.
+        database (str): The LanceDB database path.
+        table_name (str): The table to create or update.
+        root_folder (str): Root folder (local or s3://) holding the images.
+        schema_name (str): Schema name resolved in the worker by get_schema_by_name.
+        **options: Further process_table arguments (force, resume, incremental).
+    """
+    store = get_job_store()
+    job_id = uuid.uuid4().hex
+
+    _release_stale_lock(table_name)
+    if not store.add(_lock_key(table_name), job_id, expire=JOB_LOCK_TTL):
+        holder = store.get(_lock_key(table_name))
+        raise JobConflictError(
+            f"A job is already running on table '{table_name}'.", job_id=holder
+        )
+
+    record = {
+        "id": job_id,
+        "kind": kind,
+        "table": table_name,
+        "status": "queued",
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "pid": None,
+        "error": None,
+        "progress": {
+            "total": None,
+            "scanned": 0,
+            "embedded": 0,
+            "written": 0,
+            "deleted": 0,
+        },
+    }
+    store.set(_job_key(job_id), record, expire=JOB_RETENTION)
+
+    params = {
+        "database": database,
+        "table_name": table_name,
+        "root_folder": root_folder,
+        "schema_name": schema_name,
+        **options,
+    }
+    try:
+        # spawn: the worker must not inherit the server's event loop or threads
+        process = multiprocessing.get_context("spawn").Process(
+            target=_run_table_job,
+            args=(job_id, kind, params),
+            name=f"table-{kind}-{job_id[:8]}",
+        )
+        process.start()
+    except Exception as e:
+        _update_job(job_id, status="failed", error=str(e), finished_at=time.time())
+        _release_lock(table_name, job_id)
+        raise
+
+    threading.Thread(
+        target=_watch,
+        args=(job_id, table_name, process),
+        name=f"watch-{job_id[:8]}",
+        daemon=True,
+    ).start()
+    return record
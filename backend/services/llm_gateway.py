@@ -0,0 +1,408 @@
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from constants import (
+    GROQ_BASE_URL,
+    LLM_BURST,
+    LLM_HTTP2,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_RPM,
+    LLM_TIMEOUT,
+)
+from utils.background_loop import BackgroundLoop, get_background_loop
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 8.0  # seconds
+_END = object()  # end of a token stream
+
+
+class LLMError(RuntimeError):
+    """Raised when an LLM request fails after its retries (or cannot be retried)."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ChatResult(NamedTuple):
+    text: str
+    tokens: int
+    model: str
+    latency_ms: float
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, up to ``capacity`` stored.
+
+    Args:
+        rate (float): Refill rate per second; 0 disables limiting.
+        capacity (int): Burst size.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After if it is longer."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+class LLMGateway:
+    """Shared client for Groq's OpenAI-compatible chat completions API.
+
+    One ``httpx.AsyncClient`` (HTTP/2 when the ``h2`` package is installed) keeps
+    connections alive for every caller. When LLM_RPM is set, requests pass a token
+    bucket (LLM_RPM per minute, LLM_BURST burst); they time out after LLM_TIMEOUT seconds and are
+    retried with jittered backoff on 429/5xx and transport errors (streams only
+    until the response starts).
+
+    The client lives on the background loop; ``chat`` and ``stream`` can be
+    used from any event loop and ``chat_sync`` called from threads. Point GROQ_BASE_URL at a
+    local server to run against a fake Groq.
+    """
+
+    def __init__(
+        self,
+        base_url: str = GROQ_BASE_URL,
+        api_key: Optional[str] = None,
+        timeout: float = LLM_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        rpm: float = LLM_RPM,
+        burst: int = LLM_BURST,
+        background: Optional[BackgroundLoop] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.rpm = rpm
+        self.burst = burst
+        self.http2 = LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+        self._background = background or get_background_loop()
+        # created on the background loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._bucket: Optional[TokenBucket] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "streams": 0,
+            "tokens": 0,
+            "throttle_wait_ms": 0.0,
+            "latency_ms": 0.0,
+            "first_token_ms": 0.0,
+        }
+
+    @property
+    def api_key(self) -> str:
+        key = self._api_key or os.getenv("GROQ_API_KEY")
+        if not key:
+            raise LLMError("GROQ_API_KEY environment variable not set")
+        return key
+
+    def _count(self, **values: float) -> None:
+        with self._lock:
+            for name, value in values.items():
+                self._stats[name] += value
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                timeout=httpx.Timeout(self.timeout, connect=min(10.0, self.timeout)),
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                ),
+            )
+            self._bucket = TokenBucket(self.rpm / 60.0, self.burst)
+        return self._client
+
+    async def _post(
+        self, body: Dict[str, Any], timeout: Optional[float], stream: bool = False
+    ) -> httpx.Response:
+        """POST /chat/completions with rate limiting and retries (background loop only).
+
+        With ``stream`` the successful response is returned unread; the caller
+        must close it.
+        """
+        client = self._ensure_client()
+        assert self._bucket is not None
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        attempt = 0
+        while True:
+            waited = await self._bucket.acquire()
+            self._count(requests=1, throttle_wait_ms=waited * 1000.0)
+            try:
+                request = client.build_request(
+                    "POST",
+                    "/chat/completions",
+                    json=body,
+                    headers=headers,
+                    timeout=timeout or httpx.USE_CLIENT_DEFAULT,
+                )
+                response = await client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise LLMError(f"LLM request failed: {e}") from e
+                retry_after = None
+            else:
+                if response.status_code < 400:
+                    return response
+                await response.aread()
+                if response.status_code == 429:
+                    self._count(rate_limited=1)
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt >= self.max_retries
+                ):
+                    raise LLMError(
+                        f"LLM request failed with {response.status_code}: "
+                        f"{response.text[:200]}",
+                        status=response.status_code,
+                    )
+                retry_after = response.headers.get("retry-after")
+
+            self._count(retries=1)
+            await asyncio.sleep(_backoff(attempt, retry_after))
+            attempt += 1
+
+    async def _chat(self, body: Dict[str, Any], timeout: Optional[float]) -> ChatResult:
+        started = time.perf_counter()
+        try:
+            data = (await self._post(body, timeout)).json()
+        except Exception:
+            self._count(failed=1)
+            raise
+        choices = data.get("choices") or [{}]
+        text = ((choices[0].get("message") or {}).get("content") or "").strip()
+        tokens = int((data.get("usage") or {}).get("total_tokens") or 0)
+        latency = (time.perf_counter() - started) * 1000.0
+        self._count(succeeded=1, tokens=tokens, latency_ms=latency)
+        return ChatResult(text, tokens, data.get("model", body["model"]), latency)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        max_tokens: int = 512,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> ChatResult:
+        """Run a chat completion and return its text and token usage.
+
+        Args:
+            messages (List[Dict]): OpenAI-style messages (text or image_url parts).
+            model (str): Groq model id.
+            max_tokens (int): Completion limit.
+            temperature (float, optional): Sampling temperature.
+            response_format (Dict, optional): e.g. ``{"type": "json_object"}``.
+            timeout (float, optional): Per-attempt timeout; defaults to LLM_TIMEOUT.
+
+        Raises:
+            LLMError: The request failed after retries.
+        """
+        body = _request_body(messages, model, max_tokens, temperature)
+        if response_format:
+            body["response_format"] = response_format
+
+        loop = self._background.loop
+        if asyncio.get_running_loop() is loop:
+            return await self._chat(body, timeout)
+        return await asyncio.wrap_future(
+            self._background.run(self._chat(body, timeout))
+        )
+
+    async def _stream(
+        self,
+        body: Dict[str, Any],
+        timeout: Optional[float],
+        emit: Callable[[Any], None],
+    ) -> None:
+        """Pass each content delta of a streamed completion to ``emit``."""
+        started = time.perf_counter()
+        first_token = 0.0
+        tokens = 0
+        try:
+            response = await self._post(body, timeout, stream=True)
+            try:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    # Groq reports usage on the last chunk under x_groq
+                    usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get(
+                        "usage"
+                    )
+                    if usage:
+                        tokens = int(usage.get("total_tokens") or 0)
+                    choices = chunk.get("choices") or [{}]
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        if not first_token:
+                            first_token = (time.perf_counter() - started) * 1000.0
+                        emit(delta)
+            finally:
+                await response.aclose()
+        except Exception:
+            self._count(failed=1)
+            raise
+        latency = (time.perf_counter() - started) * 1000.0
+        self._count(
+            succeeded=1,
+            streams=1,
+            tokens=tokens,
+            latency_ms=latency,
+            first_token_ms=first_token,
+        )
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        max_tokens: int = 512,
+        temperature: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Stream a chat completion, yielding text deltas as they arrive.
+
+        The request runs on the background loop and deltas are handed to the
+        caller's loop through a queue. Closing the generator early cancels the
+        request.
+
+        Args:
+            messages (List[Dict]): OpenAI-style messages.
+            model (str): Groq model id.
+            max_tokens (int): Completion limit.
+            temperature (float, optional): Sampling temperature.
+            timeout (float, optional): Per-attempt timeout; defaults to LLM_TIMEOUT.
+
+        Raises:
+            LLMError: The request failed after retries.
+        """
+        body = _request_body(messages, model, max_tokens, temperature)
+        body["stream"] = True
+
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+
+        def emit(item: Any) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        future = self._background.run(self._stream(body, timeout, emit))
+        future.add_done_callback(lambda _: emit(_END))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    break
+                yield item
+            error = future.exception()
+            if error is not None:
+                raise error
+        finally:
+            future.cancel()
+
+    def chat_sync(
+        self, messages: List[Dict[str, Any]], model: str, **kwargs: Any
+    ) -> ChatResult:
+        """Blocking ``chat`` for sync callers; must not be called on the background loop."""
+        return self._background.run(self.chat(messages, model, **kwargs)).result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        done = stats["succeeded"]
+        stats["avg_latency_ms"] = round(stats["latency_ms"] / done, 1) if done else 0.0
+        streams = stats["streams"]
+        first_token = stats.pop("first_token_ms")
+        stats["avg_first_token_ms"] = (
+            round(first_token / streams, 1) if streams else 0.0
+        )
+        stats["latency_ms"] = round(stats["latency_ms"], 1)
+        stats["throttle_wait_ms"] = round(stats["throttle_wait_ms"], 1)
+        stats.update(http2=self.http2, rpm=self.rpm, base_url=self.base_url)
+        return stats
+
+
+def _request_body(
+    messages: List[Dict[str, Any]],
+    model: str,
+    max_tokens: int,
+    temperature: Optional[float],
+) -> Dict[str, Any]:
+    body: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+    }
+    if temperature is not None:
+        body["temperature"] = temperature
+    return body
+
+
+def image_message(
+    prompt: str, image_base64: str, mime_type: str
+) -> List[Dict[str, Any]]:
+    """A single user message with a text prompt and an inline (data URL) image."""
+    return [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prompt},
+                {
+                    "type": "image_url",
+                    "image_url": {"url": f"data:{mime_type};base64,{image_base64}"},
+                },
+            ],
+        }
+    ]
+
+
+llm_gateway = LLMGateway()
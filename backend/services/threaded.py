@@ -1,120 +1,360 @@
+import asyncio
 import threading
+import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import CancelledError, Future
+from typing import Any, Dict, Iterable, Optional
 
-from services.generate_response import analyse_fabric_image
-from utils.cache import generate_cache_key, store_response
-from utils.image_utils import convert_image_to_base64
-from utils.prompt_generator import generate_prompts
+from constants import ANALYSIS_MODE
+from services.analysis_scheduler import AnalysisBusyError, analysis_scheduler
+from services.generate_response import analyse_fabric_image, analyse_fabric_variations
+from utils.background_loop import get_background_loop
+from utils.cache import (
+    find_complete_analysis,
+    first_response,
+    generate_cache_key,
+    link_content,
+    store_response,
+)
+from utils.image_payload import ImagePayload
+from utils.logger import logThis
+from utils.prompt_generator import (
+    VARIATION_COUNT,
+    generate_batch_prompt,
+    generate_prompts,
+)
 
-executor = ThreadPoolExecutor(max_workers=6)
+# how long callers wait for the first variation of an analysis
+FIRST_RESPONSE_TIMEOUT = 60
 
+# fanout: one vision request per variation; batch: one request returning all of them
+ANALYSIS_MODES = ("fanout", "batch")
 
-def process_remaining_prompts(prompts, image_base_64, cache_key, already_stored_idx):
-    print(
-        f"Processing remaining prompts for cache={cache_key}, skipping idx={already_stored_idx}"
+
+class ModeStats:
+    """Latency and rate-limit usage of each analysis mode."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, float]] = {
+            mode: {
+                "analyses": 0,
+                "completed": 0,
+                "requests": 0,
+                "tokens": 0,
+                "upload_bytes": 0,
+                "failed_variations": 0,
+                "first_ms": 0.0,
+                "complete_ms": 0.0,
+            }
+            for mode in ANALYSIS_MODES
+        }
+
+    def add(self, mode: str, **values: float) -> None:
+        with self._lock:
+            entry = self._data[mode]
+            for name, value in values.items():
+                entry[name] += value
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for mode, entry in self._data.items():
+                analyses, completed = entry["analyses"], entry["completed"]
+                out[mode] = {
+                    **entry,
+                    "avg_first_ms": (
+                        round(entry["first_ms"] / analyses, 1) if analyses else None
+                    ),
+                    "avg_complete_ms": (
+                        round(entry["complete_ms"] / completed, 1)
+                        if completed
+                        else None
+                    ),
+                    "requests_per_analysis": (
+                        round(entry["requests"] / analyses, 2) if analyses else None
+                    ),
+                    "tokens_per_analysis": (
+                        round(entry["tokens"] / analyses, 1) if analyses else None
+                    ),
+                }
+            return out
+
+
+mode_stats = ModeStats()
+
+
+def resolve_mode(mode: Optional[str]) -> str:
+    """Normalize a requested analysis mode; None or "" picks ANALYSIS_MODE."""
+    mode = (mode or ANALYSIS_MODE).strip().lower()
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(
+            f"Unknown analysis mode '{mode}'. Use one of: {', '.join(ANALYSIS_MODES)}"
+        )
+    return mode
+
+
+class _AnalysisRun:
+    """Bookkeeping for one analysis whose variations complete on the scheduler."""
+
+    def __init__(self, cache_key: str, mode: str, payload: ImagePayload, analysis_type):
+        self.cache_key = cache_key
+        self.mode = mode
+        self.payload = payload
+        self.analysis_type = analysis_type
+        self.started = time.perf_counter()
+        self.pending = 0
+        self.first_stored = False
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def store(self, idx: int, response_text: Optional[str], tokens: int = 0) -> None:
+        store_response(self.cache_key, idx, {"id": idx, "response": response_text})
+        with self._lock:
+            first, self.first_stored = not self.first_stored, True
+        mode_stats.add(
+            self.mode,
+            tokens=tokens,
+            failed_variations=0 if response_text else 1,
+            first_ms=self.elapsed_ms() if first else 0.0,
+        )
+
+    def add_pending(self, count: int) -> None:
+        with self._lock:
+            self.pending += count
+
+    def finish_one(self) -> None:
+        with self._lock:
+            self.pending -= 1
+            done = self.pending == 0
+        if done:
+            mode_stats.add(self.mode, completed=1, complete_ms=self.elapsed_ms())
+
+
+def _submit_variations(run: _AnalysisRun, indices: Iterable[int]) -> None:
+    """Queue one single-variation request per index; each is stored as it finishes."""
+    prompts = generate_prompts(run.analysis_type)
+    indices = list(indices)
+    payload = run.payload
+    futures = analysis_scheduler.submit_many(
+        run.cache_key,
+        [
+            (
+                analyse_fabric_image,
+                (payload.base64, prompts[idx - 1], idx, payload.mime_type),
+            )
+            for idx in indices
+        ],
     )
-    futures = {
-        executor.submit(analyse_fabric_image, image_base_64, prompt, idx + 1): idx + 1
-        for idx, prompt in enumerate(prompts)
-        if idx + 1 != already_stored_idx
-    }
-
-    for future in as_completed(futures):
-        idx = futures[future]
-        try:
-            result = future.result()
-            response_text = result.get("response") if result else None
-            store_response(cache_key, idx, {"id": idx, "response": response_text})
-            print(
-                f"Background stored index={idx}, response={response_text[:30] if response_text else 'None'}"
+    run.add_pending(len(futures))
+    mode_stats.add(
+        run.mode,
+        requests=len(futures),
+        upload_bytes=len(futures) * len(payload.data),
+    )
+    for idx, future in zip(indices, futures):
+        future.add_done_callback(
+            lambda f, idx=idx: _on_variation(run, idx, f)  # type: ignore[misc]
+        )
+
+
+def _on_variation(run: _AnalysisRun, idx: int, future: Future) -> None:
+    try:
+        result = {} if future.cancelled() else future.result() or {}
+    except BaseException as e:
+        logThis.warning(f"Variation {idx} of {run.cache_key} failed: {e}")
+        result = {}
+    response_text = result.get("response")
+    run.store(idx, response_text, result.get("tokens", 0))
+    logThis.debug(f"Stored variation {idx} of {run.cache_key}")
+    run.finish_one()
+
+
+def _was_cancelled(future: Future) -> bool:
+    """Cancelled while queued, or interrupted by cancel_analysis while running."""
+    return future.cancelled() or isinstance(future.exception(), CancelledError)
+
+
+def _on_batch(run: _AnalysisRun, future: Future) -> None:
+    try:
+        result = {} if future.cancelled() else future.result() or {}
+    except BaseException as e:
+        logThis.warning(f"Batch request of {run.cache_key} failed: {e}")
+        result = {}
+    if _was_cancelled(future):
+        # settle every slot of the batch so waiters see the run complete
+        for idx in range(1, VARIATION_COUNT + 1):
+            run.store(idx, None)
+        run.finish_one()
+        return
+
+    responses = result.get("responses") or [None] * VARIATION_COUNT
+    filled = [idx for idx, text in enumerate(responses, start=1) if text]
+    mode_stats.add("batch", tokens=result.get("tokens", 0))
+    for idx in filled:
+        run.store(idx, responses[idx - 1])
+    logThis.debug(f"Batch reply: {len(filled)}/{VARIATION_COUNT} variations parsed")
+
+    missing = [idx for idx in range(1, VARIATION_COUNT + 1) if idx not in filled]
+    if missing:
+        # fill the slots the reply left empty with single-variation requests
+        if not filled:
+            logThis.info(
+                f"Batch reply of {run.cache_key} empty; falling back to fan-out"
             )
+        try:
+            _submit_variations(run, missing)
+        except AnalysisBusyError:
+            for idx in missing:
+                run.store(idx, None)
+    run.finish_one()
+
 
-        except Exception as e:
-            print(f" Exception in background prompt idx={idx}: {e}")
-            store_response(cache_key, idx, {"id": idx, "response": None})
+def start_analysis(
+    payload: ImagePayload, analysis_type, mode: Optional[str] = None
+) -> Dict[str, str]:
+    """Queue all variations of an analysis on the scheduler without waiting.
 
+    An image already analysed with the same type returns its stored key with
+    mode "cached" and queues nothing.
 
-def analyse_all_variations(image, analysis_type):
-    print("🧵 Starting analysis with threads...")
+    Returns:
+        dict: ``{"cache_key", "mode"}``; variations are stored under ``cache_key``
+        as they complete.
 
-    prompts = generate_prompts(analysis_type)
+    Raises:
+        AnalysisBusyError: The scheduler queue is full.
+    """
+    mode = resolve_mode(mode)
 
+    cached_key = find_complete_analysis(payload.digest, analysis_type, VARIATION_COUNT)
+    if cached_key is not None:
+        logThis.info(f"Reusing analysis {cached_key} for identical image")
+        return {"cache_key": cached_key, "mode": "cached"}
+
+    logThis.debug(f"Starting {mode} analysis")
     cache_key = str(uuid.uuid4())
     generate_cache_key(cache_key)
+    logThis.debug(
+        f"Image payload: {payload.mime_type} {payload.size[0]}x{payload.size[1]}, "
+        f"{len(payload.data)} bytes (upload {payload.source_bytes} bytes)"
+    )
 
-    image_base64 = convert_image_to_base64(image)
-    if not image_base64:
-        print("Failed to convert image to base64.")
-        return {"cache_key": cache_key, "first": None}
+    run = _AnalysisRun(cache_key, mode, payload, analysis_type)
+    if mode == "batch":
+        future = analysis_scheduler.submit(
+            cache_key,
+            analyse_fabric_variations,
+            payload.base64,
+            generate_batch_prompt(analysis_type, VARIATION_COUNT),
+            VARIATION_COUNT,
+            payload.mime_type,
+        )
+        run.add_pending(1)
+        mode_stats.add("batch", requests=1, upload_bytes=len(payload.data))
+        future.add_done_callback(lambda f: _on_batch(run, f))
+    else:
+        _submit_variations(run, range(1, VARIATION_COUNT + 1))
 
-    print("Image converted to base64 (length):", len(image_base64))
+    mode_stats.add(mode, analyses=1)
+    link_content(payload.digest, analysis_type, cache_key)
+    return {"cache_key": cache_key, "mode": mode}
 
-    futures = {}
-    for idx, prompt in enumerate(prompts):
-        print(f"[Thread] Prompt {idx + 1}:", prompt[:50])
-        future = executor.submit(analyse_fabric_image, image_base64, prompt, idx + 1)
-        futures[future] = idx + 1
 
-    first_response = None
+def cancel_analysis(cache_key: str) -> None:
+    """Cancel the variations of an analysis that have not completed yet."""
+    analysis_scheduler.cancel(cache_key)
 
-    for future in as_completed(futures):
-        idx = futures[future]
-        try:
-            result = future.result()
-            print(f"Future result for idx {idx}:", result)
 
-            if not result:
-                print(f"Empty result for idx {idx}")
-                continue
+async def analyse_all_variations_async(
+    payload: ImagePayload, analysis_type, mode: Optional[str] = None
+):
+    """Start an analysis and await its first stored variation.
 
-            response_id = result.get("id")
-            response_text = result.get("response")
+    Returns:
+        dict: ``{"cache_key", "first", "mode"}``; "first" is None on timeout.
+    """
+    started = await asyncio.to_thread(start_analysis, payload, analysis_type, mode)
+    first = await first_response(started["cache_key"], FIRST_RESPONSE_TIMEOUT)
+    return {**started, "first": first}
 
-            print(
-                f"Parsed → id: {response_id}, response_text: {response_text[:40] if response_text else 'None'}"
-            )
 
-            try:
-                store_response(
-                    cache_key,
-                    response_id,
-                    {"id": response_id, "response": response_text},
-                )
-                print(f"Stored response for index {response_id}")
-            except Exception as e:
-                print(f" Failed to store response {response_id}:", e)
-
-            if not first_response:
-                first_response = {"id": response_id, "response": response_text}
-                print(" First response set:", first_response)
-                break
-
-        except Exception as e:
-            print(f"Exception in future for idx {idx}:", e)
-            try:
-                store_response(cache_key, idx, {"id": idx, "response": None})
-            except Exception as e:
-                print(f" Failed to store fallback None for idx {idx}:", e)
-
-            if not first_response:
-                first_response = {"id": idx, "response": None}
-                break
-
-    if not first_response or "id" not in first_response:
-        print("ERROR: Invalid or missing first_response:", first_response)
-        return {"cache_key": cache_key, "first": {"id": 1, "response": None}}
+def analyse_all_variations(
+    payload: ImagePayload, analysis_type, mode: Optional[str] = None
+):
+    """Blocking variant of analyse_all_variations_async for sync callers (MCP tools).
 
-    try:
-        threading.Thread(
-            target=process_remaining_prompts,
-            args=(prompts, image_base64, cache_key, first_response["id"]),
-            daemon=True,
-        ).start()
-        print(" Background thread started.")
-    except Exception as e:
-        print("Failed to start background thread:", e)
-
-    print(" Returning from analyse_all_variations with:", first_response)
-
-    return {"cache_key": cache_key, "first": first_response}
+    Args:
+        payload (ImagePayload): The image prepared for the vision model.
+        analysis_type (str): "short" or "long".
+        mode (str, optional): "fanout" or "batch"; defaults to ANALYSIS_MODE.
+
+    Returns:
+        dict: ``{"cache_key", "first", "mode"}``; the other variations are read
+        back from the response cache under ``cache_key``.
+    """
+    started = start_analysis(payload, analysis_type, mode)
+    first = (
+        get_background_loop()
+        .run(first_response(started["cache_key"], FIRST_RESPONSE_TIMEOUT))
+        .result()
+    )
+    return {**started, "first": first}
+
+
+async def _benchmark_run(payload: ImagePayload, analysis_type: str, mode: str):
+    """One analysis run to completion: (first_ms, complete_ms, requests, tokens, missing)."""
+    started = time.perf_counter()
+    if mode == "batch":
+        prompt = generate_batch_prompt(analysis_type, VARIATION_COUNT)
+        result = await analyse_fabric_variations(
+            payload.base64, prompt, VARIATION_COUNT, payload.mime_type
+        )
+        elapsed = (time.perf_counter() - started) * 1000.0
+        missing = sum(1 for text in result["responses"] if not text)
+        return elapsed, elapsed, 1, result["tokens"], missing
+
+    first_ms = None
+    tokens = missing = 0
+    calls = [
+        analyse_fabric_image(payload.base64, prompt, idx, payload.mime_type)
+        for idx, prompt in enumerate(generate_prompts(analysis_type), 1)
+    ]
+    for call in asyncio.as_completed(calls):
+        result = await call
+        if first_ms is None:
+            first_ms = (time.perf_counter() - started) * 1000.0
+        tokens += result.get("tokens", 0)
+        missing += 0 if result.get("response") else 1
+    complete_ms = (time.perf_counter() - started) * 1000.0
+    return first_ms or complete_ms, complete_ms, len(calls), tokens, missing
+
+
+def benchmark_modes(
+    payload: ImagePayload, analysis_type: str, runs: int = 1
+) -> Dict[str, Dict[str, Any]]:
+    """Run both modes to completion ``runs`` times each and compare them.
+
+    Calls go straight to the LLM gateway, bypassing the shared scheduler.
+    Returns per mode: mean time to first and to all variations (ms), vision
+    requests, tokens and uploaded bytes per analysis, and unfilled slots.
+    """
+    background = get_background_loop()
+    report = {}
+    for mode in ANALYSIS_MODES:
+        totals = [0.0] * 5
+        for _ in range(runs):
+            row = background.run(_benchmark_run(payload, analysis_type, mode)).result()
+            totals = [total + value for total, value in zip(totals, row)]
+        first_ms, complete_ms, requests, tokens, missing = (t / runs for t in totals)
+        report[mode] = {
+            "first_ms": round(first_ms, 1),
+            "complete_ms": round(complete_ms, 1),
+            "requests": requests,
+            "tokens": tokens,
+            "upload_bytes": int(requests * len(payload.data)),
+            "missing_variations": missing,
+        }
+    return report
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import lancedb
+import numpy as np
+import pytest
+from lancedb.embeddings import TextEmbeddingFunction, get_registry, register
+from lancedb.pydantic import LanceModel, Vector
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# constants loads .env.<APP_ENV> from the working directory and puts CACHE_DIR under
+# the home directory; give the suite its own of both before anything imports it
+_SANDBOX = Path(tempfile.mkdtemp(prefix="tz-fabric-tests-"))
+(_SANDBOX / ".env.development").write_text(
+    "ENVIRONMENT=development\n"
+    "GROQ_API_KEY=test-key\n"
+    "AWS_ACCESS_KEY_ID=testing\n"
+    "AWS_SECRET_ACCESS_KEY=testing\n"
+    "AWS_REGION=us-east-1\n"
+)
+os.environ["APP_ENV"] = "development"
+os.environ["HOME"] = str(_SANDBOX)
+
+_cwd = os.getcwd()
+os.chdir(_SANDBOX)
+try:
+    import constants
+finally:
+    os.chdir(_cwd)
+constants.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+NDIMS = 8
+
+
+def text_vector(text: str) -> np.ndarray:
+    """Deterministic unit vector for ``text``."""
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+    vector = np.random.default_rng(seed).standard_normal(NDIMS).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@register("tz-test-embedding")
+class HashEmbedding(TextEmbeddingFunction):
+    """Stands in for SigLIP: embeds the source string itself, no model download."""
+
+    def ndims(self) -> int:
+        return NDIMS
+
+    def generate_embeddings(self, texts):
+        return [text_vector(str(text)).tolist() for text in texts]
+
+
+_embedding = get_registry().get("tz-test-embedding").create()
+
+
+class FakeFabric(LanceModel):
+    """The Fabric schema with the test embedding in place of SigLIP."""
+
+    vector: Vector(NDIMS) = _embedding.VectorField()  # type: ignore
+    image_uri: str = _embedding.SourceField()
+    tag: str
+    hash: str
+    mtime: float
+
+
+def fabric_row(uri: str, tag: str = "fabric", hash: str = "", mtime: float = 1.0):
+    return {"image_uri": uri, "tag": tag, "hash": hash or f"h-{uri}", "mtime": mtime}
+
+
+@pytest.fixture
+def lance_db(tmp_path):
+    return lancedb.connect(str(tmp_path / "database"))
+
+
+@pytest.fixture
+def fabric_table(lance_db):
+    """A small Fabric table: six rows over two tags."""
+    table = lance_db.create_table("fabrics", schema=FakeFabric)
+    table.add(
+        [
+            fabric_row(f"uploaded/{tag}/{i}.jpg", tag=tag, mtime=float(i))
+            for tag in ("silk", "denim")
+            for i in range(3)
+        ]
+    )
+    return table
+
+
+@pytest.fixture
+def search_route(monkeypatch):
+    """routes.search, imported with the test schema instead of the SigLIP one."""
+    monkeypatch.setitem(
+        sys.modules, "image_search.schema", types.SimpleNamespace(Fabric=FakeFabric)
+    )
+    import routes.search
+
+    return routes.search
+
+
+class FakeGroq:
+    """Local stand-in for Groq's OpenAI-compatible chat completions endpoint.
+
+    Replies are taken from ``script`` in order (a status code, or "ok"); once it
+    is used up every request succeeds. Successful replies echo the last message,
+    streamed as SSE chunks when the request asks for ``stream``.
+    """
+
+    def __init__(self) -> None:
+        self.script: list = []
+        self.requests: list = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}/openai/v1"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next(self, body: dict, headers) -> object:
+        with self._lock:
+            self.requests.append({"body": body, "headers": dict(headers)})
+            return self.script.pop(0) if self.script else "ok"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status: int, payload: dict, **headers: str) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name.replace("_", "-"), value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+                reply = fake._next(body, self.headers)
+                if reply != "ok":
+                    self._json(
+                        reply,
+                        {"error": {"message": f"status {reply}"}},
+                        retry_after="0",
+                    )
+                    return
+                text = f"echo: {body['messages'][-1]['content']}"
+                if body.get("stream"):
+                    self.send_response(200)
+                    self.send_header("content-type", "text/event-stream")
+                    self.send_header("connection", "close")
+                    self.end_headers()
+                    for word in text.split(" "):
+                        chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                        self.wfile.flush()
+                    usage = {
+                        "choices": [{"delta": {}}],
+                        "x_groq": {"usage": {"total_tokens": 11}},
+                    }
+                    self.wfile.write(
+                        f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n".encode()
+                    )
+                    self.close_connection = True
+                    return
+                self._json(
+                    200,
+                    {
+                        "model": body["model"],
+                        "choices": [
+                            {"message": {"role": "assistant", "content": text}}
+                        ],
+                        "usage": {"total_tokens": 7},
+                    },
+                )
+
+        return Handler
+
+
+@pytest.fixture
+def fake_groq():
+    server = FakeGroq()
+    yield server
+    server.close()
@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+
+import pytest
+
+from services import threaded
+from services.generate_response import _parse_variations
+from utils.cache import stream_responses
+from utils.image_payload import ImagePayload
+from utils.prompt_generator import VARIATION_COUNT, generate_batch_prompt
+
+
+def make_payload() -> ImagePayload:
+    return ImagePayload(
+        data=b"jpeg",
+        base64="anBlZw==",
+        mime_type="image/jpeg",
+        digest=uuid.uuid4().hex,
+        size=(64, 64),
+        source_bytes=4,
+    )
+
+
+def collect(cache_key, count=VARIATION_COUNT, timeout=5.0):
+    async def run():
+        return [r async for r in stream_responses(cache_key, count, timeout)]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        '{"variations": ["a", "b"]}',
+        '```json\n{"variations": ["a", "b"]}\n```',
+        'Sure! {"variations": ["a", "b"]} Hope that helps.',
+        '["a", "b"]',
+    ],
+)
+def test_parse_variations_accepts_common_reply_shapes(reply):
+    assert _parse_variations(reply, 3) == ["a", "b", None]
+
+
+def test_parse_variations_tolerates_garbage_and_extra_items():
+    assert _parse_variations("not json", 2) == [None, None]
+    assert _parse_variations('{"variations": "a"}', 2) == [None, None]
+    assert _parse_variations('{"variations": ["a", " ", "c", "d"]}', 3) == [
+        "a",
+        None,
+        "c",
+    ]
+
+
+def test_parse_variations_leaves_non_string_items_empty():
+    assert _parse_variations('{"variations": [null, {"x": 1}, "ok"]}', 3) == [
+        None,
+        None,
+        "ok",
+    ]
+    assert _parse_variations('[["a"], 5, " b "]', 3) == [None, None, "b"]
+
+
+def test_batch_prompt_asks_for_json_with_every_variation():
+    prompt = generate_batch_prompt("short", 4)
+
+    assert '"variations"' in prompt
+    assert "exactly 4 strings" in prompt
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        threaded.resolve_mode("parallel")
+    assert threaded.resolve_mode(" Batch ") == "batch"
+
+
+def test_batch_mode_fills_missing_slots_with_single_requests(monkeypatch):
+    batch_calls, single_calls = [], []
+
+    async def variations(image_base64, prompt, count, mime_type):
+        batch_calls.append(count)
+        return {"responses": ["one", None, "three", "four", None, "six"], "tokens": 9}
+
+    async def single(image_base64, prompt, idx, mime_type):
+        single_calls.append(idx)
+        return {"id": idx, "response": f"single {idx}", "tokens": 1}
+
+    monkeypatch.setattr(threaded, "analyse_fabric_variations", variations)
+    monkeypatch.setattr(threaded, "analyse_fabric_image", single)
+
+    started = threaded.start_analysis(make_payload(), "short", mode="batch")
+    responses = {r["id"]: r["response"] for r in collect(started["cache_key"])}
+
+    assert started["mode"] == "batch"
+    assert batch_calls == [VARIATION_COUNT]
+    assert sorted(single_calls) == [2, 5]
+    assert responses == {
+        1: "one",
+        2: "single 2",
+        3: "three",
+        4: "four",
+        5: "single 5",
+        6: "six",
+    }
+
+
+def test_fanout_mode_sends_one_request_per_variation(monkeypatch):
+    async def single(image_base64, prompt, idx, mime_type):
+        assert f"variation {idx}" in prompt
+        return {"id": idx, "response": f"text {idx}"}
+
+    monkeypatch.setattr(threaded, "analyse_fabric_image", single)
+
+    started = threaded.start_analysis(make_payload(), "short", mode="fanout")
+    responses = collect(started["cache_key"])
+
+    assert sorted(r["id"] for r in responses) == list(range(1, VARIATION_COUNT + 1))
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+from test_analysis_modes import collect, make_payload
+
+from services import threaded
+from services.analysis_scheduler import AnalysisBusyError, AnalysisScheduler
+from utils.background_loop import BackgroundLoop
+from utils.prompt_generator import VARIATION_COUNT
+
+
+@pytest.fixture
+def background():
+    return BackgroundLoop(name="scheduler-test-loop")
+
+
+def test_analyses_take_turns(background):
+    scheduler = AnalysisScheduler(max_in_flight=1, background=background)
+    gate = threading.Event()
+    order = []
+
+    def call(name):
+        gate.wait(5)
+        order.append(name)
+
+    futures = scheduler.submit_many("a", [(call, (f"a{i}",)) for i in range(1, 4)])
+    futures += scheduler.submit_many("b", [(call, (f"b{i}",)) for i in range(1, 4)])
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    # "b" is not starved behind every call of "a"
+    assert order.index("b1") < order.index("a3")
+    assert sorted(order) == ["a1", "a2", "a3", "b1", "b2", "b3"]
+    assert scheduler.stats()["completed"] == 6
+
+
+def test_full_queue_refuses_new_work(background):
+    scheduler = AnalysisScheduler(max_in_flight=1, max_queue=2, background=background)
+    gate, running = threading.Event(), threading.Event()
+
+    scheduler.submit("a", lambda: (running.set(), gate.wait(5)))
+    assert running.wait(5)
+    waiting = scheduler.submit_many("a", [(gate.wait, (5,)), (gate.wait, (5,))])
+
+    with pytest.raises(AnalysisBusyError):
+        scheduler.submit("b", gate.wait, 5)
+    gate.set()
+    for future in waiting:
+        future.result(timeout=5)
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_cancel_drops_queued_calls_and_cancels_running_ones(background):
+    scheduler = AnalysisScheduler(max_in_flight=1, background=background)
+    started = threading.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(30)
+
+    running, queued = scheduler.submit_many("a", [(slow, ()), (slow, ())])
+    assert started.wait(5)
+    scheduler.cancel("a")
+
+    with pytest.raises(CancelledError):
+        running.result(timeout=5)
+    with pytest.raises(CancelledError):
+        queued.result(timeout=5)
+    assert scheduler.stats()["cancelled"] == 2
+
+
+def test_done_callbacks_run_off_the_scheduling_loop(background):
+    scheduler = AnalysisScheduler(max_in_flight=2, background=background)
+    ran_on = []
+    done = threading.Event()
+
+    future = scheduler.submit("a", int, "7")
+    future.add_done_callback(
+        lambda f: (ran_on.append(threading.current_thread().name), done.set())
+    )
+
+    assert done.wait(5)
+    assert future.result() == 7
+    assert ran_on and ran_on[0] != background.name
+
+
+def test_cancelled_batch_settles_every_variation(monkeypatch):
+    started = threading.Event()
+
+    async def stuck(image_base64, prompt, count, mime_type):
+        started.set()
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(threaded, "analyse_fabric_variations", stuck)
+    run = threaded.start_analysis(make_payload(), "short", mode="batch")
+    assert started.wait(5)
+
+    threaded.cancel_analysis(run["cache_key"])
+    responses = collect(run["cache_key"])
+
+    assert sorted(r["id"] for r in responses) == list(range(1, VARIATION_COUNT + 1))
+    assert all(r["response"] is None for r in responses)
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.bounded_executor import BoundedExecutor, ExecutorBusyError
+
+
+def test_runs_blocking_calls_off_the_event_loop():
+    executor = BoundedExecutor(max_workers=2, name="test")
+
+    async def main():
+        loop_thread = threading.current_thread()
+        ran_on = await executor.run(threading.current_thread)
+        assert ran_on is not loop_thread
+        return await executor.run(pow, 2, 10)
+
+    assert asyncio.run(main()) == 1024
+    assert executor.stats()["completed"] == 2
+
+
+def test_rejects_calls_beyond_the_queue_limit():
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test")
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)  # first call is running, the queue is empty
+        second = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(release.wait, 5)
+        release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(main())
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["peak_queue"] == 1
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from routes import chat
+
+FABRIC_QUESTION = "What is silk fabric?"
+
+
+def _post_stream(text):
+    """POST one user message to /chat/stream and return its (event, data) pairs."""
+    app = FastAPI()
+    app.include_router(chat.router)
+
+    async def call():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/chat/stream", json={"messages": [{"role": "user", "content": text}]}
+            )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        return response.text
+
+    events = []
+    for block in asyncio.run(call()).strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append(
+            (event_line[len("event: ") :], json.loads(data_line[len("data: ") :]))
+        )
+    return events
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Stand-ins for agent.graph's run_tool and stream_fallback."""
+
+    class FakeAgent:
+        def __init__(self):
+            self.tool_result = None
+            self.deltas = ["Silk is ", "a natural ", "protein fibre."]
+            self.params = []
+
+        def run_tool(self, user_text):
+            return (self.tool_result is not None, self.tool_result)
+
+        async def stream_fallback(self, params):
+            self.params.append(params)
+            for delta in self.deltas:
+                yield delta
+
+    fake = FakeAgent()
+    monkeypatch.setattr(chat, "run_tool", fake.run_tool)
+    monkeypatch.setattr(chat, "stream_fallback", fake.stream_fallback)
+    return fake
+
+
+def test_fallback_reply_is_streamed_as_tokens_then_done(agent):
+    events = _post_stream(FABRIC_QUESTION)
+
+    names = [name for name, _ in events]
+    assert names == ["token", "token", "token", "done"]
+    assert [data["text"] for _, data in events[:-1]] == agent.deltas
+    done = events[-1][1]
+    assert done["reply"]["role"] == "assistant"
+    assert done["reply"]["content"].startswith("Silk is a natural protein fibre")
+    assert agent.params[0]["text"] == FABRIC_QUESTION
+    assert agent.params[0]["mode"] == "short"
+    assert agent.params[0]["history"][0]["role"] == "system"
+
+
+def test_tool_turn_sends_action_and_results_before_done(agent):
+    agent.tool_result = {
+        "bot_messages": ["Here are similar fabrics."],
+        "action": {"type": "search", "params": {"query": "silk"}},
+        "results": [{"id": 1, "image_url": "silk/0.jpg"}],
+    }
+
+    events = _post_stream(FABRIC_QUESTION)
+
+    assert [name for name, _ in events] == ["action", "results", "done"]
+    assert events[0][1] == {"type": "search", "params": {"query": "silk"}}
+    assert events[1][1]["results"][0]["id"] == 1
+    assert events[2][1]["reply"]["content"] == "Here are similar fabrics."
+    assert agent.params == []
+
+
+def test_greeting_gets_the_canned_reply_without_the_agent(agent):
+    events = _post_stream("hello")
+
+    assert [name for name, _ in events] == ["token", "done"]
+    assert events[0][1]["text"] == events[1][1]["reply"]["content"]
+    assert events[0][1]["text"].startswith("Hi")
+    assert agent.params == []
+
+
+def test_stream_failure_ends_with_an_error_event(agent, monkeypatch):
+    async def failing_stream(params):
+        yield "Silk "
+        raise RuntimeError("upstream closed")
+
+    monkeypatch.setattr(chat, "stream_fallback", failing_stream)
+
+    events = _post_stream(FABRIC_QUESTION)
+
+    assert events[0] == ("token", {"text": "Silk "})
+    assert events[-1][0] == "error"
+    assert "upstream closed" in events[-1][1]["detail"]
+
+
+def test_missing_agent_reports_an_error(monkeypatch):
+    monkeypatch.setattr(chat, "run_tool", None)
+    monkeypatch.setattr(chat, "stream_fallback", None)
+
+    events = _post_stream(FABRIC_QUESTION)
+
+    assert [name for name, _ in events] == ["error"]
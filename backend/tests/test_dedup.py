@@ -0,0 +1,62 @@
+import pandas as pd
+from conftest import fabric_row
+
+from image_search.db import create_table
+from image_search.db.create_table import append_images, deduplicate_table_by_hash
+from image_search.db.metadata import read_metadata
+
+
+def _uris(table):
+    return sorted(read_metadata(table, ["image_uri"])["image_uri"])
+
+
+def test_duplicates_are_removed_keeping_the_newest(fabric_table):
+    fabric_table.add(
+        [
+            fabric_row("uploaded/silk/copy-old.jpg", hash="dup", mtime=1.0),
+            fabric_row("uploaded/silk/copy-new.jpg", hash="dup", mtime=7.0),
+            fabric_row("uploaded/denim/copy.jpg", hash="dup", mtime=3.0),
+        ]
+    )
+
+    deduplicate_table_by_hash(fabric_table)
+
+    assert fabric_table.count_rows() == 7
+    assert fabric_table.count_rows("hash = 'dup'") == 1
+    assert "uploaded/silk/copy-new.jpg" in _uris(fabric_table)
+
+
+def test_table_without_duplicates_is_left_alone(fabric_table):
+    version = fabric_table.version
+
+    deduplicate_table_by_hash(fabric_table)
+
+    assert fabric_table.version == version
+
+
+def test_upsert_on_insert_keeps_one_row_per_hash(fabric_table, monkeypatch):
+    monkeypatch.setattr(create_table, "DEDUP_ON_INSERT", True)
+    stored = fabric_row("uploaded/silk/2.jpg")  # stored with mtime 2.0
+    rows = pd.DataFrame(
+        [
+            # same content as a stored row but older: ignored
+            fabric_row("uploaded/silk/older.jpg", hash=stored["hash"], mtime=0.5),
+            # same content as uploaded/silk/1.jpg (mtime 1.0) but newer: replaces it
+            fabric_row(
+                "uploaded/silk/newer.jpg", hash="h-uploaded/silk/1.jpg", mtime=5
+            ),
+            # two new copies in one batch: only the newest is inserted
+            fabric_row("uploaded/wool/a.jpg", hash="wool", mtime=1.0),
+            fabric_row("uploaded/wool/b.jpg", hash="wool", mtime=2.0),
+        ]
+    )
+
+    append_images(fabric_table, rows)
+
+    uris = _uris(fabric_table)
+    assert "uploaded/silk/older.jpg" not in uris
+    assert "uploaded/silk/newer.jpg" in uris
+    assert "uploaded/silk/1.jpg" not in uris
+    assert "uploaded/wool/b.jpg" in uris
+    assert "uploaded/wool/a.jpg" not in uris
+    assert fabric_table.count_rows() == 7
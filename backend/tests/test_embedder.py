@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.embedder import (
+    collection_name,
+    embed_image_bytes,
+    embed_images,
+    get_backend,
+)
+
+
+def _jpeg(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    # smooth colour blocks, so a reduced decode sees the same colours
+    blocks = rng.integers(0, 256, (height // 64, width // 64, 3), dtype=np.uint8)
+    pixels = np.kron(blocks, np.ones((64, 64, 1), dtype=np.uint8))
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=95)
+    return buffer.getvalue()
+
+
+def test_batch_rows_are_normalized_and_match_single_embeds():
+    images = [_jpeg(512, 384, seed) for seed in range(3)]
+
+    batch = embed_images(images)
+
+    assert batch.shape == (3, get_backend("histogram").dims)
+    assert batch.dtype == np.float32
+    assert np.allclose(np.linalg.norm(batch, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(batch[1], embed_image_bytes(images[1]))
+    assert embed_images([]).shape == (0, 280)
+
+
+def test_draft_decode_matches_the_full_size_layout():
+    small = _jpeg(256, 256, seed=7)
+    large = np.asarray(Image.open(io.BytesIO(small)).resize((2048, 2048)))
+    buffer = io.BytesIO()
+    Image.fromarray(large).save(buffer, "JPEG", quality=95)
+
+    # histogram counts are rescaled to the source pixel count
+    similarity = float(embed_image_bytes(small) @ embed_image_bytes(buffer.getvalue()))
+    assert similarity > 0.99
+
+
+def test_backends_and_collections():
+    assert embed_images([_jpeg(128, 128)], "joint_histogram").shape == (1, 768)
+    assert collection_name("histogram") == "fabric"
+    assert collection_name("joint_histogram") == "fabric_joint_histogram"
+    with pytest.raises(ValueError):
+        get_backend("sift")
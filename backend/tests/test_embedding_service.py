@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+import pytest
+
+from image_search.embedding_service import EmbeddingBatcher
+
+
+class EchoModel:
+    """Embeds a text as its length and an "image" (a float) as itself."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def compute_query_embeddings(self, query):
+        self.calls += 1
+        if query == "boom":
+            raise ValueError("bad query")
+        value = len(query) if isinstance(query, str) else float(query)
+        return [np.array([value], dtype=np.float32)]
+
+
+def _encode_concurrently(batcher, queries):
+    results = {}
+    start = threading.Barrier(len(queries))
+
+    def worker(query):
+        start.wait()
+        results[query] = batcher.encode(query)
+
+    threads = [threading.Thread(target=worker, args=(q,)) for q in queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_concurrent_queries_share_batches_and_get_their_own_vector():
+    batcher = EmbeddingBatcher(EchoModel(), max_batch_size=8, max_wait_ms=200)
+    queries = ["a", "bb", "ccc", 4.0, 5.0, "dddddd"]
+
+    results = _encode_concurrently(batcher, queries)
+
+    for query in queries:
+        expected = len(query) if isinstance(query, str) else query
+        assert results[query][0] == expected
+    stats = batcher.stats()
+    assert stats["items"] == len(queries)
+    assert stats["batches"] < len(queries)
+    assert stats["largest_batch"] > 1
+
+
+def test_batch_size_is_capped():
+    batcher = EmbeddingBatcher(EchoModel(), max_batch_size=2, max_wait_ms=200)
+
+    _encode_concurrently(batcher, ["a", "b", "c", "d", "e"])
+
+    assert batcher.stats()["largest_batch"] <= 2
+
+
+def test_failure_is_raised_to_callers_and_worker_keeps_running():
+    batcher = EmbeddingBatcher(EchoModel(), max_batch_size=4, max_wait_ms=0)
+
+    with pytest.raises(ValueError):
+        batcher.encode("boom")
+    assert batcher.encode("ok")[0] == 2
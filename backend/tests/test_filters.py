@@ -0,0 +1,30 @@
+from image_search.db.filters import in_predicate, quote_literal
+from image_search.db.indexes import build_scalar_indexes
+
+
+def test_quote_literal_escapes_single_quotes():
+    assert quote_literal("it's") == "'it''s'"
+
+
+def test_in_predicate_compiles_values():
+    assert in_predicate("tag", []) == ""
+    assert in_predicate("tag", ["silk", "silk"]) == "tag = 'silk'"
+    assert in_predicate("tag", ["silk", "o'neil", "silk"]) == (
+        "tag IN ('silk', 'o''neil')"
+    )
+
+
+def test_in_predicate_filters_rows(fabric_table):
+    where = in_predicate("tag", ["silk", "wool"])
+
+    assert fabric_table.count_rows(where) == 3
+
+
+def test_scalar_indexes_are_built_once(fabric_table):
+    assert sorted(build_scalar_indexes(fabric_table)) == ["hash", "tag"]
+    assert build_scalar_indexes(fabric_table) == []
+    assert sorted(build_scalar_indexes(fabric_table, replace=True)) == ["hash", "tag"]
+
+    indexed = {c for index in fabric_table.list_indices() for c in index.columns}
+    assert {"hash", "tag"} <= indexed
+    assert fabric_table.count_rows("tag = 'denim'") == 3
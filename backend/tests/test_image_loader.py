@@ -0,0 +1,59 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from utils.image_loader import decode_stats, load_image
+
+
+def _encode(width, height, fmt="JPEG"):
+    pixels = np.random.default_rng(0).integers(
+        0, 256, (height, width, 3), dtype=np.uint8
+    )
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def test_jpeg_is_draft_decoded_and_resized_to_the_long_side():
+    img = load_image(_encode(2000, 1000), max_side=256, site="test-resize")
+
+    assert img.size == (256, 128)
+    assert img.mode == "RGB"
+    assert img.info["source_size"] == (2000, 1000)
+    stats = decode_stats()["test-resize"]
+    assert stats["source_pixels"] == 2000 * 1000
+    assert stats["pixel_ratio"] < 0.02
+
+
+def test_draft_only_decode_stays_at_least_the_requested_size():
+    img = load_image(_encode(2048, 2048), max_side=256, resize=False)
+
+    # libjpeg scales by 1/2, 1/4 or 1/8: 2048 / 8 = 256
+    assert img.size == (256, 256)
+
+
+def test_other_formats_decode_fully_then_shrink(tmp_path):
+    path = tmp_path / "swatch.png"
+    path.write_bytes(_encode(600, 300, "PNG"))
+
+    img = load_image(str(path), max_side=300, mode="L")
+
+    assert img.size == (300, 150)
+    assert img.mode == "L"
+
+
+def test_small_images_are_not_upscaled():
+    assert load_image(_encode(100, 80), max_side=512).size == (100, 80)
+
+
+def test_validation_metrics_use_the_reduced_decode():
+    pytest.importorskip("cv2")
+    from routes.validate_image import _texture_metrics_from_bytes
+
+    before = decode_stats().get("validate", {}).get("decoded_pixels", 0)
+    metrics = _texture_metrics_from_bytes(_encode(3000, 2000), target_size=512)
+
+    assert set(metrics) >= {"lap_var", "edge_density", "patch_std_mean"}
+    assert decode_stats()["validate"]["decoded_pixels"] - before == 512 * 341
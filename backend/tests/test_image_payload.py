@@ -0,0 +1,43 @@
+import base64
+import hashlib
+import io
+
+import numpy as np
+from PIL import Image
+
+from constants import VISION_MAX_SIDE
+from utils.image_payload import payload_stats, prepare_image_payload
+
+
+def _png(width, height, seed):
+    pixels = np.random.default_rng(seed).integers(
+        0, 256, (height, width, 3), dtype=np.uint8
+    )
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_payload_is_a_downsized_jpeg():
+    data = _png(VISION_MAX_SIDE * 2, VISION_MAX_SIDE, seed=1)
+
+    payload = prepare_image_payload(data)
+
+    assert payload.mime_type == "image/jpeg"
+    assert payload.size == (VISION_MAX_SIDE, VISION_MAX_SIDE // 2)
+    assert payload.digest == hashlib.sha256(data).hexdigest()
+    assert base64.b64decode(payload.base64) == payload.data
+    assert payload.data_url.startswith("data:image/jpeg;base64,")
+    assert Image.open(io.BytesIO(payload.data)).format == "JPEG"
+    assert len(payload.data) < len(data)
+
+
+def test_same_content_is_encoded_once():
+    data = _png(300, 200, seed=2)
+    prepared = payload_stats()["prepared"]
+
+    first = prepare_image_payload(data)
+    second = prepare_image_payload(bytes(data), site="validate")
+
+    assert second is first
+    assert payload_stats()["prepared"] == prepared + 1
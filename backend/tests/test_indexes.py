@@ -0,0 +1,48 @@
+import pytest
+from conftest import FakeFabric, fabric_row
+
+from image_search.db.indexes import (
+    build_vector_index,
+    get_vector_index,
+    refresh_vector_index,
+)
+
+
+@pytest.fixture
+def large_table(lance_db):
+    table = lance_db.create_table("large", schema=FakeFabric)
+    table.add([fabric_row(f"uploaded/silk/{i}.jpg") for i in range(300)])
+    return table
+
+
+def test_small_tables_keep_flat_search(fabric_table):
+    assert build_vector_index(fabric_table) is False
+    assert get_vector_index(fabric_table) is None
+
+
+def test_forced_build_creates_ivf_pq_index(large_table):
+    built = build_vector_index(
+        large_table, "IVF_PQ", num_partitions=2, num_sub_vectors=2, force=True
+    )
+
+    assert built is True
+    index = get_vector_index(large_table)
+    assert index is not None
+    assert "vector" in index.columns
+
+
+def test_unknown_index_type_is_rejected(large_table):
+    with pytest.raises(ValueError):
+        build_vector_index(large_table, "FLAT", force=True)
+
+
+def test_refresh_folds_in_new_rows_past_the_threshold(large_table):
+    build_vector_index(large_table, num_partitions=2, num_sub_vectors=2, force=True)
+    large_table.add([fabric_row(f"uploaded/denim/{i}.jpg") for i in range(20)])
+    name = get_vector_index(large_table).name
+
+    assert refresh_vector_index(large_table, min_new_rows=50) is False
+    assert large_table.index_stats(name).num_unindexed_rows == 20
+
+    assert refresh_vector_index(large_table, min_new_rows=10) is True
+    assert large_table.index_stats(name).num_unindexed_rows == 0
@@ -0,0 +1,92 @@
+import lancedb
+import pytest
+from conftest import FakeFabric, fabric_row
+
+from image_search.db import create_table
+from image_search.db.create_table import ingest_table
+from image_search.db.ingest import STATE_TABLE, IngestCheckpoint, SyncMarker, batched
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    root = tmp_path / "fabric"
+    for i in range(5):
+        folder = root / f"roll{i % 2}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"{i}.jpg").write_bytes(f"image {i}".encode())
+    return str(root)
+
+
+def test_batched_splits_an_iterator():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_sync_marker_and_checkpoint_live_in_the_database(lance_db, tmp_path):
+    SyncMarker(lance_db, "fabrics").save(1234.5)
+    IngestCheckpoint(lance_db, "fabrics").save("s3://bucket/", "k/1.jpg", 3, 7)
+
+    # another host (a separate connection to the same database) sees both
+    other = lancedb.connect(str(tmp_path / "database"))
+    assert SyncMarker(other, "fabrics").load() == 1234.5
+    assert IngestCheckpoint(other, "fabrics").resumable("s3://bucket/")["rows"] == 3
+    assert SyncMarker(other, "other-table").load() is None
+    assert STATE_TABLE in other.list_tables().tables
+
+    IngestCheckpoint(other, "fabrics").clear()
+    assert IngestCheckpoint(lance_db, "fabrics").load() is None
+    assert SyncMarker(lance_db, "fabrics").load() == 1234.5
+
+
+def test_new_table_is_built_in_place_and_checkpoint_cleared(lance_db, catalogue):
+    table = ingest_table(lance_db, "build", FakeFabric, catalogue, batch_size=2)
+
+    assert table.count_rows() == 5
+    # one create and two appends: every row is written once
+    assert table.version == 3
+    assert "build" in lance_db.list_tables().tables
+    assert IngestCheckpoint(lance_db, "build").load() is None
+    assert set(table.to_pandas()["tag"]) == {"fabric"}
+
+
+def test_rebuild_is_invisible_to_open_handles_until_reopened(lance_db, catalogue):
+    lance_db.create_table("live", schema=FakeFabric).add(
+        [fabric_row("uploaded/fabric/old.jpg")]
+    )
+    serving = lance_db.open_table("live")
+
+    table = ingest_table(lance_db, "live", FakeFabric, catalogue, batch_size=2)
+
+    assert table.count_rows() == 5
+    assert serving.count_rows() == 1
+    assert lance_db.open_table("live").count_rows() == 5
+
+
+def test_failed_rebuild_keeps_live_table_and_resumes(lance_db, catalogue, monkeypatch):
+    live = lance_db.create_table("rebuild", schema=FakeFabric)
+    live.add([fabric_row("uploaded/fabric/old.jpg")])
+
+    embed = create_table.embed_images
+    calls = []
+
+    def failing_embed(df, schema):
+        calls.append(len(df))
+        if len(calls) == 2:
+            raise RuntimeError("embedding service down")
+        return embed(df, schema)
+
+    monkeypatch.setattr(create_table, "embed_images", failing_embed)
+    with pytest.raises(RuntimeError):
+        ingest_table(lance_db, "rebuild", FakeFabric, catalogue, batch_size=2)
+
+    # the live table is restored to the old rows; the first batch is checkpointed
+    assert lance_db.open_table("rebuild").count_rows() == 1
+    state = IngestCheckpoint(lance_db, "rebuild").resumable(catalogue)
+    assert state["rows"] == 2
+    assert state["base_version"] == 2
+
+    table = ingest_table(lance_db, "rebuild", FakeFabric, catalogue, batch_size=2)
+
+    assert table.count_rows() == 5
+    assert "uploaded/fabric/old.jpg" not in set(table.to_pandas()["image_uri"])
+    # only the batches after the checkpoint were embedded again
+    assert calls == [2, 2, 2, 1]
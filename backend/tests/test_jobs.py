@@ -0,0 +1,182 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import types
+import uuid
+
+import pytest
+from conftest import FakeFabric
+
+from image_search.db import create_table
+from services import jobs
+from services.jobs import (
+    GenerationWatch,
+    JobConflictError,
+    get_job,
+    get_job_store,
+    start_table_job,
+    table_generation,
+)
+
+
+class ThreadProcess:
+    """Runs a job "process" on a thread, so the test can stub what it imports."""
+
+    def __init__(self, target, args, name):
+        self.exitcode = None
+        self._thread = threading.Thread(
+            target=self._run, args=(target, args), name=name
+        )
+
+    def _run(self, target, args):
+        try:
+            target(*args)
+            self.exitcode = 0
+        except SystemExit as e:
+            self.exitcode = e.code
+
+    def start(self):
+        self._thread.start()
+
+    def join(self):
+        self._thread.join()
+
+
+@pytest.fixture
+def table_name():
+    return f"jobs-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def in_thread(monkeypatch):
+    """Run job workers on threads, with the test schema and a scripted process_table."""
+    context = types.SimpleNamespace(Process=ThreadProcess)
+    monkeypatch.setattr(jobs.multiprocessing, "get_context", lambda method: context)
+    monkeypatch.setitem(
+        sys.modules,
+        "image_search.schema",
+        types.SimpleNamespace(get_schema_by_name=lambda name: FakeFabric),
+    )
+    calls = []
+
+    def process_table(*, progress, fail=False, **params):
+        calls.append(params)
+        progress(total=4)
+        progress(scanned=4, embedded=4, written=4)
+        if fail:
+            raise RuntimeError("bucket unreachable")
+
+    monkeypatch.setattr(create_table, "process_table", process_table)
+    return calls
+
+
+def _wait_finished(job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id)
+        if job["status"] in jobs.FINISHED and not get_job_store().get(
+            f"lock:{job['table']}"
+        ):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_successful_job_records_progress_and_bumps_generation(in_thread, table_name):
+    watch = GenerationWatch(table_name, interval=0)
+    assert watch.changed() is False  # baseline
+
+    record = start_table_job(
+        "create", database="db", table_name=table_name, root_folder="fabric"
+    )
+    job = _wait_finished(record["id"])
+
+    assert job["status"] == "succeeded"
+    assert job["progress"]["total"] == 4
+    assert job["progress"]["embedded"] == 4
+    assert in_thread[0]["table_name"] == table_name
+    assert table_generation(table_name) == 1
+    assert watch.changed() is True
+    assert watch.changed() is False
+
+
+def test_failed_job_keeps_generation_and_frees_the_table(in_thread, table_name):
+    record = start_table_job(
+        "update",
+        database="db",
+        table_name=table_name,
+        root_folder="fabric",
+        fail=True,
+    )
+    job = _wait_finished(record["id"])
+
+    assert job["status"] == "failed"
+    assert "bucket unreachable" in job["error"]
+    assert table_generation(table_name) == 0
+    # the lock was released, so the next job may start
+    retry = start_table_job(
+        "update", database="db", table_name=table_name, root_folder="fabric"
+    )
+    assert _wait_finished(retry["id"])["status"] == "succeeded"
+
+
+def test_second_job_on_a_busy_table_is_refused(table_name):
+    store = get_job_store()
+    holder = uuid.uuid4().hex
+    store.set(f"job:{holder}", {"status": "running", "pid": os.getpid()})
+    store.add(f"lock:{table_name}", holder)
+
+    with pytest.raises(JobConflictError) as raised:
+        start_table_job(
+            "create", database="db", table_name=table_name, root_folder="fabric"
+        )
+    assert raised.value.job_id == holder
+
+
+def test_lock_of_a_dead_worker_is_taken_over(in_thread, table_name):
+    store = get_job_store()
+    holder = uuid.uuid4().hex
+    store.set(f"job:{holder}", {"status": "succeeded", "pid": None})
+    store.add(f"lock:{table_name}", holder)
+
+    record = start_table_job(
+        "create", database="db", table_name=table_name, root_folder="fabric"
+    )
+
+    assert _wait_finished(record["id"])["status"] == "succeeded"
+
+
+def test_lock_is_only_refreshed_by_its_holder(table_name):
+    get_job_store().add(f"lock:{table_name}", "holder", expire=1)
+
+    assert jobs._refresh_lock(table_name, "holder") is True
+    assert jobs._refresh_lock(table_name, "someone-else") is False
+
+
+def test_generation_watch_rereads_the_store_at_most_every_interval(table_name):
+    watch = GenerationWatch(table_name, interval=60)
+    watch.changed()
+    jobs._bump_generation(table_name)
+
+    assert watch.changed() is False  # throttled
+    watch._checked_at -= 61
+    assert watch.changed() is True
+
+
+def test_job_routes_start_jobs_off_the_event_loop(monkeypatch):
+    from routes import database
+
+    started_on = []
+
+    def start_table_job(kind, **params):
+        started_on.append(threading.current_thread())
+        return {"id": "job-1", "kind": kind}
+
+    monkeypatch.setattr(database, "start_table_job", start_table_job)
+
+    job = asyncio.run(database._start_job("create", force=True))
+
+    assert job["id"] == "job-1"
+    assert started_on[0] is not threading.main_thread()
@@ -0,0 +1,83 @@
+import pytest
+
+from utils import llm_cache as llm_cache_module
+from utils.llm_cache import LLMResponseCache, llm_cache_key, normalize_text
+
+
+def _messages(question):
+    return [
+        {"role": "system", "content": "You are a Fabric Assistant."},
+        {"role": "user", "content": question},
+    ]
+
+
+def test_normalize_text_ignores_case_spacing_and_trailing_punctuation():
+    assert normalize_text("  What is   SILK?! ") == "what is silk"
+    assert normalize_text("what is silk.") == "what is silk"
+    # punctuation inside the question is kept
+    assert normalize_text("silk vs. satin?") == "silk vs. satin"
+
+
+def test_key_is_shared_by_trivially_different_phrasings():
+    key = llm_cache_key("model-a", 256, _messages("What is silk?"))
+
+    assert llm_cache_key("model-a", 256, _messages("what is  silk")) == key
+    assert llm_cache_key("model-b", 256, _messages("What is silk?")) != key
+    assert llm_cache_key("model-a", 1024, _messages("What is silk?")) != key
+    assert llm_cache_key("model-a", 256, _messages("What is denim?")) != key
+
+
+def test_memory_tier_counts_hits_and_misses():
+    cache = LLMResponseCache(maxsize=8, ttl=0, disk=False)
+    key = llm_cache_key("m", 64, _messages("what is silk"))
+
+    assert cache.get(key) is None
+    cache.put(key, "A natural protein fibre.")
+    assert cache.get(key) == "A natural protein fibre."
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["disk"] is False
+    assert stats["disk_size"] == 0
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "CACHE_DIR", tmp_path)
+    writer = LLMResponseCache(maxsize=8, ttl=60, disk=True)
+    reader = LLMResponseCache(maxsize=8, ttl=60, disk=True)
+    key = llm_cache_key("m", 64, _messages("what is denim"))
+
+    writer.put(key, "A sturdy cotton twill.")
+
+    assert reader.get(key) == "A sturdy cotton twill."
+    # promoted to memory, so the second read does not touch the disk
+    assert reader.get(key) == "A sturdy cotton twill."
+    stats = reader.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["hits"] == 1
+    assert stats["disk_size"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_agent_fallback_answers_repeated_questions_from_cache(monkeypatch):
+    pytest.importorskip("fastmcp")
+    from agent import graph
+
+    calls = []
+
+    class FakeReply:
+        text = "Silk is a natural protein fibre."
+
+    def fake_chat_sync(messages, **kwargs):
+        calls.append(messages)
+        return FakeReply()
+
+    monkeypatch.setattr(graph, "llm_response_cache", LLMResponseCache(disk=False))
+    monkeypatch.setattr(graph.llm_gateway, "chat_sync", fake_chat_sync)
+
+    first = graph.agent_fallback({"text": "What is silk?", "mode": "short"})
+    second = graph.agent_fallback({"text": "what is silk", "mode": "short"})
+
+    assert first == second
+    assert len(calls) == 1
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services import generate_response, llm_gateway as gateway_module
+from services.llm_gateway import LLMError, LLMGateway, TokenBucket
+from utils.background_loop import BackgroundLoop
+
+
+@pytest.fixture
+def gateway(fake_groq, monkeypatch):
+    monkeypatch.setattr(gateway_module, "BACKOFF_BASE", 0.01)
+    return LLMGateway(
+        base_url=fake_groq.base_url,
+        api_key="test-key",
+        max_retries=2,
+        background=BackgroundLoop(name="gateway-test-loop"),
+    )
+
+
+def _user(text):
+    return [{"role": "user", "content": text}]
+
+
+def test_chat_retries_rate_limits_and_server_errors(gateway, fake_groq):
+    fake_groq.script = [429, 500]
+
+    result = asyncio.run(gateway.chat(_user("hello"), model="m", max_tokens=32))
+
+    assert result.text == "echo: hello"
+    assert result.tokens == 7
+    assert len(fake_groq.requests) == 3
+    request = fake_groq.requests[-1]
+    assert request["headers"]["Authorization"] == "Bearer test-key"
+    assert request["body"]["max_tokens"] == 32
+    stats = gateway.stats()
+    assert (stats["retries"], stats["rate_limited"], stats["succeeded"]) == (2, 1, 1)
+
+
+def test_client_errors_are_not_retried(gateway, fake_groq):
+    fake_groq.script = [400]
+
+    with pytest.raises(LLMError) as raised:
+        asyncio.run(gateway.chat(_user("hello"), model="m"))
+
+    assert raised.value.status == 400
+    assert len(fake_groq.requests) == 1
+
+
+def test_retries_are_bounded(gateway, fake_groq):
+    fake_groq.script = [503, 503, 503, 503]
+
+    with pytest.raises(LLMError):
+        asyncio.run(gateway.chat(_user("hello"), model="m"))
+
+    assert len(fake_groq.requests) == 3
+    assert gateway.stats()["failed"] == 1
+
+
+def test_stream_yields_deltas_as_they_arrive(gateway, fake_groq):
+    fake_groq.script = [429]
+
+    async def main():
+        return [d async for d in gateway.stream(_user("linen weave"), model="m")]
+
+    deltas = asyncio.run(main())
+
+    assert "".join(deltas).strip() == "echo: linen weave"
+    assert len(deltas) == 3
+    assert fake_groq.requests[-1]["body"]["stream"] is True
+    stats = gateway.stats()
+    assert (stats["streams"], stats["tokens"]) == (1, 11)
+
+
+def test_sync_callers_share_the_client(gateway, fake_groq):
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda i=i: results.append(gateway.chat_sync(_user(str(i)), "m"))
+        )
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert sorted(r.text for r in results) == [f"echo: {i}" for i in range(4)]
+
+
+def test_vision_analysis_goes_through_the_gateway(gateway, fake_groq, monkeypatch):
+    monkeypatch.setattr(generate_response, "llm_gateway", gateway)
+
+    result = asyncio.run(
+        generate_response.analyse_fabric_image("aGk=", "describe", 3, "image/jpeg")
+    )
+
+    assert result["id"] == 3
+    assert result["response"].startswith("echo: ")
+    assert result["tokens"] == 7
+    content = fake_groq.requests[-1]["body"]["messages"][0]["content"]
+    assert content[1]["image_url"]["url"] == "data:image/jpeg;base64,aGk="
+
+
+def test_token_bucket_spaces_requests_past_the_burst():
+    async def main():
+        bucket = TokenBucket(rate=20, capacity=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # two from the burst, then one every 50 ms
+    assert asyncio.run(main()) >= 0.09
+
+
+def test_zero_rate_means_unlimited():
+    bucket = TokenBucket(rate=0, capacity=1)
+
+    async def main():
+        return [await bucket.acquire() for _ in range(100)]
+
+    assert set(asyncio.run(main())) == {0.0}
@@ -0,0 +1,26 @@
+from image_search.db.metadata import METADATA_COLUMNS, read_metadata, table_summary
+
+
+def test_reads_metadata_without_vectors(fabric_table):
+    df = read_metadata(fabric_table)
+
+    assert list(df.columns) == METADATA_COLUMNS
+    assert len(df) == 6
+
+
+def test_projection_filter_limit_and_row_ids(fabric_table):
+    df = read_metadata(fabric_table, ["hash"], where="tag = 'silk'", with_row_id=True)
+
+    assert set(df.columns) == {"hash", "_rowid"}
+    assert len(df) == 3
+    assert len(read_metadata(fabric_table, ["tag"], limit=2)) == 2
+
+
+def test_summary_counts_rows_per_tag(fabric_table):
+    summary = table_summary(fabric_table, sample=2)
+
+    assert summary["rows"] == 6
+    assert summary["tags"] == {"silk": 3, "denim": 3}
+    assert summary["indexes"] == []
+    assert len(summary["sample"]) == 2
+    assert "vector" not in summary["sample"].columns
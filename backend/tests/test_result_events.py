@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils import cache
+from utils.cache import (
+    MemoryResultStore,
+    first_response,
+    store_response,
+    stream_responses,
+    wait_for_response,
+)
+from utils.result_events import result_broker
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    monkeypatch.setattr(cache, "_store", MemoryResultStore(maxsize=8, ttl=60))
+    cache.generate_cache_key("run")
+
+
+def _store_later(delay, *indexes):
+    def run():
+        for index in indexes:
+            time.sleep(delay)
+            store_response("run", index, {"id": index, "response": f"r{index}"})
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def test_waiter_is_woken_by_a_store_from_another_thread():
+    async def main():
+        _store_later(0.05, 2, 1)
+        started = time.monotonic()
+        response = await wait_for_response("run", 1, timeout=5)
+        return response, time.monotonic() - started
+
+    response, waited = asyncio.run(main())
+
+    assert response == {"id": 1, "response": "r1"}
+    # pushed, not found by the periodic re-read of the store
+    assert waited < cache.RECHECK_SECONDS
+    assert result_broker.waiting() == 0
+
+
+def test_wait_times_out_with_none():
+    assert asyncio.run(wait_for_response("run", 3, timeout=0.1)) is None
+
+
+def test_stream_yields_stored_variations_first_then_as_they_arrive():
+    store_response("run", 2, {"id": 2, "response": "r2"})
+
+    async def main():
+        _store_later(0.02, 3, 1)
+        return [r["id"] async for r in stream_responses("run", 3, timeout=5)]
+
+    assert asyncio.run(main()) == [2, 3, 1]
+
+
+def test_stream_stops_at_the_timeout():
+    async def main():
+        return [r async for r in stream_responses("run", 2, timeout=0.1)]
+
+    assert asyncio.run(main()) == []
+
+
+def test_first_response_is_whichever_lands_first():
+    async def main():
+        _store_later(0.02, 4)
+        return await first_response("run", timeout=5)
+
+    assert asyncio.run(main()) == {"id": 4, "response": "r4"}
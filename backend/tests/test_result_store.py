@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from test_analysis_modes import make_payload
+
+from utils import cache
+from utils.cache import DiskResultStore, MemoryResultStore
+
+
+@pytest.fixture(params=["memory", "disk"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "disk":
+        monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+        return DiskResultStore(ttl=60)
+    return MemoryResultStore(maxsize=8, ttl=60)
+
+
+def test_entries_accumulate_variations(store):
+    store.create("run")
+    store.store("run", 1, {"id": 1, "response": "a"})
+    store.store("run", 2, {"id": 2, "response": None})
+
+    assert store.get_entry("run") == {
+        1: {"id": 1, "response": "a"},
+        2: {"id": 2, "response": None},
+    }
+    assert store.get_entry("unknown") is None
+
+
+def test_writes_are_not_counted_as_lookups(store):
+    store.create("run")
+    for idx in range(1, 4):
+        store.store("run", idx, {"id": idx, "response": "x"})
+
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 0)
+
+    store.get_entry("run")
+    store.get_entry("missing")
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_memory_store_is_bounded():
+    store = MemoryResultStore(maxsize=2, ttl=60)
+    for key in ("a", "b", "c"):
+        store.create(key)
+
+    assert store.get_entry("a") is None
+    assert store.stats()["evictions"] == 1
+
+
+def test_complete_analysis_is_found_by_content(monkeypatch):
+    store = MemoryResultStore(maxsize=8, ttl=60)
+    monkeypatch.setattr(cache, "_store", store)
+
+    cache.generate_cache_key("run")
+    cache.link_content("digest", "short", "run")
+    cache.store_response("run", 1, {"id": 1, "response": "a"})
+    assert cache.find_complete_analysis("digest", "short", 2) is None
+
+    cache.store_response("run", 2, {"id": 2, "response": "b"})
+    assert cache.find_complete_analysis("digest", "short", 2) == "run"
+    assert cache.find_complete_analysis("digest", "long", 2) is None
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setattr(cache, "_store", None)
+    monkeypatch.setattr(cache, "ANALYSIS_STORE", "redis")
+
+    with pytest.raises(ValueError):
+        cache.get_result_store()
+
+    cache.register_result_store("redis", MemoryResultStore)
+    try:
+        assert isinstance(cache.get_result_store(), MemoryResultStore)
+    finally:
+        cache._STORES.pop("redis")
+
+
+def test_identical_image_reuses_a_complete_analysis(monkeypatch):
+    from services import threaded
+    from test_analysis_modes import collect
+
+    calls = []
+
+    async def single(image_base64, prompt, idx, mime_type):
+        calls.append(idx)
+        return {"id": idx, "response": f"text {idx}"}
+
+    monkeypatch.setattr(threaded, "analyse_fabric_image", single)
+    payload = make_payload()
+
+    first = threaded.start_analysis(payload, "short", mode="fanout")
+    collect(first["cache_key"])
+    again = threaded.start_analysis(payload, "short", mode="fanout")
+
+    assert again == {"cache_key": first["cache_key"], "mode": "cached"}
+    assert len(calls) == threaded.VARIATION_COUNT
+
+
+def test_analyse_route_starts_the_analysis_off_the_event_loop(monkeypatch):
+    from routes import analysis
+
+    started_on = []
+
+    def start_analysis(payload, analysis_type, mode):
+        started_on.append(threading.current_thread())
+        return {"cache_key": "run", "mode": mode}
+
+    async def first_response(cache_key, timeout):
+        return {"id": 1, "response": "first"}
+
+    monkeypatch.setattr(analysis, "start_analysis", start_analysis)
+    monkeypatch.setattr(analysis, "first_response", first_response)
+    monkeypatch.setattr(
+        analysis, "prepare_image_payload", lambda data, site: make_payload()
+    )
+    app = FastAPI()
+    app.include_router(analysis.router)
+
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return await client.post(
+                "/analyse",
+                data={"analysis_type": "short", "mode": "fanout"},
+                files={"image": ("silk.jpg", b"jpeg bytes", "image/jpeg")},
+            )
+
+    response = asyncio.run(post())
+
+    assert response.status_code == 200
+    assert response.json()["response"] == {"id": 1, "response": "first"}
+    assert started_on[0] is not threading.main_thread()
@@ -0,0 +1,111 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from image_search.db import s3_listing
+from image_search.db.s3_listing import iter_s3_objects
+
+BUCKET = "fabric-bucket"
+KEYS = [
+    "images/fabric/a/1.jpg",
+    "images/fabric/a/2.png",
+    "images/fabric/b/1.jpg",
+    "images/fabric/m.jpg",  # direct objects sort between the shards
+    "images/fabric/notes.txt",
+    "images/fabric/z.webp",
+    "images/stock/s1.jpg",
+    "images/other/o.jpg",  # not a catalogue root
+]
+IMAGES = [
+    key for key in KEYS if "/other/" not in key and key.endswith(("jpg", "png", "webp"))
+]
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        for key in KEYS:
+            client.put_object(Bucket=BUCKET, Key=key, Body=key.encode())
+        yield client
+
+
+def _list(client, **kwargs):
+    return [
+        (category, obj["Key"])
+        for category, obj in iter_s3_objects(
+            client, BUCKET, "images/", ["stock", "fabric"], max_workers=2, **kwargs
+        )
+    ]
+
+
+@pytest.mark.parametrize("shards", [False, True])
+def test_lists_every_image_in_key_order(s3, shards):
+    listed = _list(s3, shards=shards)
+
+    assert [key for _, key in listed] == IMAGES
+    assert {category for category, _ in listed} == {"fabric", "stock"}
+    assert all(key.split("/")[1] == category for category, key in listed)
+
+
+@pytest.mark.parametrize("shards", [False, True])
+def test_resumes_after_a_key(s3, shards):
+    listed = _list(s3, shards=shards, start_after="images/fabric/a/2.png")
+
+    assert [key for _, key in listed] == IMAGES[2:]
+
+
+def test_since_drops_older_objects(s3):
+    assert _list(s3, since=0.0) == _list(s3)
+    assert _list(s3, since=datetime.now(timezone.utc).timestamp() + 60) == []
+
+
+class _EndlessPages:
+    """Paginator stand-in that counts the pages it has been asked for."""
+
+    def __init__(self):
+        self.served = 0
+        self.lock = threading.Lock()
+
+    def paginate(self, **params):
+        number = 0
+        while True:
+            with self.lock:
+                self.served += 1
+            number += 1
+            yield {
+                "Contents": [
+                    {
+                        "Key": f"{params['Prefix']}{number:08d}.jpg",
+                        "LastModified": datetime.now(timezone.utc),
+                    }
+                ]
+            }
+
+
+class _EndlessClient:
+    def __init__(self):
+        self.paginator = _EndlessPages()
+
+    def get_paginator(self, name):
+        return self.paginator
+
+
+def test_listing_stays_a_bounded_window_ahead_of_the_consumer():
+    client = _EndlessClient()
+    categories = ["c1", "c2", "c3", "c4"]
+    listing = iter_s3_objects(client, BUCKET, "images/", categories, max_workers=2)
+
+    first = [next(listing) for _ in range(10)]
+    time.sleep(0.3)  # let the listers run ahead as far as they may
+
+    assert [obj["Key"] for _, obj in first][-1] == "images/c1/00000010.jpg"
+    # two prefixes in flight, each a few pages ahead of what was consumed
+    assert client.paginator.served <= 10 + 2 * (s3_listing.PAGES_AHEAD + 2)
+
+    listing.close()  # stops the listers instead of leaving them blocked
@@ -0,0 +1,52 @@
+import hashlib
+import os
+
+from image_search.db import scanner
+from image_search.db.scanner import scan_local_images, walk_images
+
+
+def _write(path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_walk_finds_images_in_sorted_order(tmp_path):
+    b = _write(tmp_path / "b" / "1.JPG", b"1")
+    a = _write(tmp_path / "a" / "2.png", b"2")
+    _write(tmp_path / "a" / "notes.txt", b"3")
+
+    assert walk_images(tmp_path) == [a, b]
+
+
+def test_scan_hashes_and_resumes_after_a_key(tmp_path):
+    paths = [_write(tmp_path / f"{i}.jpg", f"img {i}".encode()) for i in range(3)]
+
+    scanned = dict(scan_local_images(tmp_path))
+    assert list(scanned) == paths
+    assert scanned[paths[0]]["hash"] == hashlib.sha256(b"img 0").hexdigest()
+
+    assert [path for path, _ in scan_local_images(tmp_path, paths[0])] == paths[1:]
+
+
+def test_unchanged_files_are_not_read_again(tmp_path, monkeypatch):
+    path = _write(tmp_path / "a.jpg", b"first")
+    list(scan_local_images(tmp_path))
+
+    reads = []
+    file_digest = hashlib.file_digest
+
+    def counting_digest(f, digest):
+        reads.append(f.name)
+        return file_digest(f, digest)
+
+    monkeypatch.setattr(scanner.hashlib, "file_digest", counting_digest)
+    list(scan_local_images(tmp_path))
+    assert reads == []
+
+    _write(tmp_path / "a.jpg", b"second version")
+    os.utime(path, ns=(1, 1))
+    [(_, info)] = list(scan_local_images(tmp_path))
+
+    assert reads == [path]
+    assert info["hash"] == hashlib.sha256(b"second version").hexdigest()
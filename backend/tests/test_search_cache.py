@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from image_search.search_cache import image_cache_key, search_cache, text_cache_key
+from services import jobs
+from utils.ttl_cache import LRUTTLCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUTTLCache(maxsize=2, ttl=0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUTTLCache(maxsize=4, ttl=0.05)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_peek_does_not_touch_stats_or_recency():
+    cache = LRUTTLCache(maxsize=2, ttl=0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.peek("a") == 1
+    assert cache.peek("missing") is None
+    cache.put("c", 3)  # "a" was only peeked, so it is still the oldest
+
+    assert cache.peek("a") is None
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 0
+
+
+def test_text_key_ignores_category_order_and_duplicates():
+    assert text_cache_key(" silk ", ["b", "a", "a"], 50) == text_cache_key(
+        "silk", ["a", "b"], 50
+    )
+    assert text_cache_key("silk", ["a"], 50) != text_cache_key("silk", ["a"], 10)
+    assert text_cache_key("silk", None, 50) == text_cache_key("silk", [], 50)
+
+
+def test_image_key_is_content_addressed():
+    assert image_cache_key(b"abc", None, 10) == image_cache_key(b"abc", None, 10)
+    assert image_cache_key(b"abc", None, 10) != image_cache_key(b"abd", None, 10)
+
+
+def _search_once(search_route, monkeypatch, cache_key, rebuild_during_search):
+    generation = [1]
+    monkeypatch.setattr(jobs, "table_generation", lambda name: generation[0])
+    watch = jobs.GenerationWatch("fabrics", interval=0)
+    monkeypatch.setattr(search_route, "table_watch", watch)
+    monkeypatch.setattr(search_route, "is_table_ready", lambda d, t: True)
+
+    def vector_search(build_query, limit, categories, exclude_uri):
+        if rebuild_during_search:
+            generation[0] = 2
+            assert watch.changed()  # another request notices the rebuild
+        return {"results": ["silk/0.jpg"], "distances": [0.1], "query_vector": [0.0]}
+
+    monkeypatch.setattr(search_route, "_vector_search", vector_search)
+    return asyncio.run(search_route._cached_vector_search(cache_key, None, 10, None))
+
+
+def test_search_result_is_cached(search_route, monkeypatch):
+    hits = _search_once(search_route, monkeypatch, "cached-query", False)
+
+    assert search_cache.get("cached-query") == hits
+
+
+def test_hits_from_before_a_rebuild_are_not_cached(search_route, monkeypatch):
+    hits = _search_once(search_route, monkeypatch, "stale-query", True)
+
+    assert hits["results"] == ["silk/0.jpg"]
+    assert search_cache.get("stale-query") is None
@@ -0,0 +1,49 @@
+from conftest import FakeFabric, fabric_row, text_vector
+
+from image_search.db.create_table import (
+    create_table,
+    embed_images,
+    normalize_keys,
+    unique_images,
+)
+
+
+def test_unique_images_keeps_the_newest_copy_in_scan_order():
+    df = unique_images(
+        [
+            fabric_row("a.jpg", hash="x", mtime=1.0),
+            fabric_row("b.jpg", hash="y", mtime=1.0),
+            fabric_row("c.jpg", hash="x", mtime=5.0),
+        ]
+    )
+
+    assert list(df["image_uri"]) == ["b.jpg", "c.jpg"]
+
+
+def test_vectors_come_from_the_source_uri_before_it_is_rewritten(lance_db):
+    df = unique_images([fabric_row("/srv/uploaded/silk/a.jpg")])
+
+    df = embed_images(df, FakeFabric)
+    df["image_uri"] = normalize_keys(df["image_uri"])
+    table = lance_db.create_table("fabrics", schema=FakeFabric)
+    table.add(df)
+
+    row = table.search().limit(1).to_list()[0]
+    assert row["image_uri"] == "silk/a.jpg"
+    assert list(row["vector"]) == list(text_vector("/srv/uploaded/silk/a.jpg"))
+
+
+def test_create_table_writes_unique_rows_in_one_version(lance_db):
+    table = create_table(
+        lance_db,
+        "fabrics",
+        FakeFabric,
+        [
+            fabric_row("/srv/uploaded/silk/a.jpg", hash="x"),
+            fabric_row("/srv/uploaded/silk/b.jpg", hash="x", mtime=2.0),
+            fabric_row("/srv/uploaded/denim/c.jpg", hash="y"),
+        ],
+    )
+
+    assert table.version == 1
+    assert sorted(table.to_pandas()["image_uri"]) == ["denim/c.jpg", "silk/b.jpg"]
@@ -0,0 +1,68 @@
+import pandas as pd
+from conftest import fabric_row
+
+from image_search.db.create_table import diff_image_sets, update_existing_table
+from image_search.db.metadata import read_metadata
+
+
+def _frame(rows):
+    return pd.DataFrame(rows)
+
+
+def test_diff_finds_added_changed_and_removed_keys():
+    existing = _frame(
+        [
+            {"image_uri": "uploaded/silk/keep.jpg", "hash": "k"},
+            {"image_uri": "uploaded/silk/edit.jpg", "hash": "old"},
+            {"image_uri": "uploaded/silk/gone.jpg", "hash": "g"},
+        ]
+    )
+    # scanned paths differ in prefix; both sides are compared after "uploaded/"
+    current = _frame(
+        [
+            fabric_row("/data/uploaded/silk/keep.jpg", hash="k"),
+            fabric_row("/data/uploaded/silk/edit.jpg", hash="new"),
+            fabric_row("/data/uploaded/silk/new.jpg", hash="n"),
+        ]
+    )
+
+    to_add, stale, counts = diff_image_sets(existing, current)
+
+    assert counts == {"added": 1, "changed": 1, "removed": 1}
+    assert sorted(to_add["image_uri"]) == [
+        "/data/uploaded/silk/edit.jpg",
+        "/data/uploaded/silk/new.jpg",
+    ]
+    assert sorted(stale) == ["uploaded/silk/edit.jpg", "uploaded/silk/gone.jpg"]
+
+
+def test_incremental_diff_keeps_rows_missing_from_the_scan():
+    existing = _frame([{"image_uri": "uploaded/silk/a.jpg", "hash": "a"}])
+    current = _frame([fabric_row("uploaded/silk/b.jpg", hash="b")])
+
+    to_add, stale, counts = diff_image_sets(existing, current, keep_missing=True)
+
+    assert list(to_add["image_uri"]) == ["uploaded/silk/b.jpg"]
+    assert stale == []
+    assert counts["removed"] == 0
+
+
+def test_update_existing_table_applies_the_diff(fabric_table):
+    current = [
+        fabric_row("uploaded/silk/0.jpg"),
+        fabric_row("uploaded/silk/1.jpg", hash="edited", mtime=9.0),
+        fabric_row("uploaded/wool/0.jpg", tag="wool"),
+    ]
+    progress = []
+
+    update_existing_table(
+        fabric_table, current, progress=lambda **c: progress.append(c)
+    )
+
+    rows = read_metadata(fabric_table, ["image_uri", "hash"])
+    assert dict(zip(rows["image_uri"], rows["hash"])) == {
+        "uploaded/silk/0.jpg": "h-uploaded/silk/0.jpg",
+        "uploaded/silk/1.jpg": "edited",
+        "uploaded/wool/0.jpg": "h-uploaded/wool/0.jpg",
+    }
+    assert {"total": 2} in progress
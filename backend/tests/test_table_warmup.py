@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+
+from image_search.db.connection import (
+    get_table,
+    invalidate_table,
+    is_table_ready,
+    warm_up_table,
+)
+
+
+def test_warm_up_marks_table_ready_and_caches_handle(lance_db, fabric_table, tmp_path):
+    database = str(tmp_path / "database")
+    assert not is_table_ready(database, "fabrics")
+
+    table = warm_up_table(database, "fabrics")
+
+    assert is_table_ready(database, "fabrics")
+    assert get_table(database, "fabrics") is table
+
+
+def test_invalidate_reopens_rebuilt_table(lance_db, fabric_table, tmp_path):
+    database = str(tmp_path / "database")
+    first = get_table(database, "fabrics")
+    assert get_table(database, "fabrics") is first
+
+    invalidate_table(database, "fabrics")
+
+    reopened = get_table(database, "fabrics")
+    assert reopened is not first
+    assert reopened.count_rows() == 6
+
+
+def test_failed_warm_up_leaves_table_not_ready(lance_db, tmp_path):
+    database = str(tmp_path / "database")
+    # no embedding function, so the text warm-up query cannot run
+    lance_db.create_table("plain", data=[{"vector": [0.0, 1.0], "tag": "silk"}])
+
+    warm_up_table(database, "plain")
+
+    assert not is_table_ready(database, "plain")
+
+
+def test_search_retries_a_failed_warm_up_at_most_once_per_interval(
+    search_route, monkeypatch
+):
+    attempts = []
+
+    def warm_up(database, table_name):
+        attempts.append(table_name)
+        if len(attempts) == 1:
+            raise RuntimeError("Failed to load table after 5 retries")
+
+    monkeypatch.setattr(search_route, "warm_up_table", warm_up)
+    monkeypatch.setattr(search_route, "is_table_ready", lambda d, t: len(attempts) > 1)
+    monkeypatch.setattr(search_route.table_watch, "changed", lambda: False)
+    monkeypatch.setattr(search_route, "_warm_up_at", 0.0)
+
+    asyncio.run(search_route._sync_table_state())
+    asyncio.run(search_route._sync_table_state())
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(search_route, "WARM_UP_RETRY_SECONDS", 0)
+    asyncio.run(search_route._sync_table_state())
+    asyncio.run(search_route._sync_table_state())
+    assert len(attempts) == 2
+
+
+def test_search_is_refused_until_the_table_is_ready(search_route, monkeypatch):
+    monkeypatch.setattr(search_route, "is_table_ready", lambda d, t: False)
+    monkeypatch.setattr(search_route, "WARM_UP_RETRY_SECONDS", 3600)
+    monkeypatch.setattr(search_route, "_warm_up_at", time.monotonic())
+
+    with pytest.raises(search_route.HTTPException) as error:
+        asyncio.run(search_route._cached_vector_search("not-ready", None, 10, None))
+    assert error.value.status_code == 503
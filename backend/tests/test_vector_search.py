@@ -0,0 +1,49 @@
+from conftest import fabric_row, text_vector
+
+from image_search.db.filters import suffix_predicate
+from image_search.vector_search import get_row_vector, run_vector_search
+
+
+def test_precomputed_vector_search_returns_sorted_distances(fabric_table):
+    query = text_vector("uploaded/silk/1.jpg")
+
+    uris, paths, distances = run_vector_search(
+        fabric_table, None, query, limit=3, with_distances=True
+    )
+
+    assert uris[0] == "uploaded/silk/1.jpg"
+    assert paths[0] == "silk/1.jpg"
+    assert distances[0] < 1e-6
+    assert distances == sorted(distances)
+
+
+def test_category_filter_limits_hits(fabric_table):
+    uris, _ = run_vector_search(
+        fabric_table, None, text_vector("x"), limit=10, category=["denim"]
+    )
+
+    assert len(uris) == 3
+    assert all("/denim/" in uri for uri in uris)
+
+
+def test_row_vector_by_returned_path(fabric_table):
+    vector = get_row_vector(fabric_table, "denim/2.jpg")
+
+    assert vector is not None
+    assert list(vector) == list(text_vector("uploaded/denim/2.jpg"))
+
+
+def test_row_vector_suffix_matches_wildcards_literally(fabric_table):
+    fabric_table.add([fabric_row("uploaded/silk/a_b%c.jpg", tag="silk")])
+
+    assert get_row_vector(fabric_table, "silk/a_b%c.jpg") is not None
+    # "_" and "%" would otherwise match any character(s)
+    assert get_row_vector(fabric_table, "silk/aXbYc.jpg") is None
+    assert get_row_vector(fabric_table, "silk/%.jpg") is None
+    assert get_row_vector(fabric_table, "silk/it's.jpg") is None
+
+
+def test_suffix_predicate_escapes_pattern_characters():
+    assert suffix_predicate("image_uri", "/a_b%c'd") == (
+        "image_uri LIKE '%/a\\_b\\%c''d' ESCAPE '\\'"
+    )
@@ -4,13 +4,13 @@ from typing import Any, Dict, List, Literal, Optional
 from urllib.parse import urlparse
 
 from mcp.server.fastmcp import FastMCP
-from PIL import Image
 
 from constants import IMAGE_DIR
 from services.threaded import analyse_all_variations
 from tools.media_tools import redirect_to_media_analysis as media_tool
 from tools.search_tool import search_tool as _search_tool
 from utils.cache import get_response
+from utils.image_payload import prepare_image_payload
 
 mcp = FastMCP("fabric-tools")
 
@@ -75,8 +75,8 @@ def redirect_to_analysis(
             }
 
     try:
-        with Image.open(path) as img:
-            raw = analyse_all_variations(img, mode)
+        payload = prepare_image_payload(Path(path).read_bytes(), site="mcp")
+        raw = analyse_all_variations(payload, mode)
         cache_key = raw.get("cache_key")
         first = raw.get("first")
         if not first:
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Optional
+
+
+class BackgroundLoop:
+    """An asyncio event loop running forever on its own daemon thread.
+
+    Lets sync code (worker threads, the MCP tools, the CLI) and coroutines on
+    other loops share async services such as the analysis scheduler.
+
+    Args:
+        name (str): Thread name.
+    """
+
+    def __init__(self, name: str = "background-loop") -> None:
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop; started on first use."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    started = threading.Event()
+
+                    def run() -> None:
+                        asyncio.set_event_loop(loop)
+                        loop.call_soon(started.set)
+                        loop.run_forever()
+
+                    threading.Thread(target=run, name=self.name, daemon=True).start()
+                    started.wait()
+                    self._loop = loop
+        return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """Schedule ``coro`` on the loop from any thread; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Call ``fn(*args)`` on the loop thread, from any thread."""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+
+_background_loop = BackgroundLoop()
+
+
+def get_background_loop() -> BackgroundLoop:
+    return _background_loop
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a BoundedExecutor's queue is full and the call is refused."""
+
+
+class BoundedExecutor:
+    """Dedicated thread pool for blocking work called from async routes.
+
+    At most ``max_workers`` calls run at once; at most ``max_queue`` more may wait
+    (``0`` means unbounded) before further calls are refused with ExecutorBusyError.
+
+    Args:
+        max_workers (int): Concurrency limit of the pool.
+        max_queue (int): Queue depth at which new calls are rejected.
+        name (str): Thread name prefix, also used in metrics.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 0, name: str = "pool"):
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_queue = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool and await its result."""
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusyError(f"{self.name} queue is full")
+            self.queued += 1
+            self.peak_queue = max(self.peak_queue, self.queued)
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self._wait_total += started - submitted
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self._run_total += time.perf_counter() - started
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, job)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.completed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": done,
+                "rejected": self.rejected,
+                "peak_queue": self.peak_queue,
+                "avg_wait_ms": (
+                    round(self._wait_total / done * 1000, 2) if done else 0.0
+                ),
+                "avg_run_ms": round(self._run_total / done * 1000, 2) if done else 0.0,
+            }
@@ -1,21 +1,254 @@
+import asyncio
 import threading
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
 
-response_cache = {}
-cache_lock = threading.Lock()
+from diskcache import Cache
+
+from constants import (
+    ANALYSIS_CACHE_BYTES,
+    ANALYSIS_CACHE_SIZE,
+    ANALYSIS_CACHE_TTL,
+    ANALYSIS_STORE,
+    CACHE_DIR,
+)
+from utils.result_events import result_broker
+from utils.ttl_cache import LRUTTLCache
+
+# waiters re-read the store this often, for results stored by other worker processes;
+# the reads run on a thread since the disk store blocks
+RECHECK_SECONDS = 2.0
+
+# An analysis entry maps variation index -> {"id": index, "response": text | None}
+Entry = Dict[int, Dict[str, Any]]
+
+
+def content_key(digest: str, analysis_type: str) -> str:
+    """Alias under which an analysis of the same image content can be found again."""
+    return f"content:{digest}:{analysis_type}"
+
+
+class MemoryResultStore:
+    """Per-process LRU store; entries expire ANALYSIS_CACHE_TTL after their last write."""
+
+    name = "memory"
+
+    def __init__(
+        self, maxsize: int = ANALYSIS_CACHE_SIZE, ttl: float = ANALYSIS_CACHE_TTL
+    ):
+        self._entries = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self._aliases = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def create(self, cache_key: str) -> None:
+        self._entries.put(cache_key, {})
+
+    def store(self, cache_key: str, index: int, response: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = dict(self._entries.peek(cache_key) or {})
+            entry[index] = response
+            self._entries.put(cache_key, entry)
+
+    def get_entry(self, cache_key: str) -> Optional[Entry]:
+        entry = self._entries.get(cache_key)
+        return dict(entry) if entry is not None else None
+
+    def set_alias(self, alias: str, cache_key: str) -> None:
+        self._aliases.put(alias, cache_key)
+
+    def get_alias(self, alias: str) -> Optional[str]:
+        return self._aliases.get(alias)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self._entries.stats()}
+
+
+class DiskResultStore:
+    """diskcache-backed store shared by every worker process on the host.
+
+    Entries expire after ``ttl`` seconds; past ``size_limit`` bytes the least
+    recently used ones are culled.
+    """
+
+    name = "disk"
+
+    def __init__(
+        self, size_limit: int = ANALYSIS_CACHE_BYTES, ttl: float = ANALYSIS_CACHE_TTL
+    ):
+        self.ttl = ttl or None
+        self._cache = Cache(
+            str(CACHE_DIR / "analysis_results"),
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def create(self, cache_key: str) -> None:
+        self._cache.set(f"entry:{cache_key}", {}, expire=self.ttl)
+
+    def store(self, cache_key: str, index: int, response: Dict[str, Any]) -> None:
+        with self._cache.transact():
+            entry = self._cache.get(f"entry:{cache_key}") or {}
+            entry[index] = response
+            self._cache.set(f"entry:{cache_key}", entry, expire=self.ttl)
+
+    def get_entry(self, cache_key: str) -> Optional[Entry]:
+        entry = self._cache.get(f"entry:{cache_key}")
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set_alias(self, alias: str, cache_key: str) -> None:
+        self._cache.set(alias, cache_key, expire=self.ttl)
+
+    def get_alias(self, alias: str) -> Optional[str]:
+        return self._cache.get(alias)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "size": len(self._cache),
+            "volume_bytes": self._cache.volume(),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_STORES: Dict[str, Callable[[], Any]] = {
+    MemoryResultStore.name: MemoryResultStore,
+    DiskResultStore.name: DiskResultStore,
+}
+_store: Optional[Any] = None
+_store_lock = threading.Lock()
+
+
+def register_result_store(name: str, factory: Callable[[], Any]) -> None:
+    """Register a result store backend selectable with ANALYSIS_STORE."""
+    _STORES[name] = factory
+
+
+def get_result_store() -> Any:
+    """Return the configured analysis result store (ANALYSIS_STORE)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if ANALYSIS_STORE not in _STORES:
+                    raise ValueError(f"Unknown analysis store: {ANALYSIS_STORE}")
+                _store = _STORES[ANALYSIS_STORE]()
+    return _store
 
 
 def store_response(cache_key, index, response):
-    with cache_lock:
-        if cache_key not in response_cache:
-            response_cache[cache_key] = {}
-        response_cache[cache_key][index] = response
+    get_result_store().store(cache_key, index, response)
+    result_broker.publish(cache_key, index, response)
 
 
 def get_response(cache_key, index):
-    with cache_lock:
-        return response_cache.get(cache_key, {}).get(index)
+    entry = get_result_store().get_entry(cache_key) or {}
+    return entry.get(index)
+
+
+def get_responses(cache_key) -> Optional[Entry]:
+    """All variations stored so far for an analysis, or None if it is unknown."""
+    return get_result_store().get_entry(cache_key)
 
 
 def generate_cache_key(cache_key):
-    with cache_lock:
-        response_cache[cache_key] = {}
+    get_result_store().create(cache_key)
+
+
+def link_content(digest: str, analysis_type: str, cache_key: str) -> None:
+    """Make an analysis findable by image content hash and analysis type."""
+    get_result_store().set_alias(content_key(digest, analysis_type), cache_key)
+
+
+def find_complete_analysis(
+    digest: str, analysis_type: str, count: int
+) -> Optional[str]:
+    """Cache key of an earlier analysis of the same content with all ``count`` variations."""
+    store = get_result_store()
+    cache_key = store.get_alias(content_key(digest, analysis_type))
+    if cache_key is None:
+        return None
+    entry = store.get_entry(cache_key) or {}
+    filled = [idx for idx, item in entry.items() if item and item.get("response")]
+    return cache_key if len(filled) >= count else None
+
+
+async def wait_for_response(
+    cache_key, index, timeout: float
+) -> Optional[Dict[str, Any]]:
+    """Wait until variation ``index`` of ``cache_key`` is stored; None on timeout."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    _, queue = subscriber = result_broker.subscribe(cache_key)
+    try:
+        while True:
+            response = await asyncio.to_thread(get_response, cache_key, index)
+            if response is not None:
+                return response
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                got, response = await asyncio.wait_for(
+                    queue.get(), min(remaining, RECHECK_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                continue
+            if got == index:
+                return response
+    finally:
+        result_broker.unsubscribe(cache_key, subscriber)
+
+
+async def stream_responses(
+    cache_key, count: int, timeout: float
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Yield each of the ``count`` variations of ``cache_key`` as soon as it is stored.
+
+    Variations stored before the call are yielded first. Stops after ``count``
+    variations or once ``timeout`` seconds have passed.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    sent: set = set()
+    _, queue = subscriber = result_broker.subscribe(cache_key)
+    try:
+        while len(sent) < count:
+            stored = await asyncio.to_thread(get_responses, cache_key)
+            for index, response in sorted((stored or {}).items()):
+                if index not in sent:
+                    sent.add(index)
+                    yield response
+            remaining = deadline - loop.time()
+            if len(sent) >= count or remaining <= 0:
+                return
+            try:
+                index, response = await asyncio.wait_for(
+                    queue.get(), min(remaining, RECHECK_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                continue
+            if index not in sent:
+                sent.add(index)
+                yield response
+    finally:
+        result_broker.unsubscribe(cache_key, subscriber)
+
+
+async def first_response(cache_key, timeout: float) -> Optional[Dict[str, Any]]:
+    """The first variation of ``cache_key`` to be stored, whichever it is; None on timeout."""
+    stream = stream_responses(cache_key, 1, timeout)
+    try:
+        async for response in stream:
+            return response
+        return None
+    finally:
+        await stream.aclose()
@@ -1,47 +1,21 @@
 # utils/groq_client.py
-import os
-from typing import Any, Optional
+from constants import GROQ_VISION_MODEL
+from services.llm_gateway import image_message, llm_gateway
 
-from groq import Groq
-from dotenv import load_dotenv
 
-load_dotenv()
-
-_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-_MODEL = (
-    "meta-llama/llama-4-scout-17b-16e-instruct"  # Groq's current vision-capable model
-)
-
-
-def groq_vision_check(image_base64: str, prompt: str) -> str:
+async def groq_vision_check(
+    image_base64: str, prompt: str, mime_type: str = "image/jpeg"
+) -> str:
     """
     Send an image + prompt to Groq's vision model and return the text output.
     """
     try:
-        # Groq expects a data URL, not raw bytes
-        data_url = f"data:image/jpeg;base64,{image_base64}"
-
-        resp = _client.chat.completions.create(
-            model=_MODEL,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": data_url},
-                        },
-                    ],
-                }
-            ],
+        result = await llm_gateway.chat(
+            image_message(prompt, image_base64, mime_type),
+            model=GROQ_VISION_MODEL,
             max_tokens=512,
         )
-
-        # Safe extraction
-        msg: Optional[Any] = resp.choices[0].message if resp.choices else None
-        txt = getattr(msg, "content", "") or ""
-        return txt.strip()
+        return result.text
 
     except Exception as e:
         print(f"Groq Vision API error: {e}")
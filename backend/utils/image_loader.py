@@ -0,0 +1,119 @@
+import io
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Union
+
+from PIL import Image, ImageOps
+
+# Target sizes for the consumers of uploaded images (vision LLM: VISION_MAX_SIDE)
+FEATURE_SIDE = 256  # histogram / thumbnail features (core.embedder)
+MODEL_SIDE = 512  # SigLIP query images; the processor resizes further
+
+_RESAMPLE = getattr(Image, "Resampling", Image).LANCZOS
+
+_stats: Dict[str, Dict[str, float]] = defaultdict(
+    lambda: {
+        "calls": 0,
+        "bytes": 0,
+        "decode_ms": 0.0,
+        "source_pixels": 0,
+        "decoded_pixels": 0,
+    }
+)
+_stats_lock = threading.Lock()
+
+
+def load_image(
+    source: Union[bytes, str],
+    max_side: Optional[int] = None,
+    mode: Optional[str] = "RGB",
+    site: str = "default",
+    resize: bool = True,
+    exif_transpose: bool = False,
+) -> Image.Image:
+    """Decode an image at (about) the resolution its consumer needs.
+
+    JPEGs use ``Image.draft`` so libjpeg's DCT scaling decodes at 1/2, 1/4 or
+    1/8 size instead of full resolution; other formats decode fully. The result
+    is then shrunk so its long side is ``max_side`` (unless ``resize`` is off,
+    e.g. when the caller only needs a reduced decode).
+
+    The original dimensions are kept in ``img.info["source_size"]``. Decode
+    time, input bytes and pixel counts are recorded per ``site``.
+
+    Args:
+        source (bytes | str): Encoded image bytes or a file path.
+        max_side (int, optional): Longest side needed; None decodes full size.
+        mode (str, optional): Mode to convert to. Defaults to "RGB".
+        site (str): Call-site name used in decode_stats().
+        resize (bool): Shrink exactly to ``max_side`` after the draft decode.
+        exif_transpose (bool): Apply the EXIF orientation.
+
+    Returns:
+        Image.Image: The loaded image.
+    """
+    start = time.perf_counter()
+    img: Image.Image
+    if isinstance(source, bytes):
+        size_in = len(source)
+        image_file = Image.open(io.BytesIO(source))
+    else:
+        size_in = os.path.getsize(source)
+        image_file = Image.open(source)
+
+    img = image_file
+    width, height = img.size
+    if max_side and max(width, height) > max_side:
+        ratio = max_side / max(width, height)
+        # draft picks the smallest DCT scale that still covers the request
+        image_file.draft(
+            mode or img.mode, (math.ceil(width * ratio), math.ceil(height * ratio))
+        )
+
+    if exif_transpose:
+        img = ImageOps.exif_transpose(img)
+    if mode and img.mode != mode:
+        img = img.convert(mode)
+    else:
+        img.load()
+
+    long_side = max(img.size)
+    if resize and max_side and long_side > max_side:
+        ratio = max_side / long_side
+        img = img.resize(
+            (max(1, round(img.size[0] * ratio)), max(1, round(img.size[1] * ratio))),
+            _RESAMPLE,
+        )
+
+    img.info["source_size"] = (width, height)
+    elapsed = (time.perf_counter() - start) * 1000.0
+    with _stats_lock:
+        entry = _stats[site]
+        entry["calls"] += 1
+        entry["bytes"] += size_in
+        entry["decode_ms"] += elapsed
+        entry["source_pixels"] += width * height
+        entry["decoded_pixels"] += img.size[0] * img.size[1]
+    return img
+
+
+def decode_stats() -> Dict[str, Dict[str, Any]]:
+    """Per call site: calls, input bytes, total/avg decode time and pixel reduction."""
+    with _stats_lock:
+        out = {}
+        for site, entry in _stats.items():
+            calls = entry["calls"] or 1
+            out[site] = {
+                **entry,
+                "decode_ms": round(entry["decode_ms"], 2),
+                "avg_decode_ms": round(entry["decode_ms"] / calls, 2),
+                "pixel_ratio": (
+                    round(entry["decoded_pixels"] / entry["source_pixels"], 4)
+                    if entry["source_pixels"]
+                    else 0.0
+                ),
+            }
+        return out
@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import io
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from constants import (
+    PAYLOAD_CACHE_SIZE,
+    PAYLOAD_CACHE_TTL,
+    VISION_JPEG_QUALITY,
+    VISION_MAX_SIDE,
+)
+from utils.image_loader import load_image
+from utils.ttl_cache import LRUTTLCache
+
+payload_cache = LRUTTLCache(maxsize=PAYLOAD_CACHE_SIZE, ttl=PAYLOAD_CACHE_TTL)
+
+_stats = {"prepared": 0, "source_bytes": 0, "payload_bytes": 0, "encode_ms": 0.0}
+_stats_lock = threading.Lock()
+
+
+class ImagePayload(NamedTuple):
+    """An image encoded once for the vision LLM calls."""
+
+    data: bytes
+    base64: str
+    mime_type: str
+    digest: str
+    size: Tuple[int, int]
+    source_bytes: int
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.base64}"
+
+
+def prepare_image_payload(
+    data: bytes, site: str = "payload", digest: Optional[str] = None
+) -> ImagePayload:
+    """Downsize an uploaded image and encode it as JPEG, once per content hash.
+
+    The image is decoded at VISION_MAX_SIDE (EXIF-rotated) and encoded at
+    VISION_JPEG_QUALITY. Results are cached by the sha256 of the upload, so the
+    same image analysed, validated or regenerated again is not re-encoded.
+
+    Args:
+        data (bytes): The uploaded image bytes.
+        site (str): Call-site name for the decode statistics.
+        digest (str, optional): sha256 hex digest of ``data`` if already known.
+
+    Returns:
+        ImagePayload: JPEG bytes, base64 text and mime type for the request.
+    """
+    digest = digest or hashlib.sha256(data).hexdigest()
+    key = (digest, VISION_MAX_SIDE, VISION_JPEG_QUALITY)
+    cached = payload_cache.get(key)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    img = load_image(data, VISION_MAX_SIDE, site=site, exif_transpose=True)
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+    jpeg = out.getvalue()
+    payload = ImagePayload(
+        data=jpeg,
+        base64=base64.b64encode(jpeg).decode("ascii"),
+        mime_type="image/jpeg",
+        digest=digest,
+        size=img.size,
+        source_bytes=len(data),
+    )
+    elapsed = (time.perf_counter() - start) * 1000.0
+
+    with _stats_lock:
+        _stats["prepared"] += 1
+        _stats["source_bytes"] += len(data)
+        _stats["payload_bytes"] += len(jpeg)
+        _stats["encode_ms"] += elapsed
+    payload_cache.put(key, payload)
+    return payload
+
+
+def payload_stats() -> Dict[str, Any]:
+    """Payloads prepared, bytes in and out, encode time and cache counters."""
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    prepared = stats["prepared"] or 1
+    stats["encode_ms"] = round(stats["encode_ms"], 2)
+    stats["avg_payload_bytes"] = stats["payload_bytes"] // prepared
+    stats["compression_ratio"] = (
+        round(stats["payload_bytes"] / stats["source_bytes"], 4)
+        if stats["source_bytes"]
+        else 0.0
+    )
+    stats["cache"] = payload_cache.stats()
+    return stats
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from diskcache import Cache
+
+from constants import CACHE_DIR, LLM_CACHE_DISK, LLM_CACHE_SIZE, LLM_CACHE_TTL
+from utils.ttl_cache import LRUTTLCache
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.]+$")
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing ?!. so trivially different
+    phrasings of the same question share a key."""
+    return _TRAILING.sub("", _SPACES.sub(" ", text.casefold()).strip())
+
+
+def llm_cache_key(model: str, max_tokens: int, messages: List[Dict[str, Any]]) -> str:
+    """sha256 over the model, completion limit and normalized messages."""
+    normalized = [
+        {"role": m.get("role"), "content": normalize_text(str(m.get("content") or ""))}
+        for m in messages
+    ]
+    blob = json.dumps([model, max_tokens, normalized], separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Content-addressed cache of LLM replies: an in-process LRU with TTL in front
+    of an optional disk tier shared by worker processes.
+
+    Args:
+        maxsize (int): Entries kept in memory.
+        ttl (float): Entry lifetime in seconds (both tiers).
+        disk (bool): Also keep entries in a diskcache under CACHE_DIR.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL,
+        disk: bool = LLM_CACHE_DISK,
+    ) -> None:
+        self.ttl = ttl
+        self._memory = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self._disk: Optional[Cache] = (
+            Cache(str(CACHE_DIR / "llm_responses")) if disk else None
+        )
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._memory.get(key)
+        if value is not None or self._disk is None:
+            return value
+        value = self._disk.get(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._memory.put(key, value)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._memory.put(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value, expire=self.ttl or None)
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self._memory.stats()
+        with self._lock:
+            disk_hits = self.disk_hits
+        hits = memory["hits"] + disk_hits
+        lookups = memory["hits"] + memory["misses"]
+        return {
+            **memory,
+            "disk": self._disk is not None,
+            "disk_hits": disk_hits,
+            "disk_size": len(self._disk) if self._disk is not None else 0,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+llm_response_cache = LLMResponseCache()
@@ -13,12 +13,18 @@ TABLE_MESSAGES = Box(
             "checking_duplicates": "Checking for duplicates in the table...",
             "no_duplicates": "No duplicates found in the table.",
             "removed_duplicate": "Removed duplicate: {uri}",
-            "duplicates_removed": "Successfully removed duplicate entries.",
+            "duplicates_removed": "Removed {count} duplicate entries.",
+            "resuming_ingest": "Resuming interrupted build after '{key}' ({count} rows already written).",
+            "ingested_batch": "{count} images embedded and written so far...",
+            "incremental_scan": "Incremental scan: only images modified after {since}.",
+            "skipped_duplicates": "Skipping {count} images whose content is already listed.",
             "added_modified_images": "Added {count} new or modified images.",
-            "removed_missing_images": "Removed {count} missing images.",
-            "dropping_table": "Force flag set. Dropping existing table '{table_name}'.",
+            "removed_missing_images": "Removed {count} stale rows (changed or missing images).",
+            "sync_summary": "Sync: {added} new, {changed} changed, {removed} missing images.",
+            "rebuilding_table": "Force flag set. Rebuilding '{table_name}' as a new version; searches keep version {version} until the build succeeds.",
             "updating_table": "Updating existing table '{table_name}'...",
-            "final_preview": "Final table preview:",
+            "final_preview": "Sample rows:",
+            "final_summary": "Table has {rows} rows; per tag: {tags}; indexes: {indexes}",
             "available_tables": "Available tables: {tables}",
             "looking_for_table": "Looking for table: {table_name}",
             "table_exists_check": "Table exists check: {exists}",
@@ -26,15 +32,22 @@ TABLE_MESSAGES = Box(
             "processing_local": "Processing with local storage...",
             "table_exists_status": "{exists}",
             "total_images_in_table": "Total {count} images in table",
+            "building_index": "Building {index_type} vector index ({partitions} partitions) over {count} rows...",
+            "index_built": "Vector index built.",
+            "index_skipped": "Only {count} rows (< {minimum}); keeping flat search, no vector index built.",
+            "index_up_to_date": "Vector index has {count} unindexed rows (< {threshold}); no refresh needed.",
+            "refreshing_index": "Adding {count} unindexed rows to the vector index...",
+            "building_scalar_index": "Building {index_type} index on '{column}'...",
         },
         "warnings": {
             "no_images_to_add": "No images found to add to the table.",
-            "invalid_file_path": "Skipping invalid file path: {path}",
+            "rolling_back": "Build of '{table_name}' failed; restoring version {version}.",
         },
         "errors": {
             "no_images_found": "No images found in the specified directory.",
             "missing_columns": "Required columns not found. Skipping deduplication.",
             "file_processing": "Error processing file {path}: {error}",
+            "index_failed": "Vector index maintenance failed: {error}",
         },
     },
     frozen_box=True,
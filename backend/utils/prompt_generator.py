@@ -1,16 +1,32 @@
 from .prompt_config import PROMPT_CONFIG
 
+VARIATION_COUNT = 6
 
-def generate_prompts(analysis_type: str) -> list:
-    config = PROMPT_CONFIG[analysis_type]
 
-    base = (
+def _base_prompt(analysis_type: str) -> str:
+    config = PROMPT_CONFIG[analysis_type]
+    return (
         f"You are a textile expert. Analyze this fabric image and describe "
         f"{config['length_instruction']}: {config['details']}. "
         f"Be concise and precise. Use precise textile terms."
     )
 
+
+def generate_prompts(analysis_type: str) -> list:
+    base = _base_prompt(analysis_type)
+
     return [
         f"{base}\nNote: This is variation {i + 1}. Provide a slightly different perspective."
-        for i in range(6)
+        for i in range(VARIATION_COUNT)
     ]
+
+
+def generate_batch_prompt(analysis_type: str, count: int = VARIATION_COUNT) -> str:
+    """One prompt asking for ``count`` numbered variations as a JSON object."""
+    base = _base_prompt(analysis_type)
+    return (
+        f"{base}\nWrite {count} variations of this description, each from a slightly "
+        f"different perspective and each following the length rule above.\n"
+        f'Respond only with JSON of the form {{"variations": ["<variation 1>", ..., '
+        f'"<variation {count}>"]}} containing exactly {count} strings.'
+    )
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Tuple
+
+# One subscriber: the event loop it lives on and the queue its coroutine reads
+Subscriber = Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[Tuple[int, Any]]"]
+
+
+class ResultBroker:
+    """Hands stored analysis variations to coroutines waiting for them.
+
+    Results are stored from worker threads, so ``publish`` hands them over to
+    each subscriber's event loop with ``call_soon_threadsafe``. Delivery is
+    per process; waiters still re-read the result store now and then for
+    results stored by other workers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+
+    def subscribe(self, cache_key: str) -> Subscriber:
+        """Start receiving ``(index, response)`` for ``cache_key``; call from a coroutine."""
+        subscriber: Subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(cache_key, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, cache_key: str, subscriber: Subscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(cache_key, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(cache_key, None)
+
+    def publish(self, cache_key: str, index: int, response: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(cache_key, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (index, response))
+            except RuntimeError:
+                # the subscriber's loop has closed
+                self.unsubscribe(cache_key, (loop, queue))
+
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+result_broker = ResultBroker()
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class LRUTTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    Args:
+        maxsize (int): Maximum number of entries kept before the least recently used is evicted.
+        ttl (float): Lifetime of an entry in seconds. ``0`` disables expiry.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - stored_at > self.ttl
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = item
+            if self._expired(stored_at, now):
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like ``get`` but without counting a hit or miss or refreshing recency."""
+        with self._lock:
+            item = self._data.get(key)
+        if item is None or self._expired(item[1], time.monotonic()):
+            return None
+        return item[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[0] if item else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -130,7 +130,41 @@ async function callDbEndpoint(op: "create" | "update"): Promise<string> {
   const res = await fetch(url, { method: "PUT" });
   const data = await res.json().catch(() => ({}));
   if (!res.ok) throw new Error(data?.detail ?? `Request failed (${res.status})`);
-  return data?.message ?? "Done.";
+  if (!data?.job_id) return data?.message ?? "Done.";
+  return waitForDbJob(data.job_id, op);
+}
+
+// create/update run as background jobs; poll until the job finishes, gives up
+// after DB_JOB_MAX_MS or DB_JOB_MAX_ERRORS failed polls in a row (e.g. 404s)
+const DB_JOB_POLL_MS = 3000;
+const DB_JOB_MAX_MS = 60 * 60 * 1000;
+const DB_JOB_MAX_ERRORS = 3;
+
+async function fetchDbJob(jobId: string) {
+  const res = await fetch(`${API_BASE}/database/jobs/${jobId}`);
+  const job = await res.json().catch(() => ({}));
+  if (!res.ok) throw new Error(job?.detail ?? `Request failed (${res.status})`);
+  return job;
+}
+
+async function waitForDbJob(jobId: string, op: "create" | "update"): Promise<string> {
+  const deadline = Date.now() + DB_JOB_MAX_MS;
+  let errors = 0;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, DB_JOB_POLL_MS));
+    const job = await fetchDbJob(jobId).catch((e: unknown) => (e instanceof Error ? e : new Error(String(e))));
+    if (job instanceof Error) {
+      errors += 1;
+      if (errors >= DB_JOB_MAX_ERRORS) throw new Error(`Lost track of the table ${op} job: ${job.message}`);
+      continue;
+    }
+    errors = 0;
+    if (job.status === "failed") throw new Error(job.error ?? `Table ${op} failed.`);
+    if (job.status === "succeeded") {
+      return op === "create" ? "Table created successfully." : "Table updated successfully.";
+    }
+  }
+  throw new Error(`Table ${op} is still running after ${DB_JOB_MAX_MS / 60000} minutes (job ${jobId}).`);
 }
 
 // ─── CategoryPicker ───────────────────────────────────────────────────────────